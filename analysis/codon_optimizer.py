@@ -1,14 +1,249 @@
+import math
+import re
+
+import numpy as np
+
+from analysis.codon_tables import CODON_USAGE
+from analysis.encoding import BASES, encode_sequence
+from analysis.motif_engine import IUPAC_CODES
+from analysis.orf_finder import INVALID_CODON, codon_indices
+from analysis.parallel import imap_bounded
+
+# ۶۴ کدون به ترتیب اندیس codon_indices (A=0، C=1، G=2، T=3)
+CODONS = [a + b + c for a in BASES for b in BASES for c in BASES]
+_CODON_BYTES = np.frombuffer(''.join(CODONS).encode('ascii'), dtype=np.uint8).reshape(64, 3)
+_CODON_GC = np.array([codon.count('G') + codon.count('C') for codon in CODONS])
+
+AMINO_ACIDS = 'ACDEFGHIKLMNPQRSTVWY*'
+STRATEGIES = ('most_frequent', 'weighted', 'balanced')
+
+# هزینه‌ی ساختن جایگاه ممنوع یا تکرار در روش balanced؛ بسیار بزرگ‌تر از هزینه‌ی CAI و GC
+SITE_PENALTY = 1000.0
+REPEAT_PENALTY = 100.0
+
+def _optimize_in_worker(optimizer, task):
+    _, protein, seed, options = task
+    dna = optimizer.optimize(protein, seed=seed, **options)
+    host = options.get('host', 'e_coli')
+    return {
+        'sequence': dna,
+        'cai': round(optimizer.cai(dna, host), 4),
+        'gc_content': round(optimizer.gc_content(dna), 2),
+    }
+
+
+class _HostTable:
+    """آرایه‌های آماده‌ی یک میزبان برای انتخاب برداری کدون"""
+
+    def __init__(self, frequencies, table=1):
+        from Bio.Data import CodonTable
+
+        codon_table = CodonTable.unambiguous_dna_by_id[table]
+        synonyms = {aa: [] for aa in AMINO_ACIDS}
+        for codon, aa in codon_table.forward_table.items():
+            synonyms[aa].append(codon)
+        synonyms['*'] = list(codon_table.stop_codons)
+
+        usage = np.array([frequencies.get(codon, 0.0) for codon in CODONS], dtype=float)
+        width = max(len(codons) for codons in synonyms.values())
+        self.aa_index = np.full(256, -1, dtype=np.int16)
+        self.options = np.zeros((len(AMINO_ACIDS), width), dtype=np.int64)
+        self.counts = np.zeros(len(AMINO_ACIDS), dtype=np.int64)
+        self.cumulative = np.ones((len(AMINO_ACIDS), width))
+        # تطبیق‌پذیری نسبی هر کدون (w در CAI): فراوانی تقسیم بر بیشترین کدون هم‌معنی
+        self.weight = np.ones(64)
+        for index, aa in enumerate(AMINO_ACIDS):
+            self.aa_index[ord(aa)] = index
+            self.aa_index[ord(aa.lower())] = index
+            codons = sorted((CODONS.index(codon) for codon in synonyms[aa]),
+                            key=lambda codon: -usage[codon])
+            counts = np.maximum(usage[codons], 1e-3)
+            self.options[index, :len(codons)] = codons
+            self.options[index, len(codons):] = codons[0]
+            self.counts[index] = len(codons)
+            self.cumulative[index, :len(codons)] = np.cumsum(counts) / counts.sum()
+            self.weight[codons] = counts / counts.max()
+        self.best = self.options[:, 0]
+        self.log_weight = np.log(self.weight)
+        # کدون‌هایی که در CAI شمرده می‌شوند: بدون کدون پایان، ATG، TGG و کدون‌های دارای N
+        self.informative = np.zeros(INVALID_CODON + 1, dtype=bool)
+        for index, aa in enumerate(AMINO_ACIDS[:-1]):
+            if self.counts[index] > 1:
+                self.informative[self.options[index, :self.counts[index]]] = True
+
+    def translate_indices(self, protein):
+        indices = self.aa_index[np.frombuffer(protein.encode('ascii', 'replace'), dtype=np.uint8)]
+        if (indices < 0).any():
+            invalid = sorted({protein[i] for i in np.flatnonzero(indices < 0).tolist()})
+            raise ValueError(f"Invalid amino acids: {', '.join(invalid)}")
+        return indices
+
+
 class CodonOptimizer:
-    def __init__(self):
-        self.host_preferences = {
-            'e_coli': self._load_codon_table('e_coli'),
-            'human': self._load_codon_table('human')
-        }
-
-    def optimize(self, protein_sequence, host='e_coli'):
-        """بهینه‌سازی کدون برای میزبان خاص"""
-        optimized_dna = ""
-        table = self.host_preferences.get(host, {})
-        for aa in protein_sequence:
-            optimized_dna += self._choose_best_codon(aa, table)
-        return optimized_dna
\ No newline at end of file
+    """بهینه‌سازی کدون بر اساس جدول استفاده از کدون میزبان
+
+    روش‌ها:
+    most_frequent: پرکاربردترین کدون هر آمینواسید (انتخاب برداری)
+    weighted: انتخاب تصادفی متناسب با فراوانی کدون‌ها با seed قابل تکرار
+    balanced: انتخاب حریصانه‌ی چپ به راست با کمینه کردن -log(w) (همان CAI)،
+    فاصله‌ی GC پنجره‌ی لغزان از gc_target، و جریمه‌ی ساختن جایگاه‌های
+    avoid_sites (روی هر دو رشته)، همو‌پلیمرهای بلند و تکرارهای مستقیم
+    """
+
+    def __init__(self, table=1):
+        self.table = table
+        self.host_preferences = {host: self._load_codon_table(host) for host in CODON_USAGE}
+
+    def _load_codon_table(self, host):
+        return _HostTable(CODON_USAGE[host]['frequencies'], self.table)
+
+    def add_host(self, host, frequencies):
+        """افزودن جدول استفاده از کدون دلخواه ({کدون: فراوانی})"""
+        frequencies = {codon.upper().replace('U', 'T'): value for codon, value in frequencies.items()}
+        self.host_preferences[host] = _HostTable(frequencies, self.table)
+
+    def _host(self, host):
+        if host not in self.host_preferences:
+            raise ValueError(f"Unknown host: {host}")
+        return self.host_preferences[host]
+
+    def optimize(self, protein_sequence, host='e_coli', strategy='most_frequent', seed=None,
+                 gc_target=None, gc_window=48, gc_weight=0.5, avoid_sites=(),
+                 max_homopolymer=6, repeat_length=12):
+        """بهینه‌سازی کدون برای میزبان خاص
+
+        gc_target کسر GC مطلوب (۰ تا ۱) در پنجره‌ی gc_window باز آخر است؛
+        avoid_sites توالی‌های IUPAC یا نام آنزیم‌های محدودکننده است.
+        """
+        table = self._host(host)
+        indices = table.translate_indices(protein_sequence)
+        if strategy == 'most_frequent':
+            codons = table.best[indices]
+        elif strategy == 'weighted':
+            random = np.random.default_rng(seed)
+            draws = random.random(len(indices))
+            choice = (table.cumulative[indices] < draws[:, None]).sum(axis=1)
+            codons = table.options[indices, np.minimum(choice, table.counts[indices] - 1)]
+        elif strategy == 'balanced':
+            codons = self._balanced(table, indices, gc_target, gc_window, gc_weight,
+                                    _site_patterns(avoid_sites), max_homopolymer, repeat_length)
+        else:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        return _CODON_BYTES[codons].tobytes().decode('ascii')
+
+    def _balanced(self, table, indices, gc_target, gc_window, gc_weight, sites, max_homopolymer,
+                  repeat_length):
+        longest = max((width for _, width in sites), default=0)
+        # فقط انتهای خروجی برای بررسی جایگاه‌ها، هموپلیمرها و تکرارها لازم است
+        keep = max(longest, max_homopolymer + 1, repeat_length) + 2
+        homopolymer = re.compile(r'(.)\1{%d,}' % max_homopolymer)
+
+        def blocked(text):
+            # جریمه‌ی جایگاه ممنوع یا هموپلیمری که با آخرین کدون text ساخته می‌شود
+            cost = 0.0
+            for site, width in sites:
+                if site.search(text, max(0, len(text) - 2 - width)):
+                    cost += SITE_PENALTY
+            if homopolymer.search(text, max(0, len(text) - max_homopolymer - 3)):
+                cost += REPEAT_PENALTY
+            return cost
+
+        indices = indices.tolist()
+        chosen = np.zeros(len(indices), dtype=np.int64)
+        tail = ''
+        # تعداد تجمعی G و C برای هر باز خروجی
+        gc_prefix = [0]
+        seen = set()
+        for position, aa in enumerate(indices):
+            best_cost, best = None, None
+            length = 3 * position + 3
+            start = max(0, length - max(gc_window, 3))
+            following = []
+            if position + 1 < len(indices):
+                following = [CODONS[codon] for codon in
+                             table.options[indices[position + 1], :table.counts[indices[position + 1]]]]
+            for codon in table.options[aa, :table.counts[aa]].tolist():
+                cost = -table.log_weight[codon]
+                candidate = tail + CODONS[codon]
+                if gc_target is not None:
+                    # هزینه برای هر باز فاصله از تعداد GC مطلوب در پنجره
+                    gc = gc_prefix[-1] + _CODON_GC[codon] - gc_prefix[start]
+                    cost += gc_weight * abs(gc - gc_target * (length - start))
+                cost += blocked(candidate)
+                if following:
+                    # نگاه یک کدون به جلو: جایگاهی که کدون بعدی ناگزیر کامل می‌کند هم جریمه می‌شود
+                    cost += min(blocked(candidate + codon) for codon in following)
+                if repeat_length and len(candidate) >= repeat_length:
+                    for end in range(len(candidate) - 2, len(candidate) + 1):
+                        if end >= repeat_length and candidate[end - repeat_length:end] in seen:
+                            cost += REPEAT_PENALTY
+                if best_cost is None or cost < best_cost:
+                    best_cost, best = cost, codon
+            chosen[position] = best
+            tail = (tail + CODONS[best])[-keep:]
+            for base in CODONS[best]:
+                gc_prefix.append(gc_prefix[-1] + (base in 'GC'))
+            if repeat_length:
+                for end in range(len(tail) - 2, len(tail) + 1):
+                    if end >= repeat_length:
+                        seen.add(tail[end - repeat_length:end])
+        return chosen
+
+    def optimize_batch(self, proteins, host='e_coli', strategy='most_frequent', seed=None,
+                       workers=None, chunk_size=16, ordered=True, start=0, **options):
+        """بهینه‌سازی یک کتابخانه‌ی پروتئینی در پردازه‌های موازی
+
+        proteins می‌تواند شامل رشته یا زوج (نام، توالی) باشد؛ خروجی برای هر
+        پروتئین {'id', 'sequence', 'cai', 'gc_content'} یا {'id', 'error'} است.
+        در روش weighted بذر هر پروتئین از seed و شماره‌ی آن ساخته می‌شود تا
+        نتیجه به ترتیب یا تعداد کارگرها وابسته نباشد؛ start شماره‌ی اولین
+        پروتئین است تا ادامه‌ی یک اجرای نیمه‌تمام همان بذرها را بگیرد.
+        """
+        options = dict(options, host=host, strategy=strategy)
+        tasks = (
+            (*(record if isinstance(record, tuple) and len(record) == 2 else (number, record)),
+             None if seed is None else (seed, number), options)
+            for number, record in enumerate(proteins, start)
+        )
+        for task, result, error in imap_bounded(
+                _optimize_in_worker, tasks, workers=workers, chunk_size=chunk_size,
+                ordered=ordered, shared=self):
+            yield {'id': task[0], 'error': error} if error else dict(result, id=task[0])
+
+    def cai(self, dna_sequence, host='e_coli'):
+        """شاخص سازگاری کدون (CAI)؛ ATG، TGG و کدون‌های پایان حساب نمی‌شوند"""
+        table = self._host(host)
+        codons = codon_indices(encode_sequence(dna_sequence))[::3]
+        codons = codons[table.informative[codons]]
+        if len(codons) == 0:
+            return 0.0
+        return float(math.exp(table.log_weight[codons].mean()))
+
+    def gc_content(self, dna_sequence):
+        codes = encode_sequence(dna_sequence)
+        if len(codes) == 0:
+            return 0.0
+        return float(np.isin(codes, (1, 2)).mean() * 100)
+
+
+def _iupac_regex(site):
+    return ''.join(f"[{IUPAC_CODES[base]}]" if len(IUPAC_CODES[base]) > 1 else IUPAC_CODES[base]
+                   for base in site)
+
+
+def _site_patterns(sites):
+    """الگوهای ممنوع از توالی IUPAC یا نام آنزیم، روی هر دو رشته"""
+    complement = str.maketrans('ACGTRYSWKMBDHVN', 'TGCAYRSWMKVHDBN')
+    patterns = []
+    for site in sites:
+        if not set(site.upper()) <= set(IUPAC_CODES):
+            # هر رشته‌ای که توالی IUPAC نباشد (با هر حروفی) نام آنزیم است
+            from Bio.Restriction import AllEnzymes
+            try:
+                site = AllEnzymes.get(site).site
+            except ValueError:
+                raise ValueError(f"Unknown site or enzyme: {site}") from None
+        site = site.upper().replace('U', 'T')
+        for strand in {site, site.translate(complement)[::-1]}:
+            patterns.append((re.compile(_iupac_regex(strand)), len(site)))
+    return patterns
\ No newline at end of file
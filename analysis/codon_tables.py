@@ -0,0 +1,66 @@
+# جدول‌های استفاده از کدون (تعداد در هر هزار کدون) از پایگاه Kazusa Codon Usage Database
+CODON_USAGE = {
+    "e_coli": {
+        "name": "Escherichia coli K-12",
+        "frequencies": {
+            "TTT": 22.1, "TCT": 10.4, "TAT": 17.5, "TGT": 5.2,
+            "TTC": 16.0, "TCC": 9.1, "TAC": 12.2, "TGC": 6.1,
+            "TTA": 14.3, "TCA": 8.9, "TAA": 2.0, "TGA": 1.0,
+            "TTG": 13.0, "TCG": 8.5, "TAG": 0.3, "TGG": 14.0,
+            "CTT": 11.9, "CCT": 7.5, "CAT": 12.5, "CGT": 20.9,
+            "CTC": 10.2, "CCC": 5.4, "CAC": 9.3, "CGC": 21.1,
+            "CTA": 4.2, "CCA": 8.6, "CAA": 14.6, "CGA": 3.6,
+            "CTG": 48.4, "CCG": 20.9, "CAG": 28.4, "CGG": 5.4,
+            "ATT": 29.8, "ACT": 10.3, "AAT": 20.6, "AGT": 8.8,
+            "ATC": 23.7, "ACC": 22.0, "AAC": 21.4, "AGC": 16.1,
+            "ATA": 6.8, "ACA": 9.3, "AAA": 35.3, "AGA": 2.1,
+            "ATG": 26.4, "ACG": 13.7, "AAG": 12.4, "AGG": 1.2,
+            "GTT": 19.8, "GCT": 15.3, "GAT": 32.1, "GGT": 24.7,
+            "GTC": 15.3, "GCC": 25.5, "GAC": 19.1, "GGC": 29.6,
+            "GTA": 10.9, "GCA": 20.3, "GAA": 39.4, "GGA": 8.0,
+            "GTG": 26.3, "GCG": 33.6, "GAG": 17.8, "GGG": 11.1,
+        },
+    },
+    "human": {
+        "name": "Homo sapiens",
+        "frequencies": {
+            "TTT": 17.6, "TCT": 15.2, "TAT": 12.2, "TGT": 10.6,
+            "TTC": 20.3, "TCC": 17.7, "TAC": 15.3, "TGC": 12.6,
+            "TTA": 7.7, "TCA": 12.2, "TAA": 1.0, "TGA": 1.6,
+            "TTG": 12.9, "TCG": 4.4, "TAG": 0.8, "TGG": 13.2,
+            "CTT": 13.2, "CCT": 17.5, "CAT": 10.9, "CGT": 4.5,
+            "CTC": 19.6, "CCC": 19.8, "CAC": 15.1, "CGC": 10.4,
+            "CTA": 7.2, "CCA": 16.9, "CAA": 12.3, "CGA": 6.2,
+            "CTG": 39.6, "CCG": 6.9, "CAG": 34.2, "CGG": 11.4,
+            "ATT": 16.0, "ACT": 13.1, "AAT": 17.0, "AGT": 12.1,
+            "ATC": 20.8, "ACC": 18.9, "AAC": 19.1, "AGC": 19.5,
+            "ATA": 7.5, "ACA": 15.1, "AAA": 24.4, "AGA": 12.2,
+            "ATG": 22.0, "ACG": 6.1, "AAG": 31.9, "AGG": 12.0,
+            "GTT": 11.0, "GCT": 18.4, "GAT": 21.8, "GGT": 10.8,
+            "GTC": 14.5, "GCC": 27.7, "GAC": 25.1, "GGC": 22.2,
+            "GTA": 7.1, "GCA": 15.8, "GAA": 29.0, "GGA": 16.5,
+            "GTG": 28.1, "GCG": 7.4, "GAG": 39.6, "GGG": 16.5,
+        },
+    },
+    "yeast": {
+        "name": "Saccharomyces cerevisiae",
+        "frequencies": {
+            "TTT": 26.1, "TCT": 23.5, "TAT": 18.8, "TGT": 8.1,
+            "TTC": 18.4, "TCC": 14.2, "TAC": 14.8, "TGC": 4.8,
+            "TTA": 26.2, "TCA": 18.7, "TAA": 1.1, "TGA": 0.7,
+            "TTG": 27.2, "TCG": 8.6, "TAG": 0.5, "TGG": 10.4,
+            "CTT": 12.3, "CCT": 13.5, "CAT": 13.6, "CGT": 6.4,
+            "CTC": 5.4, "CCC": 6.8, "CAC": 7.8, "CGC": 2.6,
+            "CTA": 13.4, "CCA": 18.3, "CAA": 27.3, "CGA": 3.0,
+            "CTG": 10.5, "CCG": 5.3, "CAG": 12.1, "CGG": 1.7,
+            "ATT": 30.1, "ACT": 20.3, "AAT": 35.7, "AGT": 14.2,
+            "ATC": 17.2, "ACC": 12.7, "AAC": 24.8, "AGC": 9.8,
+            "ATA": 17.8, "ACA": 17.8, "AAA": 41.9, "AGA": 21.3,
+            "ATG": 20.9, "ACG": 8.0, "AAG": 30.8, "AGG": 9.2,
+            "GTT": 22.1, "GCT": 21.2, "GAT": 37.6, "GGT": 23.9,
+            "GTC": 11.8, "GCC": 12.6, "GAC": 20.2, "GGC": 9.8,
+            "GTA": 11.8, "GCA": 16.2, "GAA": 45.6, "GGA": 10.9,
+            "GTG": 10.8, "GCG": 6.2, "GAG": 19.2, "GGG": 6.0,
+        },
+    },
+}
@@ -1,14 +1,166 @@
-from Bio.Seq import Seq
+import numpy as np
+
+from analysis.encoding import N_CODE, encode_sequence
+from analysis.packed_sequence import PackedSequence
+
+VALID_BASES = 'ACGT'
+
+# IUPAC complement table, same mapping as Bio.Seq.complement (U pairs with A)
+_IUPAC = 'ABCDGHKMRTUVY'
+_IUPAC_COMPLEMENT = 'TVGHCDMKYAABR'
+_BYTES_COMPLEMENT = bytes.maketrans((_IUPAC + _IUPAC.lower()).encode('ascii'),
+                                    (_IUPAC_COMPLEMENT + _IUPAC_COMPLEMENT.lower()).encode('ascii'))
+_STR_COMPLEMENT = str.maketrans(_IUPAC + _IUPAC.lower(), _IUPAC_COMPLEMENT + _IUPAC_COMPLEMENT.lower())
+
+# Bytes deleted by the validity check; anything left over is invalid
+_VALID_BYTES = (VALID_BASES + VALID_BASES.lower()).encode('ascii')
+_INVALID_TABLE = np.ones(256, dtype=bool)
+_INVALID_TABLE[np.frombuffer(_VALID_BYTES, dtype=np.uint8)] = False
+
+# Sequences are processed in groups of about this many bases to bound temporaries
+_BLOCK = 1 << 22
+
+
+def _as_bytes(dna_sequence):
+    """ASCII bytes of a sequence; other characters become '?' so positions are kept"""
+    return dna_sequence.encode('ascii', 'replace')
+
+
+def _complement(dna_sequence, reverse=False):
+    if isinstance(dna_sequence, PackedSequence):
+        return dna_sequence.reverse_complement() if reverse else dna_sequence.complement()
+    try:
+        result = dna_sequence.encode('ascii').translate(_BYTES_COMPLEMENT).decode('ascii')
+    except UnicodeEncodeError:
+        result = dna_sequence.translate(_STR_COMPLEMENT)
+    return result[::-1] if reverse else result
+
+
+def _invalid_positions(dna_sequence):
+    codes = np.frombuffer(_as_bytes(dna_sequence), dtype=np.uint8)
+    return np.flatnonzero(np.take(_INVALID_TABLE, codes))
+
+
+def _is_valid(dna_sequence):
+    if isinstance(dna_sequence, PackedSequence):
+        return not dna_sequence.has_mask()
+    # bytes.translate with a delete set runs in C and leaves only invalid bytes
+    return not _as_bytes(dna_sequence).translate(None, _VALID_BYTES)
+
+
+def _groups(sequences):
+    """Consecutive groups of sequences totalling about _BLOCK bases"""
+    group, size = [], 0
+    for sequence in sequences:
+        group.append(sequence)
+        size += len(sequence)
+        if size >= _BLOCK:
+            yield group
+            group, size = [], 0
+    if group:
+        yield group
+
+
+def _composition_group(group):
+    lengths = np.fromiter((len(sequence) for sequence in group), dtype=np.int64, count=len(group))
+    if all(isinstance(sequence, str) for sequence in group):
+        # One lookup-table pass over the joined group instead of one per sequence
+        codes = encode_sequence(''.join(group))
+    else:
+        codes = np.concatenate([encode_sequence(sequence) for sequence in group])
+    # Code c of sequence i is counted in bin i * 5 + c
+    bins = np.repeat(np.arange(len(group), dtype=np.int64) * (N_CODE + 1), lengths) + codes
+    return np.bincount(bins, minlength=len(group) * (N_CODE + 1)).reshape(len(group), N_CODE + 1)
+
+
+def complement_batch(sequences):
+    """Complements of many sequences (IUPAC-aware, case preserved)"""
+    return [_complement(sequence) for sequence in sequences]
+
+
+def reverse_complement_batch(sequences):
+    """Reverse complements of many sequences"""
+    return [_complement(sequence, reverse=True) for sequence in sequences]
+
+
+def validate_batch(sequences, max_positions=None):
+    """Validity of many sequences with the positions of every invalid character
+
+    Each result is a dict with 'valid', 'invalid_positions' (0-based, at most
+    max_positions of them) and 'invalid_characters' (sorted, upper-cased).
+    """
+    results = []
+    for sequence in sequences:
+        if _is_valid(sequence):
+            results.append({'valid': True, 'invalid_positions': [], 'invalid_characters': []})
+            continue
+        if isinstance(sequence, PackedSequence):
+            sequence = str(sequence)
+        positions = _invalid_positions(sequence)
+        characters = sorted({sequence[position].upper() for position in positions.tolist()})
+        results.append({
+            'valid': False,
+            'invalid_positions': positions[:max_positions].tolist(),
+            'invalid_characters': characters,
+        })
+    return results
+
+
+def composition_batch(sequences):
+    """Base counts of many sequences as an (n, 5) array: A, C, G, T, other"""
+    sequences = list(sequences)
+    if not sequences:
+        return np.zeros((0, N_CODE + 1), dtype=np.int64)
+    return np.concatenate([_composition_group(group) for group in _groups(sequences)])
+
+
+def gc_content_batch(sequences):
+    """GC percentage of many sequences; other characters count towards the length"""
+    counts = composition_batch(sequences)
+    lengths = counts.sum(axis=1)
+    gc = (counts[:, 1] + counts[:, 2]).astype(float)
+    return np.divide(gc * 100, lengths, out=np.zeros_like(gc), where=lengths > 0)
+
 
 def calculate_complement(dna_sequence):
     """Calculate complement of DNA sequence"""
-    return str(Seq(dna_sequence).complement())
+    return _complement(dna_sequence)
+
+
+def reverse_complement(dna_sequence):
+    """Calculate reverse complement of DNA sequence"""
+    return _complement(dna_sequence, reverse=True)
+
+
+def calculate_gc_content(dna_sequence, exclude_ambiguous=False):
+    """Calculate GC content percentage
+
+    By default every character other than G and C counts towards the length.
+    With exclude_ambiguous=True only A, C, G, T, S and W do and S counts as
+    G or C, like Bio.SeqUtils.gc_fraction (so 'ACGN' gives 66.67, not 50).
+    """
+    if not exclude_ambiguous:
+        if isinstance(dna_sequence, PackedSequence):
+            return dna_sequence.gc_fraction() * 100
+        return float(gc_content_batch([dna_sequence])[0])
+    a, c, g, t, _ = composition_batch([dna_sequence])[0].tolist()
+    strong = weak = 0
+    if isinstance(dna_sequence, str):
+        strong = dna_sequence.count('S') + dna_sequence.count('s')
+        weak = dna_sequence.count('W') + dna_sequence.count('w')
+    called = a + c + g + t + strong + weak
+    return (g + c + strong) * 100 / called if called else 0.0
 
-def calculate_gc_content(dna_sequence):
-    """Calculate GC content percentage"""
-    gc_count = dna_sequence.upper().count('G') + dna_sequence.upper().count('C')
-    return (gc_count / len(dna_sequence)) * 100 if dna_sequence else 0
 
 def validate_dna_sequence(dna_sequence):
     """Validate DNA sequence contains only ATGC"""
-    return all(nuc.upper() in {'A', 'T', 'C', 'G'} for nuc in dna_sequence)
\ No newline at end of file
+    return _is_valid(dna_sequence)
+
+
+def find_invalid_positions(dna_sequence, max_positions=None):
+    """0-based positions of characters other than A, C, G, T (either case)"""
+    if _is_valid(dna_sequence):
+        return []
+    if isinstance(dna_sequence, PackedSequence):
+        dna_sequence = str(dna_sequence)
+    return _invalid_positions(dna_sequence)[:max_positions].tolist()
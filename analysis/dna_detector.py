@@ -1,58 +1,236 @@
-from Bio.Seq import Seq
-from Bio import pairwise2
-from Bio.SeqUtils import gc_fraction
-from analysis.sequence_db import SEQUENCE_DATABASE
-import numpy as np
-import re
+from analysis.sequence_store import SequenceStore, open_database
+from analysis.parallel import imap_bounded
+from utils.file_io import read_records, read_windows, sliding_windows
+import os
+
+# موتورهای تحلیل (و NumPy) تنها هنگام نخستین استفاده بارگذاری می‌شوند
+
+# زیرتحلیل‌هایی که می‌توان به صورت انتخابی اجرا کرد
+ANALYSES = ('patterns', 'orf', 'repeats', 'hairpins')
+
+# همه‌ی مراحل iter_stages به ترتیب اجرا
+STAGES = ('sequence_info', 'length', 'gc_content') + ANALYSES
+
+# نسخه‌ی دیتابیس برای اندیسی که هنوز هم‌گام نشده است
+_UNSYNCED = object()
+
+
+def _analyze_in_worker(detector, task):
+    _, sequence, analyses = task
+    instrumentation = detector.instrumentation
+    if not instrumentation.active:
+        return detector.detect_features(sequence, analyses), None
+    # خلاصه‌ی اندازه‌گیری همراه نتیجه به پردازه‌ی اصلی برمی‌گردد
+    with instrumentation.recording() as runs:
+        result = detector.detect_features(sequence, analyses)
+    return result, runs[0] if runs else None
+
 
 class DNADetector:
-    def __init__(self):
-        self.common_patterns = {
-            'promoter': re.compile(r'[AT]TATA[AT]A[AT]'),
-            'terminator': re.compile(r'GCGC[GC]+|ATAT[AT]+'),
-            'orf': re.compile(r'ATG(?:\w{3})*?(?:TAA|TAG|TGA)')
-        }
+    def __init__(self, database=None, index_path=None, instrument=None, approximate=False):
+        # دیتابیس داخلی، مسیر فایل SQLite یا هر نگاشت دیکشنری‌مانند (مثلاً SequenceStore)
+        self.database = open_database(database)
+        # زمان‌سنجی مراحل؛ با None از متغیر محیطی DNA_INSTRUMENT خوانده می‌شود
+        self._instrument = instrument
+        self._instrumentation = None
+        self.index_path = index_path
+        # شناسایی تقریبی با طرح‌های k-mer وقتی تطبیق دقیق نباشد (پرهزینه، اختیاری)
+        self.approximate = approximate
+        self._index = None
+        self._index_revision = _UNSYNCED
+        self._sketches = None
+        self._sketches_revision = _UNSYNCED
+        self._references_added = 0
+        self._repeat_finder = None
+        self._hairpin_finder = None
+        self._motifs = None
+
+    def __getstate__(self):
+        # اندیس در هر پردازه دوباره بارگذاری یا ساخته می‌شود
+        state = dict(self.__dict__)
+        state['_index'] = None
+        state['_sketches'] = None
+        return state
+
+    @property
+    def instrumentation(self):
+        if self._instrumentation is None:
+            from analysis.instrumentation import Instrumentation
+            self._instrumentation = Instrumentation(self._instrument)
+        return self._instrumentation
+
+    @property
+    def repeat_finder(self):
+        if self._repeat_finder is None:
+            from analysis.repeat_finder import RepeatFinder
+            self._repeat_finder = RepeatFinder()
+        return self._repeat_finder
+
+    @property
+    def hairpin_finder(self):
+        if self._hairpin_finder is None:
+            from analysis.hairpin_finder import HairpinFinder
+            self._hairpin_finder = HairpinFinder()
+        return self._hairpin_finder
+
+    @property
+    def motifs(self):
+        """کتابخانه‌ی موتیف‌ها؛ با add_iupac، add_regex، add_pwm یا load_jaspar قابل گسترش است"""
+        if self._motifs is None:
+            from analysis.motif_engine import MotifLibrary
+            self._motifs = MotifLibrary()
+            self._motifs.add_iupac('promoter', 'WTATAWAW')
+            self._motifs.add_regex('terminator', r'GCGC[GC]+|ATAT[AT]+')
+            self._motifs.add_orf('orf')
+        return self._motifs
+
+    @property
+    def index(self):
+        """اندیس دیتابیس؛ در صورت وجود از دیسک بارگذاری و گرنه ساخته می‌شود"""
+        if self._index is None:
+            from analysis.sequence_index import SequenceIndex
+            if self.index_path and os.path.exists(os.path.join(self.index_path, 'meta.json')):
+                self._index = SequenceIndex.load(self.index_path)
+                self._index_revision = _UNSYNCED
+            else:
+                self._index = SequenceIndex.from_database(self.database)
+                self._index_revision = self._database_revision()
+                if self.index_path:
+                    self._index.save(self.index_path)
+        # اندیس ذخیره‌شده یا ساخته‌شده با حذف و جایگزینی مدخل‌ها هم‌گام می‌شود
+        revision = self._database_revision()
+        if self._index_revision is _UNSYNCED or revision != self._index_revision:
+            if self._index.sync(self.database) and self.index_path:
+                self._index.save(self.index_path)
+            self._index_revision = self._database_revision()
+        return self._index
+
+    @property
+    def sketches(self):
+        """طرح‌های k-mer مرجع‌ها؛ برای SequenceStore در همان فایل دیتابیس ذخیره می‌شود"""
+        if self._sketches is None:
+            from analysis.sketch_index import SketchIndex
+            if isinstance(self.database, SequenceStore) and self.database.path != ':memory:':
+                self._sketches = SketchIndex(self.database.path)
+            else:
+                # دیتابیس‌های درون حافظه کوچک‌اند؛ همه‌ی k-merها نگه داشته می‌شوند
+                self._sketches = SketchIndex(scaled=1)
+            self._sketches_revision = _UNSYNCED
+        # SequenceStore با revision تغییرات (حذف، جایگزینی) را اعلام می‌کند؛
+        # نگاشت‌های ساده فقط یک بار و سپس با add_reference هم‌گام می‌شوند
+        revision = self._database_revision()
+        if self._sketches_revision is _UNSYNCED or revision != self._sketches_revision:
+            self._sketches.sync(self.database)
+            self._sketches_revision = self._database_revision()
+        return self._sketches
+
+    def _database_revision(self):
+        return getattr(self.database, 'revision', None)
+
+    @property
+    def revision(self):
+        """نشانه‌ای که با تغییر موتیف‌ها یا مرجع‌ها عوض می‌شود (برای کش نتایج)"""
+        return self.motifs.revision, self._database_revision(), self._references_added
+
+    def add_reference(self, seq_id, data):
+        """افزودن یک توالی مرجع به دیتابیس و اندیس"""
+        self.database[seq_id] = data
+        self._references_added += 1
+        self.index.add(seq_id, data['sequence'])
+        if self._sketches is not None:
+            self._sketches.add(seq_id, data['sequence'])
+
+    def find_sequence_matches(self, sequence, limit=None):
+        """همه‌ی مدخل‌ها و موقعیت‌هایی که توالی در آن‌ها یافت می‌شود"""
+        # مدخلی که پس از هم‌گام‌سازی از دیتابیس حذف شده باشد نادیده گرفته می‌شود
+        return [
+            self._match_info(seq_id, position)
+            for seq_id, position in self.index.search(sequence, limit=limit)
+            if seq_id in self.database
+        ]
 
     def identify_sequence(self, sequence):
         """شناسایی توالی در دیتابیس و برگرداندن اطلاعات"""
-        sequence = sequence.upper()
-        for seq_id, data in SEQUENCE_DATABASE.items():
-            if sequence in data['sequence']:
-                return {
-                    'id': seq_id,
-                    'name': data['name'],
-                    'type': data['type'],
-                    'description': data['description'],
-                    'match_position': data['sequence'].index(sequence)
-                }
-        return None
+        matches = self.find_sequence_matches(sequence, limit=1)
+        return matches[0] if matches else None
+
+    def identify_approximate(self, sequence, limit=5, min_containment=0.5, align=False):
+        """شناسایی تقریبی با طرح‌های k-mer، مثلاً برای خوانش‌های دارای خطا
+
+        مرجع‌ها به ترتیب شمول تخمینی k-merهای توالی در آن‌ها مرتب می‌شوند.
+        با align=True بهترین‌ها با همترازی محلی تأیید و بر اساس امتیاز
+        همترازی دوباره مرتب می‌شوند.
+        """
+        hits = self.sketches.search(sequence, limit=limit, min_containment=min_containment)
+        if align:
+            from analysis.core_analysis import reverse_complement
+            from analysis.packed_sequence import as_text
+            from analysis.sequence_aligner import SequenceAligner
+            aligner = SequenceAligner('local')
+            sequence = as_text(sequence).upper()
+            # طرح‌ها به جهت رشته حساس نیستند؛ هر دو جهت توالی همتراز می‌شوند
+            strands = (('+', sequence), ('-', reverse_complement(sequence)))
+        matches = []
+        for hit in hits:
+            if hit['id'] not in self.database:
+                continue
+            info = self._match_info(hit['id'], None)
+            info.update(containment=hit['containment'], jaccard=hit['jaccard'])
+            if align:
+                reference = self.database[hit['id']]['sequence']
+                strand, alignment = max(
+                    ((strand, aligner.align(query, reference)) for strand, query in strands),
+                    key=lambda item: item[1]['score'])
+                columns = len(alignment['aligned_query'])
+                identical = sum(a == b for a, b in zip(alignment['aligned_query'],
+                                                       alignment['aligned_target']))
+                info.update(match_position=alignment['target_start'], strand=strand,
+                            alignment_score=alignment['score'],
+                            identity=round(identical / columns, 4) if columns else 0.0)
+            matches.append(info)
+        if align:
+            matches.sort(key=lambda info: -info['alignment_score'])
+        return matches
+
+    def describe_sequence(self, sequence, approximate=None):
+        """شناسایی توالی (حتی اگر None باشد) با توصیف پیش‌فرض برای توالی ناشناخته
+
+        با approximate (پیش‌فرض: self.approximate) اگر تطبیق دقیق پیدا نشود
+        نزدیک‌ترین مرجع تقریبی با علامت approximate: True گزارش می‌شود.
+        """
+        if approximate is None:
+            approximate = self.approximate
+        match = self.identify_sequence(sequence)
+        if match is None and approximate:
+            hits = self.identify_approximate(sequence, limit=1)
+            match = dict(hits[0], approximate=True) if hits else None
+        return match or {
+            'name': 'Unknown Sequence',
+            'type': 'custom',
+            'description': 'User-provided sequence'
+        }
+
+    def _match_info(self, seq_id, position):
+        data = self.database[seq_id]
+        return {
+            'id': seq_id,
+            'name': data['name'],
+            'type': data['type'],
+            'description': data['description'],
+            'match_position': position
+        }
+
+    def add_observer(self, observer):
+        """افزودن ناظر اندازه‌گیری مراحل (StageObserver)؛ زمان‌سنجی را فعال می‌کند"""
+        return self.instrumentation.add_observer(observer)
+
+    def remove_observer(self, observer):
+        self.instrumentation.remove_observer(observer)
 
-    def detect_features(self, sequence):
+    def detect_features(self, sequence, analyses=None):
         """تشخیص ویژگی‌ها با مدیریت خطای کامل"""
         try:
-            if not isinstance(sequence, str):
-                raise ValueError("Input must be a string")
-                
-            sequence = sequence.upper()
-            if not all(c in 'ATCG' for c in sequence):
-                raise ValueError("Invalid DNA sequence")
-                
-            # شناسایی توالی (حتی اگر None باشد)
-            seq_info = self.identify_sequence(sequence) or {
-                'name': 'Unknown Sequence',
-                'type': 'custom',
-                'description': 'User-provided sequence'
-            }
-            
-            return {
-                'sequence_info': seq_info,  # این خط اضافه شد
-                'gc_content': self.calculate_gc_content(sequence),
-                'patterns': self.find_patterns(sequence),
-                'orf': self.find_open_reading_frames(sequence),
-                'repeats': self.find_repeats(sequence),
-                'hairpins': self.detect_hairpins(sequence),
-                'length': len(sequence)
-            }
+            return dict(self.iter_stages(sequence, analyses))
         except Exception as e:
             return {
                 'error': str(e),
@@ -63,66 +241,163 @@ class DNADetector:
                 }
             }
 
+    def iter_stages(self, sequence, analyses=None):
+        """اجرای مرحله‌به‌مرحله‌ی تحلیل؛ هر مرحله (نام، نتیجه) برمی‌گرداند"""
+        from analysis.packed_sequence import PackedSequence
+        analyses = ANALYSES if analyses is None else tuple(analyses)
+        unknown = set(analyses) - set(ANALYSES)
+        if unknown:
+            raise ValueError(f"Unknown analyses: {', '.join(sorted(unknown))}")
+
+        if not isinstance(sequence, (str, PackedSequence)):
+            raise ValueError("Input must be a string")
+
+        run = self.instrumentation.start_run(len(sequence))
+        status = 'cancelled'
+        try:
+            sequence = run.measure('validation', self._prepare, sequence)
+            yield 'sequence_info', run.measure('sequence_info', self.describe_sequence, sequence)
+            yield 'length', len(sequence)
+            yield 'gc_content', run.measure('gc_content', self.calculate_gc_content, sequence)
+
+            stages = {
+                'patterns': self.find_patterns,
+                'orf': self.find_open_reading_frames,
+                'repeats': self.find_repeats,
+                'hairpins': self.detect_hairpins
+            }
+            for name in ANALYSES:
+                if name in analyses:
+                    yield name, run.measure(name, stages[name], sequence)
+            status = None
+        except Exception as e:
+            run.fail(e)
+            status = None
+            raise
+        finally:
+            # بستن مولّد پیش از پایان (لغو در GUI) اجرا را cancelled گزارش می‌کند
+            run.finish(status)
+
+    def _prepare(self, sequence):
+        sequence = sequence.upper()
+        if not self._is_valid_dna(sequence):
+            raise ValueError("Invalid DNA sequence")
+        return sequence
+
+    def detect_features_batch(self, records, workers=None, chunk_size=16, ordered=True,
+                              analyses=None):
+        """تحلیل موازی تعداد زیادی توالی با ProcessPoolExecutor
+
+        records می‌تواند شامل رشته، PackedSequence یا زوج (نام، توالی) باشد.
+        خطای هر رکورد در نتیجه‌ی همان رکورد گزارش می‌شود و دسته متوقف نمی‌شود.
+        """
+        tasks = (
+            (*self._as_record(number, record), analyses)
+            for number, record in enumerate(records)
+        )
+        for (name, _, _), output, error in imap_bounded(
+                _analyze_in_worker, tasks, workers=workers, chunk_size=chunk_size,
+                ordered=ordered, shared=self):
+            if error is None:
+                result, summary = output
+                if summary is not None:
+                    self.instrumentation.publish(summary)
+            else:
+                result = {
+                    'error': error,
+                    'sequence_info': {
+                        'name': 'Error',
+                        'type': 'error',
+                        'description': 'Analysis failed'
+                    }
+                }
+            yield dict(result, id=name)
+
+    def _as_record(self, number, record):
+        if isinstance(record, tuple) and len(record) == 2:
+            return record
+        return number, record
+
+    def detect_features_stream(self, records, window=None, step=None):
+        """تحلیل تک‌تک رکوردهای (نام، توالی) یا پنجره‌های لغزان هر رکورد"""
+        for name, sequence in records:
+            if window is None:
+                yield dict(self.detect_features(sequence), id=name, offset=0)
+                continue
+            for start, chunk in sliding_windows(sequence, window, step):
+                yield dict(self.detect_features(chunk), id=name, offset=start)
+
+    def detect_features_file(self, file_path, window=None, step=None):
+        """تحلیل جریانی فایل FASTA/FASTQ بدون بارگذاری کامل آن در حافظه"""
+        if window is None:
+            yield from self.detect_features_stream(read_records(file_path))
+            return
+        for name, start, chunk in read_windows(file_path, window, step):
+            yield dict(self.detect_features(chunk), id=name, offset=start)
+
+    def _is_valid_dna(self, sequence):
+        from analysis.core_analysis import validate_dna_sequence
+        return validate_dna_sequence(sequence)
+
     def calculate_gc_content(self, sequence):
-        """محاسبه درصد GC"""
-        return round(gc_fraction(sequence) * 100, 2)
-
-    def find_patterns(self, sequence):
-        """یافتن الگوهای شناخته شده"""
-        found = {}
-        for name, pattern in self.common_patterns.items():
-            matches = pattern.finditer(sequence)
-            found[name] = [{'start': m.start(), 'end': m.end()} for m in matches]
+        """محاسبه درصد GC؛ مانند gc_fraction بیوپایتون بازهای مبهم (N و غیره) در طول حساب نمی‌شوند"""
+        from analysis.core_analysis import calculate_gc_content
+        return round(calculate_gc_content(sequence, exclude_ambiguous=True), 2)
+
+    def gc_profile(self, sequence, window=1000, step=None, tracks=None):
+        """پروفایل پنجره‌ای GC، skew، آنتروپی و CpG به جای یک عدد کلی
+
+        با tracks=None همه‌ی ردیف‌های TRACKS محاسبه می‌شوند.
+        """
+        from analysis.genome_tracks import TRACKS, genome_tracks
+        return genome_tracks(sequence, window, step, TRACKS if tracks is None else tracks)
+
+    def find_patterns(self, sequence, strands='both', overlapping=False):
+        """یافتن موتیف‌های کتابخانه روی هر دو رشته در یک جستجو"""
+        found = {name: [] for name in self.motifs.names()}
+        for hit in self.motifs.scan(sequence, strands=strands, overlapping=overlapping):
+            found[hit.pop('motif')].append(hit)
         return found
 
-    def find_open_reading_frames(self, sequence):
+    def find_open_reading_frames(self, sequence, min_length=0, table=1, alternative_starts=False,
+                                 both_strands=True):
         """یافتن چارچوب‌های خوانش باز"""
-        orfs = []
-        for frame in range(3):
-            trans = str(Seq(sequence[frame:]).translate())
-            start_pos = -1
-            for i, aa in enumerate(trans):
-                if aa == 'M' and start_pos == -1:
-                    start_pos = i
-                elif aa == '*' and start_pos != -1:
-                    orfs.append({
-                        'frame': frame + 1,
-                        'start': start_pos * 3 + frame,
-                        'end': i * 3 + 3 + frame,
-                        'length': (i - start_pos) * 3
-                    })
-                    start_pos = -1
-        return orfs
-
-    def find_repeats(self, sequence, min_length=4):
+        from analysis.orf_finder import OrfFinder
+        finder = OrfFinder(table=table, min_length=min_length,
+                           alternative_starts=alternative_starts, both_strands=both_strands)
+        return finder.find(sequence)
+
+    def scan_open_reading_frames(self, chunks, length=None, **options):
+        """اسکن جریانی ORFها روی قطعه‌های پشت سر هم یک توالی بلند"""
+        from analysis.orf_finder import OrfFinder
+        return OrfFinder(**options).scan_stream(chunks, length=length)
+
+    def find_repeats(self, sequence, min_length=4, max_results=None):
         """یافتن تکرارها"""
-        repeats = {}
-        for i in range(len(sequence) - min_length + 1):
-            substr = sequence[i:i+min_length]
-            if sequence.count(substr) > 1:
-                if substr not in repeats:
-                    repeats[substr] = []
-                repeats[substr].append(i)
-        return {k: v for k, v in repeats.items() if len(v) > 1}
-
-    def detect_hairpins(self, sequence, min_stem=5, min_loop=3):
+        return self.repeat_finder.find_kmer_repeats(sequence, min_length, max_results)
+
+    def classify_repeats(self, sequence, min_length=4, max_results=None):
+        """تکرارها به تفکیک پشت سر هم و پراکنده"""
+        return self.repeat_finder.classify_repeats(sequence, min_length, max_results)
+
+    def find_maximal_repeats(self, sequence, min_length=4, max_results=None):
+        """یافتن تکرارهای بیشینه"""
+        return self.repeat_finder.find_maximal_repeats(sequence, min_length, max_results)
+
+    def detect_hairpins(self, sequence, min_stem=5, min_loop=3, max_loop=50, max_mismatches=0):
         """تشخیص ساختارهای سنجاق‌سری"""
-        hairpins = []
-        comp = str(Seq(sequence).complement())
-        for i in range(len(sequence) - (2*min_stem + min_loop)):
-            for j in range(i+min_stem+min_loop, len(sequence)-min_stem):
-                stem1 = sequence[i:i+min_stem]
-                stem2 = comp[j:j+min_stem]
-                if stem1 == stem2[::-1]:
-                    hairpins.append({
-                        'start': i,
-                        'end': j+min_stem,
-                        'loop_start': i+min_stem,
-                        'loop_end': j
-                    })
-        return hairpins
-
-    def align_sequences(self, seq1, seq2):
-        """همترازی دو توالی"""
-        alignments = pairwise2.align.globalxx(seq1, seq2)
-        return alignments[0] if alignments else None
\ No newline at end of file
+        return self.hairpin_finder.find(sequence, min_stem, min_loop, max_loop, max_mismatches)
+
+    def align_sequences(self, seq1, seq2, mode='global', **scoring):
+        """همترازی دو توالی؛ خروجی شامل امتیاز، CIGAR و رشته‌های همترازشده
+
+        scoring پارامترهای SequenceAligner است (match، mismatch، open_gap،
+        extend_gap، matrix، band و xdrop).
+        """
+        from analysis.sequence_aligner import SequenceAligner
+        return SequenceAligner(mode, **scoring).align(seq1, seq2)
+
+    def align_to_targets(self, query, targets, mode='global', workers=None, **scoring):
+        """همترازی موازی یک توالی با تعداد زیادی توالی هدف"""
+        from analysis.sequence_aligner import SequenceAligner
+        return SequenceAligner(mode, **scoring).align_many(query, targets, workers=workers)
\ No newline at end of file
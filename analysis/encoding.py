@@ -0,0 +1,28 @@
+import numpy as np
+
+# کدگذاری عددی بازها: A=0, C=1, G=2, T=3 و هر نویسه‌ی دیگر N=4
+BASES = 'ACGT'
+N_CODE = 4
+
+_ENCODE_TABLE = np.full(256, N_CODE, dtype=np.uint8)
+for _code, _base in enumerate(BASES):
+    _ENCODE_TABLE[ord(_base)] = _code
+    _ENCODE_TABLE[ord(_base.lower())] = _code
+
+_DECODE_TABLE = np.frombuffer(b'ACGTN', dtype=np.uint8)
+
+
+def encode_sequence(sequence):
+    """تبدیل توالی به آرایه‌ی uint8 از کدهای ۰ تا ۴"""
+    if isinstance(sequence, np.ndarray):
+        return sequence
+    if hasattr(sequence, 'to_codes'):
+        return sequence.to_codes()
+    if isinstance(sequence, str):
+        sequence = sequence.encode('ascii', 'replace')
+    return _ENCODE_TABLE[np.frombuffer(bytes(sequence), dtype=np.uint8)]
+
+
+def decode_sequence(codes):
+    """تبدیل آرایه‌ی کدها به رشته‌ی DNA"""
+    return _DECODE_TABLE[np.asarray(codes, dtype=np.uint8)].tobytes().decode('ascii')
@@ -1,13 +1,283 @@
-from Bio.Restriction import RestrictionBatch, Analysis
+import heapq
+import math
+from functools import lru_cache
+from itertools import combinations
+
+import numpy as np
+
+from analysis.motif_engine import MotifLibrary
+from analysis.packed_sequence import as_text
+from analysis.parallel import imap_bounded
+
+# جریمه‌ی هر قطعه‌ی اضافه یا گم‌شده در مقایسه با الگوی هدف
+FRAGMENT_PENALTY = 1.0
+
+def _digest_in_worker(analyzer, task):
+    _, sequence, enzyme_sets, circular, target = task
+    return analyzer.digest_combinations(sequence, enzyme_sets, circular, target)
+
+
+def _enzyme_set(enzymes):
+    """نام آنزیم‌ها از نام، شیء Bio.Restriction یا مجموعه‌ای از آن‌ها"""
+    if isinstance(enzymes, str):
+        return (enzymes,)
+    if isinstance(enzymes, type):
+        return (str(enzymes),)
+    return tuple(str(enzyme) for enzyme in enzymes)
+
+
+@lru_cache(maxsize=8)
+def _compile(names):
+    """کامپایل یک‌باره‌ی جایگاه‌های شناسایی؛ بین همه‌ی نمونه‌ها مشترک است"""
+    from Bio.Restriction import AllEnzymes
+
+    library = MotifLibrary()
+    cuts = {}
+    for name in names:
+        enzyme = AllEnzymes.get(name)
+        # آنزیم‌های بدون محل برش مشخص قابل شبیه‌سازی نیستند
+        if enzyme.fst5 is None:
+            continue
+        library.add_iupac(name, enzyme.site)
+        forward = [enzyme.fst5] + ([enzyme.scd5] if enzyme.scd5 is not None else [])
+        backward = [-enzyme.fst3] + ([-enzyme.scd3] if enzyme.scd3 is not None else [])
+        if enzyme.is_palindromic():
+            # مانند Bio.Restriction جایگاه متقارن فقط روی رشته‌ی بالایی خوانده می‌شود
+            backward = []
+        cuts[name] = (enzyme.size, forward, backward, enzyme.ovhg)
+    return library, cuts
+
+
+def _default_enzymes():
+    from Bio.Restriction import CommOnly
+    return tuple(sorted(str(enzyme) for enzyme in CommOnly))
+
+
+def fragment_lengths(cuts, length, circular=False):
+    """طول قطعه‌ها از محل‌های برش مرتب (۰-مبنا، برش پیش از آن موقعیت)"""
+    cuts = np.asarray(cuts, dtype=np.int64)
+    if circular:
+        if len(cuts) == 0:
+            return np.array([length], dtype=np.int64)
+        return np.append(np.diff(cuts), length - cuts[-1] + cuts[0])
+    return np.diff(np.concatenate(([0], cuts, [length])))
+
+
+def pattern_distance(sizes, target):
+    """فاصله‌ی دو الگوی قطعه: جمع |log2| نسبت اندازه‌ها پس از جفت کردن مرتب
+
+    قطعه‌های بدون جفت هر کدام FRAGMENT_PENALTY هزینه دارند؛ جفت کردن با
+    برنامه‌ریزی پویا روی دو فهرست مرتب انجام می‌شود.
+    """
+    sizes = sorted(sizes, reverse=True)
+    target = sorted(target, reverse=True)
+    previous = [j * FRAGMENT_PENALTY for j in range(len(target) + 1)]
+    for i, size in enumerate(sizes, 1):
+        current = [i * FRAGMENT_PENALTY]
+        for j, wanted in enumerate(target, 1):
+            current.append(min(
+                previous[j - 1] + abs(math.log2(max(size, 1) / max(wanted, 1))),
+                previous[j] + FRAGMENT_PENALTY,
+                current[j - 1] + FRAGMENT_PENALTY,
+            ))
+        previous = current
+    return previous[-1]
+
 
 class EnzymeAnalyzer:
-    def find_cut_sites(self, dna_sequence):
+    """موتور برش آنزیم‌های محدودکننده
+
+    جایگاه‌های شناسایی همه‌ی آنزیم‌ها (پیش‌فرض: همه‌ی آنزیم‌های تجاری) یک
+    بار در یک کتابخانه‌ی موتیف کامپایل می‌شوند و هر توالی با یک جستجوی
+    هم‌زمان روی هر دو رشته برای همه‌ی آنزیم‌ها بررسی می‌شود. محل‌های برش
+    ۰-مبنا روی رشته‌ی بالایی هستند (برش پیش از آن باز)؛ find_cut_sites مانند
+    Bio.Restriction موقعیت ۱-مبنای اولین باز پس از برش را برمی‌گرداند.
+    """
+
+    def __init__(self, enzymes=None):
+        names = _default_enzymes() if enzymes is None else tuple(sorted(set(_enzyme_set(enzymes))))
+        self.library, self._cuts = _compile(names)
+        self.enzymes = tuple(name for name in names if name in self._cuts)
+
+    def cut_positions(self, sequence, enzymes=None, circular=False):
+        """محل‌های برش هر آنزیم: {نام: آرایه‌ی مرتب موقعیت‌ها}"""
+        text = as_text(sequence).upper()
+        length = len(text)
+        names = self.enzymes if enzymes is None else _enzyme_set(enzymes)
+        unknown = set(names) - set(self._cuts)
+        if unknown:
+            raise ValueError(f"Unknown enzymes: {', '.join(sorted(unknown))}")
+        if circular and length:
+            # جایگاه‌هایی که از مبدأ می‌گذرند با ادامه‌ی ابتدای توالی دیده می‌شوند
+            longest = max(self._cuts[name][0] for name in names) if names else 1
+            text += (text * (longest // length + 1))[:longest - 1]
+        positions = {name: [] for name in names}
+        for (name, strand), starts in self.library.locate(text, names=set(names)).items():
+            _, forward, backward, _ = self._cuts[name]
+            if circular:
+                starts = starts[starts < length]
+            offsets = forward if strand == '+' else backward
+            for offset in offsets:
+                positions[name].append(starts + offset)
+        cuts = {}
+        for name, found in positions.items():
+            found = np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+            if circular:
+                found = found % length if length else found
+            else:
+                # برش هر دو رشته باید درون توالی خطی باشد
+                crick = found - self._cuts[name][3]
+                found = found[(found > 0) & (found < length) & (crick > 0) & (crick < length)]
+            cuts[name] = np.unique(found)
+        return cuts
+
+    def find_cut_sites(self, dna_sequence, enzymes=None, circular=False):
         """یافتن محل برش آنزیم‌های محدودکننده"""
-        rb = RestrictionBatch(first=[], suppliers=["N"])
-        analyzer = Analysis(rb, dna_sequence)
-        return analyzer.full()
-
-    def optimize_digestion(self, sequence, enzymes):
-        """بهینه‌سازی شرایط هضم آنزیمی"""
-        # پیاده‌سازی منطق بهینه‌سازی
-        return optimal_conditions
\ No newline at end of file
+        return {
+            name: (found + 1).tolist()
+            for name, found in self.cut_positions(dna_sequence, enzymes, circular).items()
+        }
+
+    def digest(self, sequence, enzymes, circular=False):
+        """هضم با یک یا چند آنزیم؛ قطعه‌ها به ترتیب موقعیت روی توالی"""
+        enzymes = _enzyme_set(enzymes)
+        length = len(sequence)
+        return self._digest(self.cut_positions(sequence, enzymes, circular), enzymes, length,
+                            circular)
+
+    def _digest(self, cuts, enzymes, length, circular):
+        found = [cuts[name] for name in enzymes]
+        merged = np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+        sizes = fragment_lengths(merged, length, circular).tolist()
+        starts = merged.tolist() if circular else [0] + merged.tolist()
+        fragments = [
+            {'start': start, 'end': (start + size) % length if circular else start + size,
+             'length': size}
+            for start, size in zip(starts, sizes)
+        ]
+        if circular and not len(merged):
+            fragments = [{'start': 0, 'end': 0, 'length': length}]
+        return {
+            'enzymes': list(enzymes),
+            'circular': circular,
+            'cuts': (merged + 1).tolist(),
+            'fragments': fragments,
+        }
+
+    def digest_combinations(self, sequence, enzyme_sets, circular=False, target=None):
+        """هضم یک توالی با چند ترکیب آنزیمی با یک بار جستجوی جایگاه‌ها
+
+        اگر target (اندازه‌ی قطعه‌های مطلوب) داده شود هر هضم امتیاز score
+        (فاصله از الگو) می‌گیرد و خروجی بر اساس آن مرتب می‌شود.
+        """
+        enzyme_sets = [_enzyme_set(enzymes) for enzymes in enzyme_sets]
+        needed = sorted({name for enzymes in enzyme_sets for name in enzymes})
+        cuts = self.cut_positions(sequence, needed, circular)
+        digests = [self._digest(cuts, enzymes, len(sequence), circular) for enzymes in enzyme_sets]
+        if target is not None:
+            for digest in digests:
+                sizes = [fragment['length'] for fragment in digest['fragments']]
+                digest['score'] = round(pattern_distance(sizes, target), 4)
+            digests.sort(key=lambda digest: digest['score'])
+        return digests
+
+    def digest_batch(self, sequences, enzyme_sets, circular=False, target=None, workers=None,
+                     chunk_size=4, ordered=True):
+        """هضم تعداد زیادی توالی با ترکیب‌های آنزیمی در پردازه‌های موازی
+
+        sequences می‌تواند شامل رشته یا زوج (نام، توالی) باشد؛ خروجی برای هر
+        توالی {'id', 'digests'} یا {'id', 'error'} است.
+        """
+        enzyme_sets = [_enzyme_set(enzymes) for enzymes in enzyme_sets]
+        tasks = (
+            (*(record if isinstance(record, tuple) and len(record) == 2 else (number, record)),
+             enzyme_sets, circular, target)
+            for number, record in enumerate(sequences)
+        )
+        for task, digests, error in imap_bounded(
+                _digest_in_worker, tasks, workers=workers, chunk_size=chunk_size,
+                ordered=ordered, shared=self):
+            yield {'id': task[0], 'error': error} if error else {'id': task[0], 'digests': digests}
+
+    def rank_combinations(self, sequence, target, max_enzymes=2, circular=False, top=10,
+                          enzymes=None):
+        """بهترین ترکیب‌های تا max_enzymes آنزیم برای رسیدن به الگوی قطعه‌ی هدف
+
+        جایگاه‌ها یک بار جستجو می‌شوند و ترکیب‌ها فقط برش‌ها را ادغام
+        می‌کنند. آنزیم‌هایی که به تنهایی بیش از تعداد برش لازم برای الگو
+        برش می‌زنند کنار گذاشته می‌شوند.
+        """
+        length = len(sequence)
+        cuts = self.cut_positions(sequence, enzymes, circular)
+        needed = len(target) if circular else len(target) - 1
+        usable = sorted(name for name, found in cuts.items() if 0 < len(found) <= needed)
+        ranked = []
+        for count in range(1, max_enzymes + 1):
+            for chosen in combinations(usable, count):
+                merged = np.unique(np.concatenate([cuts[name] for name in chosen]))
+                sizes = fragment_lengths(merged, length, circular).tolist()
+                ranked.append((pattern_distance(sizes, target), chosen, sizes))
+        return [
+            {'enzymes': list(chosen), 'fragments': sizes, 'score': round(score, 4)}
+            for score, chosen, sizes in heapq.nsmallest(top, ranked, key=lambda item: item[0])
+        ]
+
+    def simulate_gel(self, lanes, min_size=100, max_size=20000, resolution=0.03):
+        """شبیه‌سازی ژل آگارز؛ مهاجرت با لگاریتم اندازه‌ی قطعه خطی فرض می‌شود
+
+        lanes دیکشنری {نام ستون: خروجی digest یا فهرست اندازه‌ها} است. position
+        فاصله‌ی نسبی از چاهک (۰ تا ۱) است؛ قطعه‌هایی که نسبت اندازه‌شان کمتر از
+        resolution باشد یک باند می‌شوند و intensity متناسب با جرم DNA است.
+        """
+        top, bottom = math.log10(max_size), math.log10(min_size)
+        gel = {}
+        for label, lane in lanes.items():
+            if isinstance(lane, dict):
+                lane = [fragment['length'] for fragment in lane['fragments']]
+            bands = []
+            for size in sorted(lane, reverse=True):
+                if bands and bands[-1]['sizes'][-1] <= size * (1 + resolution):
+                    bands[-1]['sizes'].append(size)
+                    continue
+                bands.append({'sizes': [size]})
+            for band in bands:
+                size = sum(band['sizes']) / len(band['sizes'])
+                position = (top - math.log10(max(size, 1))) / (top - bottom)
+                band['size'] = round(size)
+                band['position'] = round(min(max(position, 0.0), 1.0), 4)
+                band['intensity'] = sum(band['sizes'])
+            gel[label] = bands
+        return gel
+
+    def optimize_digestion(self, sequence, enzymes, circular=False):
+        """بهینه‌سازی شرایط هضم آنزیمی
+
+        دمای بهینه و غیرفعال‌سازی، تأمین‌کنندگان مشترک (برای بافر مشترک) و
+        حساسیت به متیلاسیون از داده‌های REBASE در Bio.Restriction خوانده
+        می‌شود؛ اگر دمای بهینه یکسان نباشد هضم ترتیبی پیشنهاد می‌شود.
+        """
+        from Bio.Restriction import AllEnzymes
+
+        enzymes = _enzyme_set(enzymes)
+        digest = self.digest(sequence, enzymes, circular)
+        cuts = self.cut_positions(sequence, enzymes, circular)
+        records = [AllEnzymes.get(name) for name in enzymes]
+        temperatures = sorted({enzyme.opt_temp for enzyme in records})
+        suppliers = set.intersection(*(set(enzyme.suppl) for enzyme in records)) if records else set()
+        if len(temperatures) <= 1:
+            order = [list(enzymes)]
+        else:
+            # هضم ترتیبی از دمای پایین به بالا
+            order = [[str(enzyme) for enzyme in records if enzyme.opt_temp == temperature]
+                     for temperature in temperatures]
+        return {
+            'enzymes': list(enzymes),
+            'simultaneous': len(order) == 1,
+            'order': order,
+            'temperatures': temperatures,
+            'inactivation': max((enzyme.inact_temp for enzyme in records), default=None),
+            'common_suppliers': sorted(suppliers),
+            'methylation_sensitive': [str(enzyme) for enzyme in records if enzyme.is_methylable()],
+            'missing_sites': [name for name in enzymes if not len(cuts[name])],
+            'fragments': [fragment['length'] for fragment in digest['fragments']],
+        }
\ No newline at end of file
@@ -0,0 +1,209 @@
+import numpy as np
+
+from analysis.encoding import N_CODE, encode_sequence
+from utils.file_io import iter_record_chunks
+
+# ترک‌های قابل محاسبه برای هر پنجره
+TRACKS = ('gc', 'gc_skew', 'at_skew', 'entropy', 'cpg_oe')
+
+# ستون‌های شمارش: A، C، G، T، N و دی‌نوکلئوتید CpG (به موقعیت G نسبت داده می‌شود)
+_A, _C, _G, _T, _N, _CPG = range(6)
+
+# اندازه‌ی قطعه‌های توالی درون حافظه
+_BLOCK = 1 << 20
+
+
+class _WindowCounter:
+    """شمارش بازها در پنجره‌های لغزان یک رکورد با جمع تجمعی قطعه‌به‌قطعه
+
+    برای هر قطعه فقط مقدار جمع پیشوندی در مرزهای پنجره‌ها نگه داشته
+    می‌شود، پس حافظه به طول قطعه و تعداد پنجره‌ها بستگی دارد نه طول
+    رکورد. چیدمان پنجره‌ها همان sliding_windows است.
+    """
+
+    def __init__(self, size, step=None):
+        if size <= 0 or (step is not None and step <= 0):
+            raise ValueError("Window size and step must be positive")
+        self.size = size
+        self.step = step or size
+        self.length = 0
+        self._carry = np.zeros(6, dtype=np.int64)
+        self._previous = N_CODE
+        self._starts = []
+        self._emitted = 0
+
+    def feed(self, chunk):
+        """افزودن یک قطعه؛ خروجی (شروع‌ها، پایان‌ها، شمارش‌ها) پنجره‌های کامل‌شده است"""
+        codes = encode_sequence(chunk)
+        end = self.length + len(codes)
+        # شروع پنجره‌ها در [length, end) و پایان‌ها در (length, end]
+        first = -(-self.length // self.step)
+        starts = np.arange(first, (end - 1) // self.step + 1, dtype=np.int64) * self.step
+        last = (end - self.size) // self.step
+        ends = np.arange(self._emitted, last + 1, dtype=np.int64) * self.step + self.size
+
+        previous = np.empty_like(codes)
+        previous[:1] = self._previous
+        previous[1:] = codes[:-1]
+        columns = [codes == code for code in range(N_CODE + 1)]
+        columns.append((previous == 1) & columns[_G])
+        start_prefix = np.empty((len(starts), 6), dtype=np.int64)
+        end_prefix = np.empty((len(ends), 6), dtype=np.int64)
+        totals = np.empty(6, dtype=np.int64)
+        for column, values in enumerate(columns):
+            # جمع پیشوندی انحصاری: cumulative[i] تعداد در [0, i) از این قطعه است
+            cumulative = np.zeros(len(codes) + 1, dtype=np.int64)
+            np.cumsum(values, out=cumulative[1:])
+            # CpG شروع پنجره تا خود موقعیت شروع حساب می‌شود تا جفت بریده‌شده کم شود
+            shift = 1 if column == _CPG else 0
+            start_prefix[:, column] = cumulative[starts - self.length + shift]
+            end_prefix[:, column] = cumulative[ends - self.length]
+            totals[column] = cumulative[-1]
+        self._starts.extend(start_prefix + self._carry)
+        batch = self._window_batch(ends, end_prefix + self._carry)
+
+        self.length = end
+        self._carry = self._carry + totals
+        if len(codes):
+            self._previous = codes[-1]
+        return batch
+
+    def _window_batch(self, ends, end_prefix):
+        if not len(ends):
+            return _empty_batch()
+        first = self._emitted
+        start_prefix = np.array(self._starts[:len(ends)])
+        del self._starts[:len(ends)]
+        self._emitted += len(ends)
+        starts = (first + np.arange(len(ends), dtype=np.int64)) * self.step
+        return starts, ends, end_prefix - start_prefix
+
+    def finish(self):
+        """پنجره‌ی کوتاه انتهایی (در صورت وجود) مانند sliding_windows"""
+        start = self._emitted * self.step
+        covered = (self._emitted - 1) * self.step + self.size if self._emitted else 0
+        if self.length <= max(start, covered) or not self._starts:
+            return _empty_batch()
+        counts = self._carry - self._starts[0]
+        return (np.array([start], dtype=np.int64), np.array([self.length], dtype=np.int64),
+                counts[np.newaxis])
+
+
+def _empty_batch():
+    return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros((0, 6), np.int64)
+
+
+def _ratio(numerator, denominator):
+    numerator = numerator.astype(float)
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator),
+                     where=denominator > 0)
+
+
+def window_statistics(counts, tracks=TRACKS):
+    """مقدار ترک‌ها از شمارش‌های پنجره‌ها؛ N در هیچ ترکی حساب نمی‌شود
+
+    gc درصد GC، gc_skew = (G-C)/(G+C)، at_skew = (A-T)/(A+T)، entropy
+    آنتروپی شانون بازها (بیت) و cpg_oe نسبت مشاهده به انتظار CpG است.
+    """
+    unknown = set(tracks) - set(TRACKS)
+    if unknown:
+        raise ValueError(f"Unknown tracks: {', '.join(sorted(unknown))}")
+    a, c, g, t, cpg = counts[:, _A], counts[:, _C], counts[:, _G], counts[:, _T], counts[:, _CPG]
+    called = a + c + g + t
+    values = {}
+    if 'gc' in tracks:
+        values['gc'] = _ratio(g + c, called) * 100
+    if 'gc_skew' in tracks:
+        values['gc_skew'] = _ratio(g - c, g + c)
+    if 'at_skew' in tracks:
+        values['at_skew'] = _ratio(a - t, a + t)
+    if 'entropy' in tracks:
+        frequencies = _ratio(counts[:, :N_CODE], called[:, np.newaxis])
+        logs = np.log2(frequencies, out=np.zeros_like(frequencies), where=frequencies > 0)
+        values['entropy'] = -(frequencies * logs).sum(axis=1)
+    if 'cpg_oe' in tracks:
+        values['cpg_oe'] = _ratio(cpg * called, c * g)
+    return values
+
+
+def _profile(batches, tracks):
+    starts, ends, counts = (np.concatenate(parts) for parts in zip(*batches))
+    return dict(window_statistics(counts, tracks), start=starts, end=ends)
+
+
+def genome_tracks(sequence, window, step=None, tracks=TRACKS):
+    """ترک‌های پنجره‌ای یک توالی در O(n) برای هر اندازه‌ی پنجره و گام
+
+    خروجی دیکشنری آرایه‌های start، end و یک آرایه برای هر ترک است.
+    """
+    codes = encode_sequence(sequence)
+    counter = _WindowCounter(window, step)
+    # قطعه‌های ثابت حافظه‌ی موقت جمع‌های تجمعی را مستقل از طول توالی نگه می‌دارد
+    batches = [counter.feed(codes[start:start + _BLOCK]) for start in range(0, len(codes), _BLOCK)]
+    batches.append(counter.finish())
+    return _profile(batches, tracks)
+
+
+def genome_tracks_file(file_path, window, step=None, tracks=TRACKS):
+    """ترک‌های هر رکورد یک فایل FASTA/FASTQ به صورت جریانی: (نام، پروفایل)
+
+    N حذف نمی‌شود تا مختصات پنجره‌ها با ژنوم یکی بماند.
+    """
+    current, name, counter, batches = None, None, None, []
+    for record, record_name, data in iter_record_chunks(file_path, alphabet='ACGTN'):
+        if record != current:
+            if counter is not None:
+                batches.append(counter.finish())
+                yield name, _profile(batches, tracks)
+            current, name = record, record_name
+            counter, batches = _WindowCounter(window, step), []
+        batches.append(counter.feed(data))
+    if counter is not None:
+        batches.append(counter.finish())
+        yield name, _profile(batches, tracks)
+
+
+def _intervals(profile, track, window, step):
+    """بازه‌های بدون هم‌پوشانی برای bedGraph/bigWig
+
+    با گام کوچک‌تر از پنجره، مقدار هر پنجره به بازه‌ای به طول گام در
+    میانه‌ی آن نسبت داده می‌شود.
+    """
+    starts, ends, values = profile['start'], profile['end'], profile[track]
+    if step is None or step >= window:
+        return starts, ends, values
+    lower = np.maximum((starts + ends) // 2 - step // 2, 0)
+    upper = np.minimum(lower + step, ends)
+    upper[:-1] = np.minimum(upper[:-1], lower[1:])
+    keep = upper > lower
+    return lower[keep], upper[keep], values[keep]
+
+
+def write_bedgraph(handle, chrom, profile, track, window, step=None, precision=4):
+    """نوشتن یک ترک به قالب bedGraph (مختصات صفرمبنا، پایان باز)"""
+    starts, ends, values = _intervals(profile, track, window, step)
+    values = np.round(values, precision)
+    for start, end, value in zip(starts.tolist(), ends.tolist(), values.tolist()):
+        handle.write(f"{chrom}\t{start}\t{end}\t{value:g}\n")
+    return len(values)
+
+
+def write_bigwig(path, profiles, track, window, step=None):
+    """نوشتن یک ترک همه‌ی رکوردها به bigWig (نیازمند pyBigWig)
+
+    profiles فهرست (نام، پروفایل) است؛ طول هر رکورد پایان آخرین پنجره‌ی آن است.
+    """
+    try:
+        import pyBigWig
+    except ImportError as error:
+        raise ImportError("bigWig output requires pyBigWig (pip install pyBigWig)") from error
+    profiles = [(name, profile) for name, profile in profiles if len(profile['end'])]
+    handle = pyBigWig.open(path, 'w')
+    try:
+        handle.addHeader([(name, int(profile['end'][-1])) for name, profile in profiles])
+        for name, profile in profiles:
+            starts, ends, values = _intervals(profile, track, window, step)
+            handle.addEntries([name] * len(starts), starts.tolist(), ends=ends.tolist(),
+                              values=values.astype(float).tolist())
+    finally:
+        handle.close()
@@ -0,0 +1,95 @@
+import numpy as np
+
+from analysis.encoding import N_CODE, encode_sequence
+from analysis.repeat_finder import MAX_PACKED_K, kmer_codes
+
+
+def reverse_complement_codes(codes):
+    """مکمل معکوس آرایه‌ی کدها؛ N بدون تغییر می‌ماند"""
+    return np.where(codes == N_CODE, N_CODE, 3 - codes)[::-1].astype(np.uint8)
+
+
+class HairpinFinder:
+    def __init__(self, min_stem=5, min_loop=3, max_loop=50, max_mismatches=0, max_results=None):
+        self.min_stem = min_stem
+        self.min_loop = min_loop
+        self.max_loop = max_loop
+        self.max_mismatches = max_mismatches
+        self.max_results = max_results
+
+    def find(self, sequence, min_stem=None, min_loop=None, max_loop=None,
+             max_mismatches=None):
+        """یافتن ساقه‌های مکمل معکوس با طول حلقه‌ی محدود"""
+        k = min_stem or self.min_stem
+        min_loop = self.min_loop if min_loop is None else min_loop
+        max_loop = self.max_loop if max_loop is None else max_loop
+        mismatches = self.max_mismatches if max_mismatches is None else max_mismatches
+        codes = encode_sequence(sequence)
+        if len(codes) < 2 * k + min_loop or max_loop < min_loop:
+            return []
+        if mismatches == 0 and k <= MAX_PACKED_K:
+            starts, loops, errors = self._exact_stems(codes, k, min_loop, max_loop)
+        else:
+            starts, loops, errors = self._tolerant_stems(codes, k, min_loop, max_loop, mismatches)
+        order = np.lexsort((loops, starts))
+        if self.max_results:
+            order = order[:self.max_results]
+        return [
+            {
+                'start': i,
+                'end': i + 2 * k + loop,
+                'loop_start': i + k,
+                'loop_end': i + k + loop,
+                'stem_length': k,
+                'mismatches': e
+            }
+            for i, loop, e in zip(starts[order].tolist(), loops[order].tolist(),
+                                  errors[order].tolist())
+        ]
+
+    def _exact_stems(self, codes, k, min_loop, max_loop):
+        # هر ساقه‌ی چپ با ساقه‌هایی جفت می‌شود که کد مکمل معکوسشان برابر است
+        forward, forward_valid = kmer_codes(codes, k)
+        backward, backward_valid = kmer_codes(reverse_complement_codes(codes), k)
+        backward, backward_valid = backward[::-1], backward_valid[::-1]
+        left = np.flatnonzero(forward_valid)
+        right = np.flatnonzero(backward_valid)
+        # فشرده‌سازی کدها به رتبه تا کلید (کد، موقعیت) در int64 جا شود
+        _, ranks = np.unique(np.concatenate((forward[left], backward[right])), return_inverse=True)
+        span = len(codes) + 1
+        right_keys = np.sort(ranks[len(left):].astype(np.int64) * span + right)
+        left_ranks = ranks[:len(left)].astype(np.int64) * span
+        base = left_ranks + left
+        lo = np.searchsorted(right_keys, base + k + min_loop)
+        hi = np.searchsorted(right_keys, np.minimum(base + k + max_loop, left_ranks + span - 1),
+                             side='right')
+        counts = np.maximum(hi - lo, 0)
+        starts = np.repeat(left, counts)
+        partner_index = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        partners = right_keys[np.repeat(lo, counts) + partner_index] % span
+        loops = partners - starts - k
+        return starts, loops, np.zeros(len(starts), dtype=np.int64)
+
+    def _tolerant_stems(self, codes, k, min_loop, max_loop, mismatches):
+        n = len(codes)
+        valid = codes != N_CODE
+        starts, loops, errors = [], [], []
+        for loop in range(min_loop, max_loop + 1):
+            count = n - 2 * k - loop + 1
+            if count <= 0:
+                break
+            errors_for_loop = np.zeros(count, dtype=np.int64)
+            for t in range(k):
+                left = codes[t:t + count]
+                right_start = 2 * k + loop - 1 - t
+                right = codes[right_start:right_start + count]
+                paired = valid[t:t + count] & valid[right_start:right_start + count] & (left + right == 3)
+                errors_for_loop += ~paired
+            hits = np.flatnonzero(errors_for_loop <= mismatches)
+            starts.append(hits)
+            loops.append(np.full(len(hits), loop, dtype=np.int64))
+            errors.append(errors_for_loop[hits])
+        if not starts:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty, empty
+        return np.concatenate(starts), np.concatenate(loops), np.concatenate(errors)
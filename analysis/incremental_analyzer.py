@@ -0,0 +1,374 @@
+import hashlib
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+
+import numpy as np
+
+from analysis.dna_detector import ANALYSES, STAGES
+from analysis.encoding import encode_sequence
+from analysis.hairpin_finder import HairpinFinder
+from analysis.motif_engine import STRANDS
+from analysis.orf_finder import OrfTracker
+from analysis.repeat_finder import kmer_codes
+
+def _common_prefix(first, second):
+    """طول پیشوند مشترک دو رشته با جستجوی دودویی روی startswith"""
+    lo, hi = 0, min(len(first), len(second))
+    if first.startswith(second[:hi]):
+        return hi
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if first.startswith(second[:mid]):
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+
+class AnalysisCache:
+    """کش LRU نتایج کامل تحلیل بر اساس هش محتوای توالی"""
+
+    def __init__(self, maxsize=32):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(sequence, analyses, revision=None):
+        """کلید نتیجه؛ revision (مثلاً DNADetector.revision) نتایج موتیف‌ها و مرجع‌های قدیمی را جدا می‌کند"""
+        digest = hashlib.sha1(sequence.encode('ascii', 'replace')).hexdigest()
+        return digest, tuple(analyses), revision
+
+    def get(self, key):
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, results):
+        self._entries[key] = results
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _KmerTable:
+    """جدول موقعیت همه‌ی k-merها به ترتیب اولین رخداد"""
+
+    def __init__(self, k):
+        self.k = k
+        self.table = {}
+
+    def extend(self, sequence, old_length):
+        start = max(0, old_length - self.k + 1)
+        values, valid = kmer_codes(encode_sequence(sequence[start:]), self.k)
+        positions = np.flatnonzero(valid)
+        if len(positions) == 0:
+            return
+        order = np.argsort(values[positions], kind='stable')
+        positions = positions[order]
+        sorted_values = values[positions]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_values[1:] != sorted_values[:-1])))
+        groups = np.split(positions + start, starts[1:])
+        # k-merهای جدید به ترتیب اولین رخداد به جدول اضافه می‌شوند
+        for group in sorted(groups, key=lambda group: group[0]):
+            first = int(group[0])
+            self.table.setdefault(sequence[first:first + self.k], []).extend(group.tolist())
+
+    def truncate(self, sequence, length):
+        for i in range(len(sequence) - self.k, max(length - self.k, -1), -1):
+            kmer = sequence[i:i + self.k]
+            positions = self.table.get(kmer)
+            if positions and positions[-1] == i:
+                positions.pop()
+                if not positions:
+                    del self.table[kmer]
+
+    def repeats(self, max_results=None):
+        repeats = {}
+        for kmer, positions in self.table.items():
+            if len(positions) > 1:
+                repeats[kmer] = list(positions)
+                if max_results and len(repeats) >= max_results:
+                    break
+        return repeats
+
+
+class _PatternTrack:
+    """برخوردهای بدون هم‌پوشانی یک موتیف روی یک رشته با مرز پیشروی
+
+    برای موتیف‌های با طول بیشینه‌ی w، برخورد در موقعیت p فقط به متن p تا
+    p + w بستگی دارد و با طول L نهایی است اگر p + w <= L؛ فقط بخش پس از
+    مرز دوباره جستجو می‌شود. موتیف‌های بی‌کران (ORF و عبارت‌های منظم
+    بی‌کران یا وابسته به متن اطراف) در هر تغییر کامل جستجو می‌شوند.
+    """
+
+    def __init__(self, library, motif, strand):
+        self.library = library
+        self.motif = motif
+        self.strand = strand
+        self.width = motif.width
+        self.matches = []
+        self.frontier = 0
+
+    def _scan(self, sequence, start=0):
+        hits = self.library.scan_motif(self.motif, sequence[start:], strands=self.strand)
+        for hit in hits:
+            del hit['motif']
+            hit['start'] += start
+            hit['end'] += start
+        return hits
+
+    def extend(self, sequence):
+        length = len(sequence)
+        if self.width is None:
+            self.matches = self.library.scan_motif(
+                self.motif, sequence, strands=self.strand, overlapping=False)
+            for hit in self.matches:
+                del hit['motif']
+            return
+        boundary = self.frontier
+        for hit in self._scan(sequence, self.frontier):
+            if hit['start'] < boundary:
+                continue
+            if hit['start'] + self.width > length:
+                break
+            self.matches.append(hit)
+            boundary = hit['end']
+        self.frontier = max(boundary, length - self.width + 1)
+
+    def truncate(self, length):
+        if self.width is None:
+            return
+        limit = length - self.width
+        while self.matches and self.matches[-1]['start'] > limit:
+            self.matches.pop()
+        last_end = self.matches[-1]['end'] if self.matches else 0
+        self.frontier = max(last_end, min(self.frontier, limit + 1))
+
+
+class _HairpinTrack:
+    """سنجاق‌سرها طول محدود دارند؛ هر تغییر فقط پنجره‌ی انتهایی را بررسی می‌کند
+
+    فهرست به ترتیب (شروع، حلقه) نگه داشته می‌شود؛ سنجاق‌سرهای تحت تأثیر هر
+    ویرایش همه در انتهای فهرست هستند.
+    """
+
+    def __init__(self, min_stem=5, min_loop=3, max_loop=50, max_mismatches=0):
+        self.finder = HairpinFinder(min_stem, min_loop, max_loop, max_mismatches)
+        self.span = 2 * min_stem + max_loop
+        self.hairpins = []
+        self.starts = []
+
+    def _tail(self, start):
+        index = bisect_left(self.starts, start)
+        tail = self.hairpins[index:]
+        del self.hairpins[index:]
+        del self.starts[index:]
+        return tail
+
+    def _push(self, hairpins):
+        for hairpin in sorted(hairpins, key=lambda hairpin: (hairpin['start'], hairpin['loop_end'])):
+            self.hairpins.append(hairpin)
+            self.starts.append(hairpin['start'])
+
+    def extend(self, sequence, old_length):
+        start = max(0, old_length + 1 - self.span)
+        found = [
+            hairpin for hairpin in self.finder.find(sequence[start:])
+            if hairpin['end'] + start > old_length
+        ]
+        for hairpin in found:
+            for key in ('start', 'end', 'loop_start', 'loop_end'):
+                hairpin[key] += start
+        self._push(self._tail(start) + found)
+
+    def truncate(self, length):
+        tail = self._tail(length + 1 - self.span)
+        self._push([hairpin for hairpin in tail if hairpin['end'] <= length])
+
+    def found(self, max_results=None):
+        return self.hairpins[:max_results] if max_results else list(self.hairpins)
+
+
+class IncrementalAnalyzer:
+    """تحلیل افزایشی توالی‌ای که در انتهای ۳′ ویرایش می‌شود
+
+    وضعیت GC، جدول k-merها، اسکن ORF، مرز تطبیق الگوها و سنجاق‌سرها با هر
+    افزودن یا حذف از انتها به‌روز می‌شود، پس هزینه‌ی هر تحلیل متناسب با
+    اندازه‌ی ویرایش است. نتایج کامل توالی‌های تکراری از کش LRU خوانده می‌شوند.
+    رابط iter_stages همانند DNADetector است و می‌تواند جای آن استفاده شود.
+    """
+
+    def __init__(self, detector, cache_size=32, repeat_length=4):
+        self.detector = detector
+        self.cache = AnalysisCache(cache_size)
+        self.repeat_length = repeat_length
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """پاک کردن کل وضعیت افزایشی"""
+        # وضعیت برای این نسخه از موتیف‌ها و مرجع‌های آشکارساز ساخته می‌شود
+        self._revision = self.detector.revision
+        self.sequence = ""
+        self._gc = 0
+        self._invalid = 0
+        self._identity = None
+        self._kmers = _KmerTable(self.repeat_length)
+        self._orfs = OrfTracker()
+        library = self.detector.motifs
+        self._patterns = [
+            _PatternTrack(library, motif, strand) for motif in library for strand in STRANDS
+        ]
+        self._hairpins = _HairpinTrack()
+
+    def append(self, bases):
+        """افزودن باز(ها) به انتهای ۳′"""
+        with self._lock:
+            self._extend(self.sequence + bases.upper())
+
+    def pop(self, count=1):
+        """حذف باز(ها) از انتهای ۳′"""
+        with self._lock:
+            self._truncate(max(0, len(self.sequence) - count))
+
+    def sync(self, sequence):
+        """هم‌گام‌سازی با توالی جدید؛ فقط تفاوت انتهای ۳′ پردازش می‌شود"""
+        with self._lock:
+            self._sync(sequence.upper())
+
+    def _sync(self, sequence):
+        if self.detector.revision != self._revision:
+            # موتیف یا مرجع جدید: مسیرهای الگو و شناسایی از نو ساخته می‌شوند
+            self.reset()
+        if sequence == self.sequence:
+            return
+        common = _common_prefix(sequence, self.sequence)
+        if common < len(self.sequence) // 2:
+            # ویرایش در ابتدای توالی: ساخت دوباره ارزان‌تر از کوتاه کردن است
+            self.reset()
+        elif common < len(self.sequence):
+            self._truncate(common)
+        if len(sequence) > len(self.sequence):
+            self._extend(sequence)
+
+    def _extend(self, sequence):
+        old_length = len(self.sequence)
+        added = sequence[old_length:]
+        gc = added.count('G') + added.count('C')
+        self._gc += gc
+        self._invalid += len(added) - gc - added.count('A') - added.count('T')
+        self._kmers.extend(sequence, old_length)
+        self._orfs.extend(sequence)
+        for track in self._patterns:
+            track.extend(sequence)
+        self._hairpins.extend(sequence, old_length)
+        self._identity = None
+        self.sequence = sequence
+
+    def _truncate(self, length):
+        removed = self.sequence[length:]
+        gc = removed.count('G') + removed.count('C')
+        self._gc -= gc
+        self._invalid -= len(removed) - gc - removed.count('A') - removed.count('T')
+        self._kmers.truncate(self.sequence, length)
+        self._orfs.truncate(length)
+        self.sequence = self.sequence[:length]
+        self._orfs.extend(self.sequence)
+        for track in self._patterns:
+            track.truncate(length)
+            track.extend(self.sequence)
+        self._hairpins.truncate(length)
+        self._identity = None
+
+    def iter_stages(self, sequence, analyses=None):
+        """همان مراحل DNADetector.iter_stages با به‌روزرسانی افزایشی و کش"""
+        if not isinstance(sequence, str):
+            yield from self.detector.iter_stages(sequence, analyses)
+            return
+        analyses = ANALYSES if analyses is None else tuple(analyses)
+        unknown = set(analyses) - set(ANALYSES)
+        if unknown:
+            raise ValueError(f"Unknown analyses: {', '.join(sorted(unknown))}")
+        sequence = sequence.upper()
+        key = self.cache.key(sequence, analyses, self.detector.revision)
+        run = self.detector.instrumentation.start_run(len(sequence))
+        with self._lock:
+            cached = self.cache.get(key)
+        if cached is not None:
+            run.finish('cached')
+            yield from cached.items()
+            return
+
+        results = {}
+        status = 'cancelled'
+        try:
+            for name in STAGES:
+                if name in ANALYSES and name not in analyses:
+                    continue
+                # هر مرحله جداگانه قفل می‌گیرد تا کارگر لغوشده قفل را نگه ندارد
+                with self._lock:
+                    # زمان به‌روزرسانی افزایشی جدا گزارش می‌شود؛ پس از مرحله‌ی اول
+                    # فقط ویرایش هم‌زمان از رشته‌ی دیگر کاری برای sync می‌گذارد
+                    if results:
+                        self._sync(sequence)
+                    else:
+                        run.measure('sync', self._sync, sequence)
+                    value = run.measure(name, self._stage, name)
+                results[name] = value
+                yield name, value
+            status = None
+        except Exception as e:
+            run.fail(e)
+            status = None
+            raise
+        finally:
+            run.finish(status)
+        with self._lock:
+            self.cache.put(key, results)
+
+    def detect_features(self, sequence, analyses=None):
+        """مانند DNADetector.detect_features"""
+        try:
+            return dict(self.iter_stages(sequence, analyses))
+        except Exception as e:
+            return {
+                'error': str(e),
+                'sequence_info': {
+                    'name': 'Error',
+                    'type': 'error',
+                    'description': 'Analysis failed'
+                }
+            }
+
+    def _stage(self, name):
+        if self._invalid:
+            raise ValueError("Invalid DNA sequence")
+        length = len(self.sequence)
+        if name == 'sequence_info':
+            if self._identity is None:
+                self._identity = self.detector.describe_sequence(self.sequence)
+            return self._identity
+        if name == 'length':
+            return length
+        if name == 'gc_content':
+            return round(self._gc / length * 100, 2) if length else 0
+        if name == 'patterns':
+            found = {name: [] for name in self.detector.motifs.names()}
+            for track in self._patterns:
+                found[track.motif.name].extend(track.matches)
+            for hits in found.values():
+                hits.sort(key=lambda hit: (hit['start'], hit['end'], hit['strand']))
+            return found
+        if name == 'orf':
+            return self._orfs.orfs(length)
+        if name == 'repeats':
+            return self._kmers.repeats(self.detector.repeat_finder.max_results)
+        return self._hairpins.found(self.detector.hairpin_finder.max_results)
@@ -0,0 +1,403 @@
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+
+# متغیر محیطی فعال‌سازی: 1 یا true برای زمان‌سنجی، یا فهرست جداشده با کاما از
+# timing، profile و memory (مثلاً DNA_INSTRUMENT=profile,memory)
+ENV_VAR = 'DNA_INSTRUMENT'
+
+# مرز بالای دسته‌های طول ورودی؛ برچسب هر دسته مرز بالای آن است
+SIZE_CLASSES = ((1_000, '1k'), (10_000, '10k'), (100_000, '100k'), (1_000_000, '1M'),
+                (10_000_000, '10M'))
+
+
+def parse_options(value):
+    """گزینه‌های فعال از مقدار متغیر محیطی؛ None یعنی غیرفعال
+
+    گزینه‌ی ناشناخته با هشدار نادیده گرفته می‌شود تا مقدار نادرست متغیر
+    محیطی ساخت آشکارساز را متوقف نکند.
+    """
+    value = (value or '').strip().lower()
+    if value in ('', '0', 'false', 'no', 'off'):
+        return None
+    options = {'timing'}
+    for option in value.split(','):
+        option = option.strip()
+        if option in ('profile', 'memory'):
+            options.add(option)
+        elif option not in ('1', 'true', 'yes', 'on', 'timing'):
+            warnings.warn(f"Ignoring unknown {ENV_VAR} option: {option}", RuntimeWarning)
+    return options
+
+
+def size_class(length):
+    """برچسب دسته‌ی طول ورودی، مثلاً '10k' برای 1001 تا 10000 باز"""
+    for bound, label in SIZE_CLASSES:
+        if length <= bound:
+            return label
+    return f">{SIZE_CLASSES[-1][1]}"
+
+
+def count_results(value):
+    """تعداد موارد گزارش‌شده‌ی یک مرحله؛ برای مقدارهای عددی و توصیفی None"""
+    if isinstance(value, (list, tuple)):
+        return len(value)
+    if isinstance(value, dict) and value and all(
+            isinstance(item, (list, tuple)) for item in value.values()):
+        return sum(len(item) for item in value.values())
+    return None
+
+
+def _profile_top(profiler, limit):
+    stats = pstats.Stats(profiler)
+    rows = sorted(stats.stats.items(), key=lambda item: -item[1][3])[:limit]
+    return [{
+        'function': f"{os.path.basename(filename)}:{line}({name})",
+        'calls': calls,
+        'seconds': round(total, 6),
+        'cumulative': round(cumulative, 6),
+    } for (filename, line, name), (_, calls, total, cumulative, _) in rows]
+
+
+class StageObserver:
+    """پایه‌ی ناظرهای اندازه‌گیری؛ هر دو متد به طور پیش‌فرض کاری نمی‌کنند
+
+    stage_finished برای هر مرحله یک دیکشنری با stage، seconds، size،
+    size_class، results و در صورت فعال بودن peak_bytes و profile می‌گیرد.
+    run_finished خلاصه‌ی کل اجرا را با فهرست همین رکوردها در stages، status
+    (ok، error، cancelled یا cached) و در صورت خطا error و failed_stage می‌گیرد.
+    """
+
+    def stage_finished(self, record):
+        pass
+
+    def run_finished(self, summary):
+        pass
+
+
+class _NullRun:
+    """اجرای بدون اندازه‌گیری؛ هزینه‌ی اضافه فقط یک فراخوانی تابع است"""
+
+    def measure(self, name, function, *args):
+        return function(*args)
+
+    def fail(self, error):
+        pass
+
+    def finish(self, status=None):
+        pass
+
+
+_NULL_RUN = _NullRun()
+
+
+class StageRun:
+    """اندازه‌گیری مراحل یک اجرای تحلیل روی یک توالی
+
+    tracemalloc سراسری است؛ در اجرای هم‌زمان چند رشته اوج حافظه‌ی هر
+    مرحله شامل تخصیص‌های رشته‌های دیگر هم می‌شود.
+    """
+
+    def __init__(self, instrumentation, size):
+        self.instrumentation = instrumentation
+        self.size = size
+        self.size_class = size_class(size)
+        self.stages = []
+        self.error = None
+        self.failed_stage = None
+        self._current = None
+        self._started = time.perf_counter()
+        self._finished = False
+
+    def measure(self, name, function, *args):
+        """اجرای function(*args) به عنوان مرحله‌ی name و گزارش آن به ناظرها"""
+        instrumentation = self.instrumentation
+        self._current = name
+        profiler = cProfile.Profile() if instrumentation.profile else None
+        tracing = instrumentation.memory and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        elif instrumentation.memory:
+            tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0] if instrumentation.memory else 0
+        start = time.perf_counter()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            try:
+                value = function(*args)
+            finally:
+                if profiler is not None:
+                    profiler.disable()
+            seconds = time.perf_counter() - start
+            record = {
+                'stage': name,
+                'seconds': seconds,
+                'size': self.size,
+                'size_class': self.size_class,
+                'results': count_results(value),
+            }
+            if instrumentation.memory:
+                record['peak_bytes'] = max(0, tracemalloc.get_traced_memory()[1] - baseline)
+        finally:
+            if tracing:
+                tracemalloc.stop()
+        if profiler is not None:
+            record['profile'] = _profile_top(profiler, instrumentation.profile_limit)
+        self._current = None
+        self.stages.append(record)
+        instrumentation.dispatch('stage_finished', record)
+        return value
+
+    def fail(self, error):
+        """ثبت خطای اجرا و مرحله‌ای که در آن رخ داد"""
+        self.error = f"{type(error).__name__}: {error}"
+        self.failed_stage = self._current
+
+    def finish(self, status=None):
+        """پایان اجرا و گزارش خلاصه؛ فراخوانی دوباره اثری ندارد"""
+        if self._finished:
+            return
+        self._finished = True
+        if status is None:
+            status = 'error' if self.error is not None else 'ok'
+        summary = {
+            'size': self.size,
+            'size_class': self.size_class,
+            'seconds': time.perf_counter() - self._started,
+            'status': status,
+            'stages': self.stages,
+        }
+        if self.error is not None:
+            summary.update(error=self.error, failed_stage=self.failed_stage)
+        self.instrumentation.dispatch('run_finished', summary)
+
+
+class Instrumentation:
+    """تنظیمات اندازه‌گیری و ناظرهای یک آشکارساز
+
+    enabled، profile و memory با None از متغیر محیطی DNA_INSTRUMENT خوانده
+    می‌شوند. افزودن ناظر زمان‌سنجی را هم فعال می‌کند.
+    """
+
+    def __init__(self, enabled=None, profile=None, memory=None, profile_limit=15):
+        options = parse_options(os.environ.get(ENV_VAR)) or set()
+        self.enabled = 'timing' in options if enabled is None else bool(enabled)
+        self.profile = 'profile' in options if profile is None else bool(profile)
+        self.memory = 'memory' in options if memory is None else bool(memory)
+        self.profile_limit = profile_limit
+        self.observers = []
+        self._local = threading.local()
+
+    def __getstate__(self):
+        # ناظرها (فایل‌ها، قفل‌ها) به پردازه‌های کارگر فرستاده نمی‌شوند؛
+        # نتیجه‌ی کارگرها با recording جمع و در پردازه‌ی اصلی منتشر می‌شود
+        state = dict(self.__dict__)
+        state['enabled'] = self.active
+        state['observers'] = []
+        del state['_local']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @property
+    def active(self):
+        return self.enabled or self.profile or self.memory or bool(self.observers)
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+        return observer
+
+    def remove_observer(self, observer):
+        self.observers.remove(observer)
+
+    def start_run(self, size):
+        """شروع اندازه‌گیری یک اجرا؛ اگر غیرفعال باشد اجرای بی‌اثر برمی‌گردد"""
+        if not self.active:
+            return _NULL_RUN
+        return StageRun(self, size)
+
+    def dispatch(self, event, payload):
+        recorded = getattr(self._local, 'recorded', None)
+        if recorded is not None:
+            if event == 'run_finished':
+                recorded.append(payload)
+            return
+        for observer in list(self.observers):
+            try:
+                getattr(observer, event)(payload)
+            except Exception as error:
+                # خطای ناظر (مثلاً نوشتن فایل) نباید نتیجه‌ی تحلیل را خراب کند
+                warnings.warn(f"Instrumentation observer {observer!r} failed: {error}",
+                              RuntimeWarning)
+
+    @contextmanager
+    def recording(self):
+        """جمع کردن خلاصه‌ی اجراهای این رشته به جای ارسال به ناظرها
+
+        برای تحلیل دسته‌ای: کارگر خلاصه‌ها را برمی‌گرداند و publish آن‌ها
+        را در پردازه‌ی اصلی به ناظرها می‌رساند.
+        """
+        previous = getattr(self._local, 'recorded', None)
+        self._local.recorded = recorded = []
+        try:
+            yield recorded
+        finally:
+            self._local.recorded = previous
+
+    def publish(self, summary):
+        """ارسال خلاصه‌ی یک اجرای ضبط‌شده (و مراحل آن) به ناظرها"""
+        for record in summary['stages']:
+            self.dispatch('stage_finished', record)
+        self.dispatch('run_finished', summary)
+
+
+class MetricsCollector(StageObserver):
+    """تجمیع زمان، تعداد نتایج و حافظه‌ی هر مرحله به تفکیک دسته‌ی طول ورودی
+
+    خروجی به صورت JSON یا قالب متنی Prometheus (برای textfile collector)
+    قابل نوشتن است و hot_stages پرهزینه‌ترین مراحل را نشان می‌دهد.
+    """
+
+    def __init__(self, prefix='dna_detector'):
+        self.prefix = prefix
+        self.stages = {}
+        self.runs = {}
+        self.functions = {}
+        self._lock = threading.Lock()
+
+    def stage_finished(self, record):
+        key = (record['stage'], record['size_class'])
+        with self._lock:
+            entry = self.stages.setdefault(key, {
+                'count': 0, 'seconds': 0.0, 'max_seconds': 0.0, 'bases': 0, 'results': 0,
+                'peak_bytes': 0,
+            })
+            entry['count'] += 1
+            entry['seconds'] += record['seconds']
+            entry['max_seconds'] = max(entry['max_seconds'], record['seconds'])
+            entry['bases'] += record['size']
+            entry['results'] += record['results'] or 0
+            entry['peak_bytes'] = max(entry['peak_bytes'], record.get('peak_bytes', 0))
+            for row in record.get('profile', ()):
+                function = self.functions.setdefault((record['stage'], row['function']),
+                                                     {'calls': 0, 'cumulative': 0.0})
+                function['calls'] += row['calls']
+                function['cumulative'] += row['cumulative']
+
+    def run_finished(self, summary):
+        with self._lock:
+            entry = self.runs.setdefault(summary['size_class'], {
+                'count': 0, 'seconds': 0.0, 'statuses': {}, 'failed_stages': {},
+            })
+            entry['count'] += 1
+            entry['seconds'] += summary['seconds']
+            entry['statuses'][summary['status']] = entry['statuses'].get(summary['status'], 0) + 1
+            if summary.get('failed_stage'):
+                stage = summary['failed_stage']
+                entry['failed_stages'][stage] = entry['failed_stages'].get(stage, 0) + 1
+
+    def hot_stages(self, size_class=None, limit=None):
+        """مراحل به ترتیب کل زمان صرف‌شده، در یک دسته‌ی طول یا همه‌ی دسته‌ها"""
+        totals = {}
+        with self._lock:
+            for (stage, label), entry in self.stages.items():
+                if size_class is None or label == size_class:
+                    totals[stage] = totals.get(stage, 0.0) + entry['seconds']
+        grand_total = sum(totals.values())
+        ranked = sorted(totals.items(), key=lambda item: -item[1])[:limit]
+        return [{'stage': stage, 'seconds': seconds,
+                 'share': seconds / grand_total if grand_total else 0.0}
+                for stage, seconds in ranked]
+
+    def snapshot(self):
+        """وضعیت فعلی به صورت دیکشنری قابل تبدیل به JSON"""
+        with self._lock:
+            stages = [dict(entry, stage=stage, size_class=label)
+                      for (stage, label), entry in sorted(self.stages.items())]
+            runs = [dict(entry, size_class=label) for label, entry in sorted(self.runs.items())]
+            functions = sorted(
+                (dict(entry, stage=stage, function=function)
+                 for (stage, function), entry in self.functions.items()),
+                key=lambda entry: -entry['cumulative'])
+        return {'stages': stages, 'runs': runs, 'functions': functions,
+                'hot_stages': self.hot_stages()}
+
+    def to_json(self, **options):
+        return json.dumps(self.snapshot(), **options)
+
+    def to_prometheus(self):
+        """متریک‌ها در قالب متنی Prometheus"""
+        prefix = self.prefix
+        lines = []
+
+        def metric(name, kind, text, samples):
+            lines.append(f"# HELP {prefix}_{name} {text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in samples:
+                rendered = ','.join(f'{key}="{label}"' for key, label in labels.items())
+                lines.append(f"{prefix}_{name}{{{rendered}}} {value:g}" if rendered
+                             else f"{prefix}_{name} {value:g}")
+
+        snapshot = self.snapshot()
+        stage_labels = [({'stage': entry['stage'], 'size_class': entry['size_class']}, entry)
+                        for entry in snapshot['stages']]
+        metric('stage_runs_total', 'counter', "Executions of each analysis stage",
+               [(labels, entry['count']) for labels, entry in stage_labels])
+        metric('stage_seconds_total', 'counter', "Wall time spent in each analysis stage",
+               [(labels, entry['seconds']) for labels, entry in stage_labels])
+        metric('stage_seconds_max', 'gauge', "Slowest single execution of each stage",
+               [(labels, entry['max_seconds']) for labels, entry in stage_labels])
+        metric('stage_bases_total', 'counter', "Bases processed by each stage",
+               [(labels, entry['bases']) for labels, entry in stage_labels])
+        metric('stage_results_total', 'counter', "Items reported by each stage",
+               [(labels, entry['results']) for labels, entry in stage_labels])
+        if any(entry['peak_bytes'] for _, entry in stage_labels):
+            metric('stage_peak_bytes', 'gauge', "Largest traced allocation peak of each stage",
+                   [(labels, entry['peak_bytes']) for labels, entry in stage_labels])
+        metric('runs_total', 'counter', "Analysis runs by outcome",
+               [({'size_class': entry['size_class'], 'status': status}, count)
+                for entry in snapshot['runs'] for status, count in sorted(entry['statuses'].items())])
+        metric('run_seconds_total', 'counter', "Wall time of whole analysis runs",
+               [({'size_class': entry['size_class']}, entry['seconds'])
+                for entry in snapshot['runs']])
+        metric('stage_failures_total', 'counter', "Runs that failed in each stage",
+               [({'stage': stage, 'size_class': entry['size_class']}, count)
+                for entry in snapshot['runs'] for stage, count in sorted(entry['failed_stages'].items())])
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path):
+        _write_atomic(path, self.to_json(indent=2) + '\n')
+
+    def write_prometheus(self, path):
+        """نوشتن اتمی فایل .prom تا collector هرگز فایل نیمه‌کاره نخواند"""
+        _write_atomic(path, self.to_prometheus())
+
+
+class JSONLinesObserver(StageObserver):
+    """نوشتن خلاصه‌ی هر اجرا به صورت یک خط JSON در handle"""
+
+    def __init__(self, handle):
+        self.handle = handle
+        self._lock = threading.Lock()
+
+    def run_finished(self, summary):
+        line = json.dumps(summary)
+        with self._lock:
+            self.handle.write(line + '\n')
+            self.handle.flush()
+
+
+def _write_atomic(path, text):
+    temporary = f"{path}.tmp"
+    with open(temporary, 'w') as handle:
+        handle.write(text)
+    os.replace(temporary, path)
@@ -0,0 +1,364 @@
+import re
+from itertools import product
+
+import numpy as np
+
+try:
+    from re import _parser as _regex_parser
+except ImportError:  # پایتون ۳.۱۰ و قدیمی‌تر
+    import sre_parse as _regex_parser
+
+from analysis.encoding import BASES, N_CODE, encode_sequence
+from analysis.hairpin_finder import reverse_complement_codes
+from analysis.orf_finder import _codon_mask, codon_indices
+from analysis.packed_sequence import as_text
+from analysis.repeat_finder import MAX_PACKED_K, kmer_codes
+
+# کدهای IUPAC و بازهای متناظر
+IUPAC_CODES = {
+    'A': 'A', 'C': 'C', 'G': 'G', 'T': 'T', 'U': 'T',
+    'R': 'AG', 'Y': 'CT', 'S': 'CG', 'W': 'AT', 'K': 'GT', 'M': 'AC',
+    'B': 'CGT', 'D': 'AGT', 'H': 'ACT', 'V': 'ACG', 'N': 'ACGT'
+}
+
+# بیشترین تعداد کلمه‌ی حاصل از باز کردن یک الگوی IUPAC؛ بیشتر از آن با ماسک بیتی جستجو می‌شود
+MAX_EXPANSION = 4096
+
+STRANDS = ('+', '-')
+
+# خطای گرد کردن جمع امتیاز ستون‌ها؛ بدون آن با threshold=1 خود توالی اجماع هم رد می‌شد
+_SCORE_TOLERANCE = 1e-9
+
+# عملگرهایی که نتیجه‌ی تطبیق را به متن بیرون از خود تطبیق وابسته می‌کنند
+_CONTEXT_OPS = {_regex_parser.ASSERT, _regex_parser.ASSERT_NOT, _regex_parser.AT,
+                _regex_parser.GROUPREF, _regex_parser.GROUPREF_EXISTS}
+
+
+def _depends_on_context(node):
+    if isinstance(node, _regex_parser.SubPattern):
+        return any(op in _CONTEXT_OPS or _depends_on_context(av) for op, av in node)
+    if isinstance(node, (tuple, list)):
+        return any(_depends_on_context(item) for item in node)
+    return False
+
+
+def pattern_width(pattern):
+    """بیشترین طولی که هر تلاش تطبیق می‌خواند؛ None برای الگوهای بی‌کران"""
+    parsed = _regex_parser.parse(pattern.pattern, pattern.flags)
+    if _depends_on_context(parsed):
+        return None
+    width = parsed.getwidth()[1]
+    return None if width >= _regex_parser.MAXREPEAT else width
+
+
+def _window_valid(codes, k):
+    n_runs = np.concatenate(([0], np.cumsum(codes == N_CODE)))
+    return (n_runs[k:] - n_runs[:len(codes) - k + 1]) == 0
+
+
+class Motif:
+    """یک موتیف کتابخانه؛ kind یکی از words، mask، regex، pwm یا orf است"""
+
+    def __init__(self, name, kind, data, width=None, threshold=None):
+        self.name = name
+        self.kind = kind
+        self.data = data
+        self.width = width
+        self.threshold = threshold
+
+    def __repr__(self):
+        return f"Motif({self.name!r}, kind={self.kind!r}, width={self.width})"
+
+
+class MotifLibrary:
+    """کتابخانه‌ی موتیف‌ها با جستجوی هم‌زمان هر دو رشته
+
+    کلمه‌های حاصل از الگوهای IUPAC (و مکمل معکوسشان برای رشته‌ی منفی) در
+    یک جدول مرتب از کدهای دو بیتی جمع می‌شوند و برای هر طول فقط یک گذر
+    برداری روی توالی لازم است؛ این معادل خودکاره‌ی Aho-Corasick برای
+    کلمه‌های هم‌طول است. PWMها با جمع برداری امتیاز ستون‌ها، عبارت‌های
+    منظم با re و ORFها با اسکن کدون خطی جستجو می‌شوند.
+
+    خروجی هر جستجو دیکشنری‌های motif، start، end و strand (و score برای
+    PWM) با مختصات رشته‌ی مثبت است. در حالت بدون هم‌پوشانی، برای هر موتیف
+    و رشته از چپ به راست اولین برخورد انتخاب می‌شود؛ برای عبارت‌های منظم
+    روی رشته‌ی مثبت این همان نتیجه‌ی finditer است.
+    """
+
+    def __init__(self):
+        self.motifs = []
+        self._tables = None
+        # با افزودن هر موتیف عوض می‌شود تا وضعیت‌های وابسته بازسازی شوند
+        self.revision = 0
+
+    def __len__(self):
+        return len(self.motifs)
+
+    def __iter__(self):
+        return iter(self.motifs)
+
+    def names(self):
+        return [motif.name for motif in self.motifs]
+
+    def _add(self, motif):
+        self.motifs.append(motif)
+        self._tables = None
+        self.revision += 1
+        return motif
+
+    def add_iupac(self, name, pattern):
+        """موتیف رشته‌ای با کدهای IUPAC (مثلاً TATAWAWR)"""
+        pattern = pattern.upper()
+        unknown = set(pattern) - set(IUPAC_CODES)
+        if unknown:
+            raise ValueError(f"Invalid IUPAC characters: {', '.join(sorted(unknown))}")
+        choices = [IUPAC_CODES[c] for c in pattern]
+        expansion = int(np.prod([len(c) for c in choices], dtype=float))
+        if len(pattern) <= MAX_PACKED_K and expansion <= MAX_EXPANSION:
+            words = [''.join(word) for word in product(*choices)]
+            return self._add(Motif(name, 'words', words, width=len(pattern)))
+        masks = np.array([sum(1 << BASES.index(b) for b in c) for c in choices], dtype=np.uint8)
+        return self._add(Motif(name, 'mask', masks, width=len(pattern)))
+
+    def add_regex(self, name, pattern, flags=0):
+        """موتیف عبارت منظم"""
+        compiled = re.compile(pattern, flags) if isinstance(pattern, str) else pattern
+        return self._add(Motif(name, 'regex', compiled, width=pattern_width(compiled)))
+
+    def add_pwm(self, name, counts, threshold=0.8, min_score=None, pseudocount=0.5,
+                background=None):
+        """موتیف ماتریس وزن موقعیت از شمارش‌ها (سطرهای A، C، G، T)
+
+        threshold کسری از فاصله‌ی کمینه تا بیشینه‌ی امتیاز است؛ min_score
+        آستانه‌ی مطلق امتیاز log-odds را مستقیماً تعیین می‌کند.
+        """
+        if isinstance(counts, dict):
+            counts = [counts[base] for base in BASES]
+        counts = np.asarray(counts, dtype=float)
+        if counts.ndim != 2 or counts.shape[0] != 4:
+            raise ValueError("PWM counts must have four rows (A, C, G, T)")
+        background = np.full(4, 0.25) if background is None else np.asarray(background, dtype=float)
+        frequencies = (counts + pseudocount) / (counts.sum(axis=0) + 4 * pseudocount)
+        matrix = np.log2(frequencies / background[:, None])
+        if min_score is None:
+            low, high = matrix.min(axis=0).sum(), matrix.max(axis=0).sum()
+            min_score = low + threshold * (high - low)
+        return self._add(Motif(name, 'pwm', matrix, width=matrix.shape[1], threshold=min_score))
+
+    def add_orf(self, name='orf', start_codons=('ATG',), stop_codons=('TAA', 'TAG', 'TGA')):
+        """از هر کدون شروع تا اولین کدون پایان هم‌چارچوب؛ معادل خطی عبارت ORF قبلی"""
+        masks = (_codon_mask(start_codons), _codon_mask(stop_codons))
+        return self._add(Motif(name, 'orf', masks))
+
+    def load_jaspar(self, path, threshold=0.8, fmt='jaspar'):
+        """بارگذاری PWMهای یک فایل JASPAR؛ نام هر موتیف «شناسه نام» است"""
+        from Bio import motifs
+
+        loaded = []
+        with open(path) as handle:
+            for record in motifs.parse(handle, fmt):
+                name = ' '.join(part for part in (record.matrix_id, record.name) if part)
+                counts = [list(record.counts[base]) for base in BASES]
+                loaded.append(self.add_pwm(name, counts, threshold=threshold))
+        return loaded
+
+    def scan(self, sequence, strands='both', overlapping=True, names=None):
+        """جستجوی همه‌ی موتیف‌ها (یا فقط names) روی یک یا هر دو رشته"""
+        selected = {i for i, motif in enumerate(self.motifs) if names is None or motif.name in names}
+        return self._scan(sequence, strands, overlapping, selected)
+
+    def scan_motif(self, motif, sequence, strands='both', overlapping=True):
+        """جستجوی فقط یک موتیف از کتابخانه"""
+        return self._scan(sequence, strands, overlapping, {self.motifs.index(motif)})
+
+    def locate(self, sequence, strands='both', names=None):
+        """موقعیت شروع همه‌ی برخوردها (با هم‌پوشانی) به صورت آرایه
+
+        خروجی {(نام موتیف، رشته): آرایه‌ی مرتب شروع‌ها} است؛ برای
+        پردازش‌های حجیم که به دیکشنری جداگانه برای هر برخورد نیازی ندارند.
+        """
+        text = as_text(sequence).upper()
+        if strands not in ('both', '+', '-'):
+            raise ValueError(f"Unknown strands option: {strands}")
+        wanted = STRANDS if strands == 'both' else (strands,)
+        selected = {i for i, motif in enumerate(self.motifs) if names is None or motif.name in names}
+        codes = encode_sequence(text)
+        rc_codes = reverse_complement_codes(codes) if '-' in wanted else None
+        located = {}
+        for (index, strand), (starts, _, _) in self._candidates(
+                text, codes, rc_codes, wanted, selected).items():
+            located[self.motifs[index].name, strand] = np.sort(starts)
+        return located
+
+    def _scan(self, sequence, strands, overlapping, selected):
+        text = as_text(sequence).upper()
+        if strands not in ('both', '+', '-'):
+            raise ValueError(f"Unknown strands option: {strands}")
+        wanted = STRANDS if strands == 'both' else (strands,)
+        codes = encode_sequence(text)
+        rc_codes = reverse_complement_codes(codes) if '-' in wanted else None
+        hits = []
+        for (index, strand), (starts, ends, scores) in self._candidates(
+                text, codes, rc_codes, wanted, selected).items():
+            order = np.lexsort((ends, starts))
+            starts, ends = starts[order], ends[order]
+            scores = scores[order] if scores is not None else None
+            keep = range(len(starts)) if overlapping else _non_overlapping(starts, ends)
+            name = self.motifs[index].name
+            for i in keep:
+                hit = {'motif': name, 'start': int(starts[i]), 'end': int(ends[i]), 'strand': strand}
+                if scores is not None:
+                    hit['score'] = round(float(scores[i]), 3)
+                hits.append(hit)
+        hits.sort(key=lambda hit: (hit['start'], hit['end'], hit['motif'], hit['strand']))
+        return hits
+
+    def _candidates(self, text, codes, rc_codes, strands, selected):
+        found = {}
+        n = len(codes)
+        for k, (values, owners, signs) in self._word_tables().items():
+            if n < k:
+                continue
+            kmers, valid = kmer_codes(codes, k)
+            positions = np.flatnonzero(valid)
+            kmers = kmers[positions]
+            lo = np.searchsorted(values, kmers, side='left')
+            hi = np.searchsorted(values, kmers, side='right')
+            counts = hi - lo
+            positions = np.repeat(positions, counts)
+            entries = np.repeat(lo, counts) + np.arange(counts.sum()) \
+                - np.repeat(np.cumsum(counts) - counts, counts)
+            # گروه‌بندی برخوردها بر اساس (موتیف، رشته) با یک مرتب‌سازی، نه یک گذر برای هر موتیف
+            keys = owners[entries] * 2 + (signs[entries] < 0)
+            wanted = np.isin(owners[entries], list(selected))
+            if '+' not in strands:
+                wanted &= signs[entries] < 0
+            if '-' not in strands:
+                wanted &= signs[entries] > 0
+            keys, positions = keys[wanted], positions[wanted]
+            order = np.argsort(keys, kind='stable')
+            keys, positions = keys[order], positions[order]
+            bounds = np.flatnonzero(np.diff(keys)) + 1
+            for key, chosen in zip(keys[np.concatenate(([0], bounds))].tolist() if len(keys) else [],
+                                   np.split(positions, bounds)):
+                found[key // 2, STRANDS[key % 2]] = (chosen, chosen + k, None)
+
+        for index in sorted(selected):
+            motif = self.motifs[index]
+            if motif.kind == 'words':
+                continue
+            for strand in strands:
+                source = codes if strand == '+' else rc_codes
+                if motif.kind == 'mask':
+                    starts, ends, scores = self._mask_hits(motif, source)
+                elif motif.kind == 'pwm':
+                    starts, ends, scores = self._pwm_hits(motif, source)
+                elif motif.kind == 'orf':
+                    starts, ends, scores = self._orf_hits(motif, source)
+                else:
+                    source_text = text if strand == '+' else _reverse_complement_text(text)
+                    starts, ends, scores = self._regex_hits(motif, source_text)
+                if strand == '-':
+                    starts, ends = n - ends, n - starts
+                if len(starts):
+                    found[index, strand] = (starts, ends, scores)
+        return found
+
+    def _word_tables(self):
+        # جدول مرتب کد k-merها برای هر طول: (کدها، اندیس موتیف، رشته)
+        if self._tables is None:
+            grouped = {}
+            for index, motif in enumerate(self.motifs):
+                if motif.kind != 'words':
+                    continue
+                codes = np.array([encode_sequence(word) for word in motif.data], dtype=np.uint8)
+                forward = _word_codes(codes)
+                backward = _word_codes(3 - codes[:, ::-1])
+                entry = grouped.setdefault(motif.width, ([], [], []))
+                for values, sign in ((forward, 1), (backward, -1)):
+                    entry[0].append(values)
+                    entry[1].append(np.full(len(values), index))
+                    entry[2].append(np.full(len(values), sign, dtype=np.int8))
+            self._tables = {}
+            for k, (values, owners, signs) in grouped.items():
+                values = np.concatenate(values)
+                order = np.argsort(values, kind='stable')
+                self._tables[k] = (values[order], np.concatenate(owners)[order],
+                                   np.concatenate(signs)[order])
+        return self._tables
+
+    def _mask_hits(self, motif, codes):
+        k = motif.width
+        count = len(codes) - k + 1
+        if count <= 0:
+            return _empty()
+        bits = np.where(codes == N_CODE, 0, 1 << (codes & 3)).astype(np.uint8)
+        ok = np.ones(count, dtype=bool)
+        for offset, mask in enumerate(motif.data.tolist()):
+            ok &= (bits[offset:offset + count] & mask) != 0
+        starts = np.flatnonzero(ok)
+        return starts, starts + k, None
+
+    def _pwm_hits(self, motif, codes):
+        k = motif.width
+        count = len(codes) - k + 1
+        if count <= 0:
+            return _empty()
+        scores = np.zeros(count)
+        for offset in range(k):
+            scores += motif.data[codes[offset:offset + count] & 3, offset]
+        starts = np.flatnonzero(_window_valid(codes, k) & (scores >= motif.threshold - _SCORE_TOLERANCE))
+        return starts, starts + k, scores[starts]
+
+    def _orf_hits(self, motif, codes):
+        start_mask, stop_mask = motif.data
+        codons = codon_indices(codes)
+        positions = np.arange(len(codons))
+        starts, ends = [], []
+        for phase in range(3):
+            in_phase = positions % 3 == phase
+            stops = positions[in_phase & stop_mask[codons]]
+            begins = positions[in_phase & start_mask[codons]]
+            nearest = np.searchsorted(stops, begins + 3)
+            closed = nearest < len(stops)
+            starts.append(begins[closed])
+            ends.append(stops[nearest[closed]] + 3)
+        return np.concatenate(starts), np.concatenate(ends), None
+
+    def _regex_hits(self, motif, text):
+        # lookahead برای دیدن تطبیق هر موقعیت، حتی اگر با تطبیق قبلی هم‌پوشان باشد
+        wrapped = re.compile(f"(?=({motif.data.pattern}))", motif.data.flags)
+        spans = [match.span(1) for match in wrapped.finditer(text)]
+        spans = [(start, end) for start, end in spans if end > start]
+        starts = np.array([start for start, _ in spans], dtype=np.int64)
+        ends = np.array([end for _, end in spans], dtype=np.int64)
+        return starts, ends, None
+
+
+def _empty():
+    return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), None
+
+
+def _word_codes(codes):
+    values = np.zeros(len(codes), dtype=np.uint64)
+    for column in range(codes.shape[1]):
+        values = (values << np.uint64(2)) | codes[:, column].astype(np.uint64)
+    return values
+
+
+_COMPLEMENT = str.maketrans('ACGTN', 'TGCAN')
+
+
+def _reverse_complement_text(text):
+    return text.translate(_COMPLEMENT)[::-1]
+
+
+def _non_overlapping(starts, ends):
+    """انتخاب حریصانه‌ی اولین برخوردهای بدون هم‌پوشانی از چپ به راست"""
+    keep = []
+    boundary = -1
+    for i, (start, end) in enumerate(zip(starts.tolist(), ends.tolist())):
+        if start >= boundary:
+            keep.append(i)
+            boundary = end
+    return keep
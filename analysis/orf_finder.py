@@ -0,0 +1,273 @@
+import numpy as np
+
+from analysis.encoding import N_CODE, encode_sequence
+
+# اندیس کدون‌های دارای N
+INVALID_CODON = 64
+
+# فاصله‌ی نقاط بازگشت OrfTracker (بر حسب کدون)
+CHECKPOINT_INTERVAL = 1 << 13
+
+
+def codon_indices(codes):
+    """اندیس ۰ تا ۶۳ هر کدون شروع‌شده از هر موقعیت؛ کدون‌های دارای N برابر ۶۴"""
+    codes = np.asarray(codes, dtype=np.uint8)
+    if len(codes) < 3:
+        return np.zeros(0, dtype=np.uint8)
+    index = (codes[:-2] & 3) * 16 + (codes[1:-1] & 3) * 4 + (codes[2:] & 3)
+    has_n = (codes[:-2] == N_CODE) | (codes[1:-1] == N_CODE) | (codes[2:] == N_CODE)
+    index[has_n] = INVALID_CODON
+    return index.astype(np.uint8)
+
+
+def _codon_mask(codons, reverse=False):
+    mask = np.zeros(INVALID_CODON + 1, dtype=bool)
+    for codon in codons:
+        codes = encode_sequence(codon)
+        if reverse:
+            codes = 3 - codes[::-1]
+        mask[int(codes[0]) * 16 + int(codes[1]) * 4 + int(codes[2])] = True
+    return mask
+
+
+class OrfFinder:
+    def __init__(self, table=1, min_length=0, start_codons=None, alternative_starts=False,
+                 both_strands=True):
+        from Bio.Data import CodonTable
+
+        codon_table = CodonTable.unambiguous_dna_by_id[table]
+        if start_codons is None:
+            start_codons = codon_table.start_codons if alternative_starts else ['ATG']
+        self.table = table
+        self.min_length = min_length
+        self.both_strands = both_strands
+        self.start_codons = list(start_codons)
+        self.stop_codons = list(codon_table.stop_codons)
+        self._start = _codon_mask(self.start_codons)
+        self._stop = _codon_mask(self.stop_codons)
+        self._reverse_start = _codon_mask(self.start_codons, reverse=True)
+        self._reverse_stop = _codon_mask(self.stop_codons, reverse=True)
+
+    def find(self, sequence):
+        """یافتن ORFها در شش چارچوب خوانش"""
+        orfs = list(self.scan_stream([sequence], length=len(sequence)))
+        orfs.sort(key=_orf_order)
+        return orfs
+
+    def scan_stream(self, chunks, length=None):
+        """اسکن جریانی قطعه‌به‌قطعه؛ ORFها به محض بسته شدن برگردانده می‌شوند
+
+        چارچوب رشته‌ی معکوس به طول کل توالی بستگی دارد؛ اگر length داده نشود
+        ORFهای رشته‌ی معکوس تا پایان جریان نگه داشته می‌شوند.
+        """
+        state = _ScanState()
+        carry = np.zeros(0, dtype=np.uint8)
+        offset = 0
+        held = []
+        for chunk in chunks:
+            codes = np.concatenate((carry, encode_sequence(chunk)))
+            found = self._scan_chunk(codon_indices(codes), offset, state)
+            carry = codes[-2:] if len(codes) >= 2 else codes
+            offset += len(codes) - len(carry)
+            for orf in sorted(found, key=lambda orf: orf['start']):
+                if orf['strand'] == '-' and length is None:
+                    held.append(orf)
+                else:
+                    yield self._finish(orf, length)
+        total = offset + len(carry)
+        if self.both_strands:
+            for phase in range(3):
+                last_stop, last_start = state.reverse[phase]
+                if last_stop is not None and last_start is not None:
+                    held.append(self._reverse_orf(last_stop, last_start))
+        for orf in sorted(held, key=lambda orf: orf['start']):
+            if orf['end'] - orf['start'] - 3 >= self.min_length:
+                yield self._finish(orf, total)
+
+    def _scan_chunk(self, codons, offset, state):
+        positions = np.arange(offset, offset + len(codons))
+        phases = positions % 3
+        is_stop = self._stop[codons]
+        is_start = self._start[codons]
+        found = []
+        for phase in range(3):
+            in_phase = phases == phase
+            stops = positions[in_phase & is_stop]
+            starts = positions[in_phase & is_start]
+            found.extend(self._forward_phase(phase, stops, starts, state))
+        if self.both_strands:
+            is_stop = self._reverse_stop[codons]
+            is_start = self._reverse_start[codons]
+            for phase in range(3):
+                in_phase = phases == phase
+                stops = positions[in_phase & is_stop]
+                starts = positions[in_phase & is_start]
+                found.extend(self._reverse_phase(phase, stops, starts, state))
+        return [orf for orf in found if orf['end'] - orf['start'] - 3 >= self.min_length]
+
+    def _forward_phase(self, phase, stops, starts, state):
+        open_start, boundary = state.forward[phase]
+        orfs = []
+        if len(stops):
+            # اولین کدون شروع پس از هر کدون پایان در همان چارچوب
+            begins = np.concatenate(([boundary], stops[:-1] + 3))
+            first = np.searchsorted(starts, begins)
+            candidates = np.append(starts, np.iinfo(np.int64).max)[first]
+            if open_start is not None:
+                candidates[0] = open_start
+            closed = candidates < stops
+            orfs = [
+                {'strand': '+', 'start': s, 'end': e + 3}
+                for s, e in zip(candidates[closed].tolist(), stops[closed].tolist())
+            ]
+            open_start, boundary = None, int(stops[-1]) + 3
+        if open_start is None:
+            first = np.searchsorted(starts, boundary)
+            if first < len(starts):
+                open_start = int(starts[first])
+        state.forward[phase] = (open_start, boundary)
+        return orfs
+
+    def _reverse_phase(self, phase, stops, starts, state):
+        last_stop, last_start = state.reverse[phase]
+        orfs = []
+        if len(stops):
+            # در رشته‌ی معکوس نزدیک‌ترین کدون شروع به کدون پایان سمت راست انتخاب می‌شود
+            lefts = stops[:-1]
+            rights = stops[1:]
+            nearest = np.searchsorted(starts, rights) - 1
+            if last_stop is not None:
+                candidate = starts[starts < stops[0]]
+                if len(candidate):
+                    last_start = int(candidate[-1])
+                if last_start is not None:
+                    orfs.append(self._reverse_orf(last_stop, last_start))
+            if len(lefts):
+                chosen = starts[np.maximum(nearest, 0)] if len(starts) else np.zeros(0, np.int64)
+                closed = (nearest >= 0) & (chosen > lefts) if len(starts) else np.zeros(0, bool)
+                orfs.extend(
+                    self._reverse_orf(s, a)
+                    for s, a in zip(lefts[closed].tolist(), chosen[closed].tolist())
+                )
+            last_stop, last_start = int(stops[-1]), None
+        if last_stop is not None:
+            after = starts[starts > last_stop]
+            if len(after):
+                last_start = int(after[-1])
+        state.reverse[phase] = (last_stop, last_start)
+        return orfs
+
+    def _reverse_orf(self, stop, start):
+        return {'strand': '-', 'start': stop, 'end': start + 3}
+
+    def _finish(self, orf, length):
+        start, end = orf['start'], orf['end']
+        if orf['strand'] == '+':
+            frame = start % 3 + 1
+        else:
+            frame = -((length - end) % 3 + 1)
+        return {
+            'frame': frame,
+            'strand': orf['strand'],
+            'start': start,
+            'end': end,
+            'length': end - start - 3
+        }
+
+
+def _orf_order(orf):
+    return orf['strand'] == '-', abs(orf['frame']), orf['start']
+
+
+class OrfTracker:
+    """اسکن افزایشی ORF برای توالی‌ای که از انتهای ۳′ بلند یا کوتاه می‌شود
+
+    وضعیت اسکن در فواصل منظم ذخیره می‌شود تا کوتاه شدن توالی فقط بخش
+    انتهایی را دوباره اسکن کند. ORFها در شش دسته (رشته و فاز) نگه داشته
+    می‌شوند که هر کدام به ترتیب شروع مرتب است، پس خروجی مرتب بدون
+    مرتب‌سازی دوباره ساخته می‌شود.
+    """
+
+    def __init__(self, finder=None):
+        self.finder = finder or OrfFinder()
+        self.reset()
+
+    def reset(self):
+        self.state = _ScanState()
+        self.scanned = 0
+        # ORFهای خام هر دسته و نسخه‌ی نهایی آن‌ها؛ چارچوب ORFهای معکوس به طول
+        # توالی بستگی دارد پس برای هر سه باقی‌مانده‌ی طول جداگانه نگه داشته می‌شود
+        self.forward = [[] for _ in range(3)]
+        self.reverse = [[] for _ in range(3)]
+        self._forward_done = [[] for _ in range(3)]
+        self._reverse_done = [[[] for _ in range(3)] for _ in range(3)]
+        self.checkpoints = [(0, self.state.copy(), (0,) * 6)]
+
+    def extend(self, sequence):
+        """اسکن کدون‌های جدید انتهای sequence"""
+        target = len(sequence) - 2
+        while self.scanned < target:
+            stop = min(target, (self.scanned // CHECKPOINT_INTERVAL + 1) * CHECKPOINT_INTERVAL)
+            codons = codon_indices(encode_sequence(sequence[self.scanned:stop + 2]))
+            found = self.finder._scan_chunk(codons, self.scanned, self.state)
+            for orf in sorted(found, key=lambda orf: orf['start']):
+                buckets = self.forward if orf['strand'] == '+' else self.reverse
+                buckets[orf['start'] % 3].append(orf)
+            self.scanned = stop
+            if stop % CHECKPOINT_INTERVAL == 0:
+                self.checkpoints.append((stop, self.state.copy(), self._sizes()))
+
+    def _sizes(self):
+        return tuple(len(bucket) for bucket in self.forward + self.reverse)
+
+    def truncate(self, length):
+        """بازگشت به آخرین نقطه‌ی ذخیره پیش از طول جدید"""
+        target = max(0, length - 2)
+        if self.scanned <= target:
+            return
+        while self.checkpoints[-1][0] > target:
+            self.checkpoints.pop()
+        scanned, state, sizes = self.checkpoints[-1]
+        self.state = state.copy()
+        self.scanned = scanned
+        for phase in range(3):
+            del self.forward[phase][sizes[phase]:]
+            del self._forward_done[phase][sizes[phase]:]
+            del self.reverse[phase][sizes[3 + phase]:]
+            for done in self._reverse_done[phase]:
+                del done[sizes[3 + phase]:]
+
+    def orfs(self, length):
+        """ORFهای توالی فعلی به همان ترتیب OrfFinder.find"""
+        orfs = []
+        for phase in range(3):
+            orfs.extend(self._finished(self.forward[phase], self._forward_done[phase], length))
+        if self.finder.both_strands:
+            # چارچوب معکوس فاز p برابر -((length - p) % 3 + 1) است
+            for phase in sorted(range(3), key=lambda phase: (length - phase) % 3):
+                done = self._reverse_done[phase][(length - phase) % 3]
+                orfs.extend(self._finished(self.reverse[phase], done, length))
+                last_stop, last_start = self.state.reverse[phase]
+                if last_stop is not None and last_start is not None:
+                    orf = self.finder._reverse_orf(last_stop, last_start)
+                    if orf['end'] - orf['start'] - 3 >= self.finder.min_length:
+                        orfs.append(self.finder._finish(orf, length))
+        return orfs
+
+    def _finished(self, raw, done, length):
+        done.extend(self.finder._finish(orf, length) for orf in raw[len(done):])
+        return done
+
+
+class _ScanState:
+    def __init__(self):
+        # برای هر چارچوب مستقیم: (کدون شروع باز، ابتدای بخش پس از آخرین پایان)
+        self.forward = [(None, phase) for phase in range(3)]
+        # برای هر چارچوب معکوس: (آخرین کدون پایان، راست‌ترین کدون شروع پس از آن)
+        self.reverse = [(None, None) for _ in range(3)]
+
+    def copy(self):
+        state = _ScanState()
+        state.forward = list(self.forward)
+        state.reverse = list(self.reverse)
+        return state
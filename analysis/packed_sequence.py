@@ -0,0 +1,190 @@
+import os
+
+import numpy as np
+
+from analysis.encoding import N_CODE, decode_sequence, encode_sequence
+
+_MAGIC = b'DNA2BIT\x00'
+_VERSION = 1
+_HEADER_SIZE = 32
+_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+
+
+def _pack(codes):
+    padded = np.zeros((len(codes) + 3) // 4 * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes & 3
+    quads = padded.reshape(-1, 4)
+    return (quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)).astype(np.uint8)
+
+
+def _mask_runs(codes):
+    is_n = np.concatenate(([False], codes == N_CODE, [False]))
+    edges = np.flatnonzero(is_n[1:] != is_n[:-1])
+    return edges[0::2].astype(np.int64), edges[1::2].astype(np.int64)
+
+
+class PackedSequence:
+    """توالی فشرده‌ی دو بیتی با جدول جانبی N و امکان نگاشت حافظه"""
+
+    def __init__(self, packed, length, mask_starts=None, mask_ends=None, path=None):
+        self.packed = packed
+        self.mask_starts = np.zeros(0, np.int64) if mask_starts is None else mask_starts
+        self.mask_ends = np.zeros(0, np.int64) if mask_ends is None else mask_ends
+        self.path = path
+        self._total = length
+        self._start = 0
+        self._stop = length
+        self._reverse = False
+        self._complement = False
+
+    @classmethod
+    def from_string(cls, sequence):
+        """ساخت توالی فشرده از رشته یا آرایه‌ی کدها"""
+        codes = encode_sequence(sequence)
+        starts, ends = _mask_runs(codes)
+        return cls(_pack(codes), len(codes), starts, ends)
+
+    @classmethod
+    def open(cls, path):
+        """باز کردن فایل ذخیره‌شده به صورت memmap و بدون خواندن کامل آن"""
+        with open(path, 'rb') as handle:
+            header = handle.read(_HEADER_SIZE)
+        if header[:8] != _MAGIC:
+            raise ValueError(f"{path} is not a packed DNA file")
+        length, mask_count = np.frombuffer(header[16:32], dtype='<u8').tolist()
+        offset = _HEADER_SIZE
+        mask = np.memmap(path, dtype='<i8', mode='r', offset=offset, shape=(2, mask_count)) \
+            if mask_count else np.zeros((2, 0), np.int64)
+        offset += 16 * mask_count
+        packed = np.memmap(path, dtype=np.uint8, mode='r', offset=offset,
+                           shape=((length + 3) // 4,)) if length else np.zeros(0, np.uint8)
+        return cls(packed, length, mask[0], mask[1], path=os.path.abspath(path))
+
+    def save(self, path):
+        """ذخیره به قالب دودویی قابل نگاشت در حافظه"""
+        source = self if self._is_whole() else PackedSequence.from_string(self.to_codes())
+        header = bytearray(_HEADER_SIZE)
+        header[:8] = _MAGIC
+        header[8:12] = np.uint32(_VERSION).tobytes()
+        header[16:32] = np.array([source._total, len(source.mask_starts)], dtype='<u8').tobytes()
+        with open(path, 'wb') as handle:
+            handle.write(bytes(header))
+            handle.write(np.asarray(source.mask_starts, dtype='<i8').tobytes())
+            handle.write(np.asarray(source.mask_ends, dtype='<i8').tobytes())
+            handle.write(np.asarray(source.packed, dtype=np.uint8).tobytes())
+
+    def _is_whole(self):
+        return (self._start, self._stop, self._reverse, self._complement) == (0, self._total, False, False)
+
+    def _view(self, start, stop, reverse, complement):
+        view = object.__new__(PackedSequence)
+        view.__dict__.update(self.__dict__)
+        view._start, view._stop = start, stop
+        view._reverse, view._complement = reverse, complement
+        return view
+
+    def __len__(self):
+        return self._stop - self._start
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("PackedSequence only supports contiguous slices")
+            stop = max(stop, start)
+            if self._reverse:
+                start, stop = self._stop - stop, self._stop - start
+            else:
+                start, stop = self._start + start, self._start + stop
+            return self._view(start, stop, self._reverse, self._complement)
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("PackedSequence index out of range")
+        return str(self[key:key + 1])
+
+    def complement(self):
+        """مکمل توالی بدون کپی داده"""
+        return self._view(self._start, self._stop, self._reverse, not self._complement)
+
+    def reverse_complement(self):
+        """مکمل معکوس توالی بدون کپی داده"""
+        return self._view(self._start, self._stop, not self._reverse, not self._complement)
+
+    def upper(self):
+        return self
+
+    def to_codes(self):
+        """آرایه‌ی uint8 کدهای A=0, C=1, G=2, T=3, N=4 برای این نما"""
+        first, last = self._start // 4, (self._stop + 3) // 4
+        block = np.asarray(self.packed[first:last])
+        codes = ((block[:, None] >> _SHIFTS) & 3).reshape(-1)
+        codes = codes[self._start - first * 4:self._stop - first * 4]
+        lo = np.searchsorted(self.mask_ends, self._start, side='right')
+        hi = np.searchsorted(self.mask_starts, self._stop)
+        for run_start, run_end in zip(self.mask_starts[lo:hi].tolist(), self.mask_ends[lo:hi].tolist()):
+            codes[max(run_start, self._start) - self._start:min(run_end, self._stop) - self._start] = N_CODE
+        if self._complement:
+            codes = np.where(codes == N_CODE, N_CODE, 3 - codes).astype(np.uint8)
+        if self._reverse:
+            codes = codes[::-1]
+        return codes
+
+    def has_mask(self):
+        """آیا در این نما N وجود دارد؟"""
+        lo = np.searchsorted(self.mask_ends, self._start, side='right')
+        return bool(len(self) and lo < len(self.mask_starts) and self.mask_starts[lo] < self._stop)
+
+    def base_counts(self):
+        """تعداد A, C, G, T و N"""
+        counts = np.bincount(self.to_codes(), minlength=5)
+        return dict(zip('ACGTN', counts.tolist()))
+
+    def count(self, base):
+        if len(base) != 1:
+            return str(self).count(base)
+        return self.base_counts().get(base.upper(), 0)
+
+    def gc_fraction(self):
+        counts = self.base_counts()
+        return (counts['G'] + counts['C']) / len(self) if len(self) else 0
+
+    def __str__(self):
+        return decode_sequence(self.to_codes())
+
+    def __iter__(self):
+        return iter(str(self))
+
+    def __contains__(self, item):
+        return item in str(self)
+
+    def __eq__(self, other):
+        if isinstance(other, (str, PackedSequence)):
+            return len(self) == len(other) and str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(str(self))
+
+    def __repr__(self):
+        return f"PackedSequence(length={len(self)}, path={self.path!r})"
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        if self.path:
+            # پردازه‌های دیگر همان فایل را دوباره memmap می‌کنند
+            for name in ('packed', 'mask_starts', 'mask_ends'):
+                state.pop(name)
+        return state
+
+    def __setstate__(self, state):
+        if 'packed' not in state:
+            opened = PackedSequence.open(state['path'])
+            state.update(packed=opened.packed, mask_starts=opened.mask_starts,
+                         mask_ends=opened.mask_ends)
+        self.__dict__.update(state)
+
+
+def as_text(sequence):
+    """رشته‌ی متنی توالی برای کدهایی که به str نیاز دارند"""
+    return sequence if isinstance(sequence, str) else str(sequence)
@@ -0,0 +1,99 @@
+import os
+from collections import deque
+from functools import partial
+from itertools import islice
+
+# شیء مشترک هر پردازه‌ی کارگر (آشکارساز، همتراز و ...) که یک بار با initializer تنظیم می‌شود
+_worker_shared = None
+
+
+def _init_worker(shared):
+    global _worker_shared
+    _worker_shared = shared
+
+
+def _call_with_shared(function, item):
+    return function(_worker_shared, item)
+
+
+def _chunked(items, size):
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _describe_error(error):
+    return f"{type(error).__name__}: {error}"
+
+
+def _run_chunk(function, chunk):
+    """اجرای تابع روی یک دسته؛ خطای هر مورد جداگانه برگردانده می‌شود"""
+    results = []
+    for item in chunk:
+        try:
+            results.append((function(item), None))
+        except Exception as error:
+            results.append((None, _describe_error(error)))
+    return results
+
+
+def imap_bounded(function, items, workers=None, chunk_size=1, ordered=True, shared=None):
+    """اجرای موازی function روی items با تعداد محدود دسته‌ی در جریان
+
+    خروجی سه‌تایی‌های (item, result, error) است؛ error برای موارد موفق None است.
+    با workers=0 همه چیز در همین پردازه اجرا می‌شود. با shared تابع به صورت
+    function(shared, item) فراخوانی می‌شود و shared فقط یک بار برای هر کارگر
+    (نه برای هر دسته) فرستاده می‌شود.
+    """
+    chunks = _chunked(items, max(1, chunk_size))
+    if workers == 0:
+        if shared is not None:
+            function = partial(function, shared)
+        for chunk in chunks:
+            for item, (result, error) in zip(chunk, _run_chunk(function, chunk)):
+                yield item, result, error
+        return
+
+    # concurrent.futures.process فقط برای اجرای چندپردازه‌ای بارگذاری می‌شود
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    workers = workers or os.cpu_count() or 1
+    limit = 2 * workers
+    initializer, initargs = None, ()
+    if shared is not None:
+        initializer, initargs = _init_worker, (shared,)
+        function = partial(_call_with_shared, function)
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer,
+                             initargs=initargs) as pool:
+        if ordered:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((pool.submit(_run_chunk, function, chunk), chunk))
+                if len(pending) >= limit:
+                    yield from _collect(*pending.popleft())
+            while pending:
+                yield from _collect(*pending.popleft())
+        else:
+            pending = {}
+            for chunk in chunks:
+                pending[pool.submit(_run_chunk, function, chunk)] = chunk
+                while len(pending) >= limit:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield from _collect(future, pending.pop(future))
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from _collect(future, pending.pop(future))
+
+
+def _collect(future, chunk):
+    try:
+        outcomes = future.result()
+    except Exception as error:
+        outcomes = [(None, _describe_error(error))] * len(chunk)
+    for item, (result, error) in zip(chunk, outcomes):
+        yield item, result, error
@@ -1,7 +1,6 @@
-from Bio.Seq import Seq
-
 def translate_dna_to_protein(dna_sequence):
     """Translate DNA sequence to protein sequence"""
+    from Bio.Seq import Seq
     try:
         return str(Seq(dna_sequence).translate())
     except Exception as e:
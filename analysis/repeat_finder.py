@@ -0,0 +1,149 @@
+import numpy as np
+
+from analysis.encoding import N_CODE, decode_sequence, encode_sequence
+from analysis.sequence_index import build_suffix_array
+
+# بیشترین طول k-mer که کد آن در یک عدد ۶۴ بیتی جا می‌شود
+MAX_PACKED_K = 31
+
+
+def kmer_codes(codes, k):
+    """کد عددی همه‌ی k-merها و ماسک پنجره‌های بدون N"""
+    count = len(codes) - k + 1
+    if count <= 0:
+        return np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=bool)
+    values = np.zeros(count, dtype=np.uint64)
+    for offset in range(k):
+        values = (values << np.uint64(2)) | (codes[offset:offset + count] & 3).astype(np.uint64)
+    n_runs = np.concatenate(([0], np.cumsum(codes == N_CODE)))
+    valid = (n_runs[k:] - n_runs[:count]) == 0
+    return values, valid
+
+
+class RepeatFinder:
+    def __init__(self, min_length=4, max_results=None):
+        self.min_length = min_length
+        self.max_results = max_results
+
+    def find_kmer_repeats(self, sequence, min_length=None, max_results=None):
+        """یافتن همه‌ی k-merهای تکراری در یک گذر؛ خروجی {k-mer: [موقعیت‌ها]}
+
+        رخدادهای هم‌پوشان هم شمرده می‌شوند (برخلاف str.count در پیاده‌سازی
+        قبلی find_repeats)، پس در AAAAA k-mer تکراری AAAA در موقعیت‌های ۰ و ۱ است.
+        """
+        groups = self._kmer_groups(sequence, min_length or self.min_length,
+                                   max_results or self.max_results)
+        return {kmer: positions.tolist() for kmer, positions in groups}
+
+    def classify_repeats(self, sequence, min_length=None, max_results=None):
+        """k-merهای تکراری به همراه نوع (پشت سر هم یا پراکنده)"""
+        k = min_length or self.min_length
+        return [
+            self._describe(kmer, positions, k)
+            for kmer, positions in self._kmer_groups(sequence, k, max_results or self.max_results)
+        ]
+
+    def find_maximal_repeats(self, sequence, min_length=None, max_results=None):
+        """یافتن تکرارهای بیشینه با آرایه‌ی پسوندی و LCP"""
+        k = min_length or self.min_length
+        max_results = max_results or self.max_results
+        codes = encode_sequence(sequence)
+        n = len(codes)
+        if n < 2:
+            return []
+        # هر N یک نماد یکتا می‌گیرد تا هیچ تکراری از روی آن عبور نکند
+        text = codes.astype(np.int64)
+        n_mask = codes == N_CODE
+        text[n_mask] = N_CODE + 1 + np.arange(np.count_nonzero(n_mask))
+        sa = build_suffix_array(text)
+        lcp = _lcp_array(text, sa)
+        # برای بررسی چپ‌بیشینه بودن: آیا نویسه‌ی قبل از همه‌ی پسوندهای بازه یکسان است؟
+        before = np.where(sa > 0, text[sa - 1], -1)
+        changes = np.concatenate(([0], np.cumsum(
+            (before[1:] != before[:-1]) | (before[1:] == -1) | (before[:-1] == -1))))
+
+        results = []
+        stack = [(0, 0)]
+        for r in range(1, n + 1):
+            current = lcp[r] if r < n else 0
+            left = r - 1
+            while current < stack[-1][0]:
+                length, left = stack.pop()
+                if length >= k and changes[r - 1] - changes[left] > 0:
+                    positions = np.sort(sa[left:r])
+                    results.append(self._describe(
+                        decode_sequence(codes[positions[0]:positions[0] + length]),
+                        positions, length))
+                    if max_results and len(results) >= max_results:
+                        return results
+            if current > stack[-1][0]:
+                stack.append((current, left))
+        return results
+
+    def _kmer_groups(self, sequence, k, max_results):
+        codes = encode_sequence(sequence)
+        if k > MAX_PACKED_K:
+            return self._slice_groups(decode_sequence(codes), k, max_results)
+        values, valid = kmer_codes(codes, k)
+        positions = np.flatnonzero(valid)
+        if len(positions) == 0:
+            return []
+        order = np.argsort(values[positions], kind='stable')
+        positions = positions[order]
+        sorted_values = values[positions]
+        starts = np.flatnonzero(np.concatenate(([True], sorted_values[1:] != sorted_values[:-1])))
+        sizes = np.diff(np.append(starts, len(positions)))
+        repeated = sizes > 1
+        starts, sizes = starts[repeated], sizes[repeated]
+        # گروه‌ها به ترتیب اولین رخداد، مانند پیاده‌سازی قبلی
+        by_first = np.argsort(positions[starts], kind='stable')
+        if max_results:
+            by_first = by_first[:max_results]
+        groups = []
+        for g in by_first.tolist():
+            group = positions[starts[g]:starts[g] + sizes[g]]
+            groups.append((decode_sequence(codes[group[0]:group[0] + k]), group))
+        return groups
+
+    def _slice_groups(self, sequence, k, max_results):
+        table = {}
+        for i in range(len(sequence) - k + 1):
+            kmer = sequence[i:i + k]
+            if 'N' not in kmer:
+                table.setdefault(kmer, []).append(i)
+        groups = [(kmer, np.array(p)) for kmer, p in table.items() if len(p) > 1]
+        return groups[:max_results] if max_results else groups
+
+    def _describe(self, kmer, positions, length):
+        gaps = np.diff(positions)
+        return {
+            'sequence': kmer,
+            'length': length,
+            'count': len(positions),
+            'positions': positions.tolist(),
+            'type': 'tandem' if len(gaps) and gaps.min() <= length else 'dispersed'
+        }
+
+
+def _lcp_array(text, sa):
+    """آرایه‌ی LCP به روش Kasai؛ lcp[r] طول پیشوند مشترک sa[r-1] و sa[r]"""
+    n = len(text)
+    values = text.tolist()
+    suffixes = sa.tolist()
+    rank = [0] * n
+    for r, i in enumerate(suffixes):
+        rank[i] = r
+    lcp = [0] * n
+    h = 0
+    for i in range(n):
+        r = rank[i]
+        if r == 0:
+            h = 0
+            continue
+        j = suffixes[r - 1]
+        while i + h < n and j + h < n and values[i + h] == values[j + h]:
+            h += 1
+        lcp[r] = h
+        if h:
+            h -= 1
+    return lcp
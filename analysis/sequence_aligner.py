@@ -0,0 +1,338 @@
+import numpy as np
+
+from analysis.encoding import BASES, encode_sequence
+from analysis.packed_sequence import as_text
+from analysis.parallel import imap_bounded
+
+MODES = ('global', 'local', 'semiglobal')
+
+# بیت‌های جهت بازگشت در همترازی نواری: منبع H در دو بیت پایین، ادامه‌ی شکاف E و F
+_FROM_DIAGONAL, _FROM_E, _FROM_F = 0, 1, 2
+_E_EXTEND = 4
+_F_EXTEND = 8
+
+def _align_in_worker(shared, task):
+    _, target = task
+    aligner, query = shared
+    return aligner.align(query, target)
+
+
+def _cigar(operations):
+    """فشرده‌سازی فهرست (عمل، طول) به رشته‌ی CIGAR"""
+    merged = []
+    for op, length in operations:
+        if length <= 0:
+            continue
+        if merged and merged[-1][0] == op:
+            merged[-1][1] += length
+        else:
+            merged.append([op, length])
+    return ''.join(f"{length}{op}" for op, length in merged)
+
+
+class SequenceAligner:
+    """همترازی دوتایی با شکاف افاین و خروجی CIGAR
+
+    حالت‌های global، local و semiglobal (شکاف‌های دو انتها رایگان) با
+    Bio.Align.PairwiseAligner اجرا می‌شوند و فقط یک مسیر بازگشت ساخته می‌شود.
+    با band یا xdrop همترازی نواری NumPy برای توالی‌های بلند و تقریباً
+    یکسان استفاده می‌شود. در CIGAR توالی دوم (target) مرجع است: I یعنی
+    نویسه‌ی اضافه در query و D یعنی نویسه‌ی حذف‌شده از آن.
+    """
+
+    def __init__(self, mode='global', match=2, mismatch=-3, open_gap=-5, extend_gap=-2,
+                 matrix=None, band=None, xdrop=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown alignment mode: {mode}")
+        if open_gap > extend_gap:
+            raise ValueError("open_gap must not be larger than extend_gap")
+        if (band is not None or xdrop is not None) and mode != 'global':
+            raise ValueError("Banded and X-drop alignment are only available in global mode")
+        if isinstance(matrix, str):
+            from Bio.Align import substitution_matrices
+
+            matrix = substitution_matrices.load(matrix)
+        self.mode = mode
+        self.match = match
+        self.mismatch = mismatch
+        self.open_gap = open_gap
+        self.extend_gap = extend_gap
+        self.matrix = matrix
+        self.band = band
+        self.xdrop = xdrop
+        self._aligner = None
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_aligner'] = None
+        return state
+
+    @property
+    def aligner(self):
+        if self._aligner is None:
+            # Bio.Align فقط با اولین همترازی بارگذاری می‌شود
+            from Bio.Align import PairwiseAligner
+
+            aligner = PairwiseAligner()
+            aligner.mode = 'local' if self.mode == 'local' else 'global'
+            if self.matrix is not None:
+                aligner.substitution_matrix = self.matrix
+            else:
+                aligner.match_score = self.match
+                aligner.mismatch_score = self.mismatch
+            aligner.open_gap_score = self.open_gap
+            aligner.extend_gap_score = self.extend_gap
+            if self.mode == 'semiglobal':
+                aligner.end_gap_score = 0
+            self._aligner = aligner
+        return self._aligner
+
+    def score(self, query, target):
+        """فقط امتیاز همترازی بدون ساخت مسیر بازگشت"""
+        query, target = as_text(query).upper(), as_text(target).upper()
+        if not query or not target:
+            return self._empty_alignment(query, target)['score']
+        if self._banded():
+            return self._banded_align(query, target, traceback=False)['score']
+        return float(self.aligner.score(target, query))
+
+    def align(self, query, target):
+        """بهترین همترازی query با target به صورت دیکشنری شامل CIGAR"""
+        query, target = as_text(query).upper(), as_text(target).upper()
+        if not query or not target:
+            return self._empty_alignment(query, target)
+        if self._banded():
+            return self._banded_align(query, target)
+        alignments = self.aligner.align(target, query)
+        score = float(alignments.score)
+        if self.mode == 'local' and score <= 0:
+            # بدون هیچ زوج با امتیاز مثبت، همترازی محلی مسیری ندارد
+            return self._empty_alignment(query, target)
+        return self._from_coordinates(query, target, alignments[0].coordinates, score)
+
+    def align_many(self, query, targets, workers=None, chunk_size=8, ordered=True):
+        """همترازی یک query با تعداد زیادی target به صورت موازی
+
+        targets می‌تواند شامل رشته یا زوج (نام، توالی) باشد؛ خطای هر مورد
+        در نتیجه‌ی همان مورد گزارش می‌شود.
+        """
+        tasks = (
+            record if isinstance(record, tuple) and len(record) == 2 else (number, record)
+            for number, record in enumerate(targets)
+        )
+        for (name, _), result, error in imap_bounded(
+                _align_in_worker, tasks, workers=workers, chunk_size=chunk_size,
+                ordered=ordered, shared=(self, query)):
+            yield dict(result if error is None else {'error': error}, id=name)
+
+    def _banded(self):
+        return self.band is not None or self.xdrop is not None
+
+    def _empty_alignment(self, query, target):
+        # PairwiseAligner توالی خالی نمی‌پذیرد؛ فقط حالت global شکاف را امتیاز می‌دهد
+        gap = len(query) + len(target)
+        if self.mode != 'global' or gap == 0:
+            query, target = '', ''
+            score = 0.0
+        else:
+            score = float(self.open_gap + (gap - 1) * self.extend_gap)
+        return {
+            'score': score,
+            'cigar': _cigar([('I', len(query)), ('D', len(target))]),
+            'query_start': 0,
+            'query_end': len(query),
+            'target_start': 0,
+            'target_end': len(target),
+            'aligned_query': query + '-' * len(target),
+            'aligned_target': '-' * len(query) + target
+        }
+
+    def _from_coordinates(self, query, target, coordinates, score):
+        operations = []
+        aligned_query, aligned_target = [], []
+        target_positions, query_positions = coordinates[0].tolist(), coordinates[1].tolist()
+        for t0, t1, q0, q1 in zip(target_positions, target_positions[1:],
+                                  query_positions, query_positions[1:]):
+            if t1 > t0 and q1 > q0:
+                operations.append(('M', t1 - t0))
+                aligned_query.append(query[q0:q1])
+                aligned_target.append(target[t0:t1])
+            elif q1 > q0:
+                operations.append(('I', q1 - q0))
+                aligned_query.append(query[q0:q1])
+                aligned_target.append('-' * (q1 - q0))
+            elif t1 > t0:
+                operations.append(('D', t1 - t0))
+                aligned_query.append('-' * (t1 - t0))
+                aligned_target.append(target[t0:t1])
+        query_start, target_start = query_positions[0], target_positions[0]
+        query_end, target_end = query_positions[-1], target_positions[-1]
+        if self.mode == 'semiglobal':
+            # شکاف‌های انتهایی رایگان جزو همترازی گزارش نمی‌شوند
+            while operations and operations[0][0] != 'M':
+                op, length = operations.pop(0)
+                aligned_query.pop(0)
+                aligned_target.pop(0)
+                if op == 'I':
+                    query_start += length
+                else:
+                    target_start += length
+            while operations and operations[-1][0] != 'M':
+                op, length = operations.pop()
+                aligned_query.pop()
+                aligned_target.pop()
+                if op == 'I':
+                    query_end -= length
+                else:
+                    target_end -= length
+        return {
+            'score': score,
+            'cigar': _cigar(operations),
+            'query_start': query_start,
+            'query_end': query_end,
+            'target_start': target_start,
+            'target_end': target_end,
+            'aligned_query': ''.join(aligned_query),
+            'aligned_target': ''.join(aligned_target)
+        }
+
+    def _score_table(self):
+        letters = BASES + 'N'
+        table = np.full((5, 5), float(self.mismatch))
+        for a, x in enumerate(letters):
+            for b, y in enumerate(letters):
+                if self.matrix is not None:
+                    try:
+                        table[a, b] = self.matrix[x][y]
+                    except (KeyError, IndexError):
+                        pass
+                elif a == b and a < 4:
+                    table[a, b] = self.match
+        return table
+
+    def _banded_align(self, query, target, traceback=True):
+        """برنامه‌ریزی پویای Gotoh در نوار قطری با هر سطر برداری
+
+        با xdrop همترازی از ابتدای دو توالی گسترش می‌یابد و وقتی بهترین امتیاز
+        سطر بیش از xdrop از بهترین امتیاز کل کمتر شود متوقف می‌شود؛ بهترین
+        خانه‌ی دیده‌شده پایان همترازی است.
+        """
+        q, t = encode_sequence(query), encode_sequence(target)
+        n, m = len(q), len(t)
+        band = self.band if self.band is not None else max(16, abs(m - n))
+        if self.xdrop is None:
+            lo, hi = min(0, m - n) - band, max(0, m - n) + band
+        else:
+            lo, hi = -band, band
+        width = hi - lo + 1
+        columns = np.arange(width)
+        table = self._score_table()
+        open_gap, extend = float(self.open_gap), float(self.extend_gap)
+        negative = np.full(width, -np.inf)
+        t_padded = np.concatenate(([0], t, [0])).astype(np.intp)
+
+        pointers = []
+        best, best_cell = 0.0, (0, 0)
+        previous_h = previous_f = None
+        for i in range(n + 1):
+            j = columns + i + lo
+            inside = (j >= 0) & (j <= m)
+            if i == 0:
+                h0 = np.where(j == 0, 0.0, -np.inf)
+                f = negative.copy()
+                source = np.zeros(width, np.uint8)
+                f_extend = np.zeros(width, bool)
+            else:
+                up_h = np.append(previous_h[1:], -np.inf)
+                up_f = np.append(previous_f[1:], -np.inf)
+                f_open, f_ext = up_h + open_gap, up_f + extend
+                f = np.maximum(f_open, f_ext)
+                f_extend = f_ext > f_open
+                has_diagonal = inside & (j >= 1)
+                diagonal = np.where(
+                    has_diagonal,
+                    previous_h + table[q[i - 1], t_padded[np.clip(j, 0, m + 1)]],
+                    -np.inf)
+                h0 = np.maximum(diagonal, f)
+                source = np.where(f > diagonal, _FROM_F, _FROM_DIAGONAL).astype(np.uint8)
+            h0 = np.where(inside, h0, -np.inf)
+            # شکاف افقی: E[c] = max(H0[k] + open + (c - k - 1) * extend) برای k < c
+            running = np.maximum.accumulate(h0 - columns * extend)
+            e = np.full(width, -np.inf)
+            e[1:] = running[:-1] + (columns[1:] - 1) * extend + open_gap
+            e = np.where(inside, e, -np.inf)
+            e_open = np.append(-np.inf, h0[:-1] + open_gap)
+            h = np.maximum(h0, e)
+            f = np.where(inside, f, -np.inf)
+            if traceback:
+                source = np.where(e > h0, _FROM_E, source).astype(np.uint8)
+                source |= np.where(e > e_open, _E_EXTEND, 0).astype(np.uint8)
+                source |= np.where(f_extend, _F_EXTEND, 0).astype(np.uint8)
+                pointers.append(source)
+            previous_h, previous_f = h, f
+            if self.xdrop is not None:
+                row_best = int(np.argmax(h))
+                if h[row_best] > best:
+                    best, best_cell = float(h[row_best]), (i, int(j[row_best]))
+                elif h[row_best] < best - self.xdrop:
+                    break
+
+        if self.xdrop is None:
+            end_i, end_j = n, m
+            best = float(previous_h[m - n - lo])
+        else:
+            end_i, end_j = best_cell
+        result = {
+            'score': best,
+            'query_start': 0,
+            'query_end': end_i,
+            'target_start': 0,
+            'target_end': end_j
+        }
+        if traceback:
+            result.update(self._traceback(query, target, pointers, lo, end_i, end_j))
+        return result
+
+    def _traceback(self, query, target, pointers, lo, i, j):
+        operations = []
+        state = 'H'
+        while i > 0 or j > 0:
+            pointer = int(pointers[i][j - i - lo])
+            if state == 'H':
+                origin = pointer & 3
+                if origin == _FROM_DIAGONAL:
+                    operations.append('M')
+                    i, j = i - 1, j - 1
+                    continue
+                state = 'E' if origin == _FROM_E else 'F'
+            if state == 'E':
+                operations.append('D')
+                j -= 1
+                if not pointer & _E_EXTEND:
+                    state = 'H'
+            else:
+                operations.append('I')
+                i -= 1
+                if not pointer & _F_EXTEND:
+                    state = 'H'
+        operations.reverse()
+        aligned_query, aligned_target = [], []
+        qi = ti = 0
+        for op in operations:
+            if op == 'M':
+                aligned_query.append(query[qi])
+                aligned_target.append(target[ti])
+                qi, ti = qi + 1, ti + 1
+            elif op == 'I':
+                aligned_query.append(query[qi])
+                aligned_target.append('-')
+                qi += 1
+            else:
+                aligned_query.append('-')
+                aligned_target.append(target[ti])
+                ti += 1
+        return {
+            'cigar': _cigar((op, 1) for op in operations),
+            'aligned_query': ''.join(aligned_query),
+            'aligned_target': ''.join(aligned_target)
+        }
@@ -0,0 +1,236 @@
+import json
+import os
+
+import numpy as np
+
+from analysis.encoding import decode_sequence, encode_sequence
+from analysis.sequence_store import database_fingerprints, sequence_digest
+
+# الفبای اندیس: پایان متن، جداکننده‌ی مدخل‌ها و سپس A, C, G, T, N
+_END = 0
+_SEP = 1
+_OFFSET = 2
+_SIGMA = 7
+
+_FILES = ('text', 'sa', 'bwt', 'occ', 'starts')
+
+
+def build_suffix_array(text):
+    """ساخت آرایه‌ی پسوندی به روش دو برابر کردن پیشوند با NumPy"""
+    rank = np.asarray(text, dtype=np.int64)
+    n = len(rank)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    sa = np.argsort(rank, kind='stable')
+    k = 1
+    while k < n:
+        second = np.full(n, -1, dtype=np.int64)
+        second[:n - k] = rank[k:]
+        sa = np.lexsort((second, rank))
+        first_sorted, second_sorted = rank[sa], second[sa]
+        boundary = np.empty(n, dtype=bool)
+        boundary[0] = True
+        boundary[1:] = ((first_sorted[1:] != first_sorted[:-1])
+                        | (second_sorted[1:] != second_sorted[:-1]))
+        rank = np.empty(n, dtype=np.int64)
+        rank[sa] = np.cumsum(boundary) - 1
+        if rank[sa[-1]] == n - 1:
+            break
+        k *= 2
+    return sa
+
+
+class SequenceIndex:
+    """اندیس FM روی کل دیتابیس توالی‌ها برای جستجوی زیررشته"""
+
+    def __init__(self, sample_rate=32, rebuild_ratio=0.25):
+        self.sample_rate = sample_rate
+        self.rebuild_ratio = rebuild_ratio
+        self.ids = []
+        self.text = np.zeros(1, dtype=np.uint8)
+        self.sa = np.zeros(1, dtype=np.int64)
+        self.bwt = np.zeros(1, dtype=np.uint8)
+        self.occ = np.zeros((1, _SIGMA), dtype=np.uint32)
+        self.starts = np.zeros(0, dtype=np.int64)
+        self._id_set = set()
+        self._pending = {}
+        self._removed = set()
+        # اثر انگشت محتوای هر مدخل زنده برای هم‌گام‌سازی با دیتابیس
+        self.digests = {}
+
+    @classmethod
+    def from_database(cls, database, **kwargs):
+        """ساخت اندیس از دیکشنری دیتابیس توالی‌ها"""
+        index = cls(**kwargs)
+        index.build((seq_id, data['sequence']) for seq_id, data in database.items())
+        return index
+
+    def build(self, entries):
+        """ساخت کامل اندیس از زوج‌های (شناسه، توالی)"""
+        ids, parts, starts, digests = [], [], [], {}
+        offset = 0
+        for seq_id, sequence in entries:
+            codes = encode_sequence(sequence.upper()) + _OFFSET
+            digests[seq_id] = sequence_digest(sequence)
+            ids.append(seq_id)
+            starts.append(offset)
+            parts.append(codes)
+            parts.append(np.array([_SEP], dtype=np.uint8))
+            offset += len(codes) + 1
+        parts.append(np.array([_END], dtype=np.uint8))
+        self.text = np.concatenate(parts).astype(np.uint8)
+        self.ids = ids
+        self.starts = np.array(starts, dtype=np.int64)
+        self._id_set = set(ids)
+        self._pending = {}
+        self._removed = set()
+        self.digests = digests
+        self._build_fm()
+
+    def _build_fm(self):
+        self.sa = build_suffix_array(self.text)
+        self.bwt = self.text[self.sa - 1]
+        # شمارش تجمعی نمادها فقط در هر sample_rate موقعیت نگه داشته می‌شود
+        checkpoints = np.arange(0, len(self.bwt) + 1, self.sample_rate)
+        self.occ = np.zeros((len(checkpoints), _SIGMA), dtype=np.uint32)
+        for symbol in range(_SIGMA):
+            running = np.concatenate(([0], np.cumsum(self.bwt == symbol, dtype=np.uint32)))
+            self.occ[:, symbol] = running[checkpoints]
+
+    @property
+    def _first(self):
+        totals = self.occ[-1] + np.bincount(
+            self.bwt[(len(self.occ) - 1) * self.sample_rate:], minlength=_SIGMA
+        ).astype(np.uint32)
+        return np.concatenate(([0], np.cumsum(totals[:-1]))).astype(np.int64)
+
+    def _rank(self, symbol, i):
+        block = i // self.sample_rate
+        base = int(self.occ[block, symbol])
+        return base + int(np.count_nonzero(self.bwt[block * self.sample_rate:i] == symbol))
+
+    def _backward_search(self, codes):
+        first = self._first
+        lo, hi = 0, len(self.bwt)
+        for symbol in codes[::-1]:
+            symbol = int(symbol)
+            lo = first[symbol] + self._rank(symbol, lo)
+            hi = first[symbol] + self._rank(symbol, hi)
+            if lo >= hi:
+                return 0, 0
+        return lo, hi
+
+    def __len__(self):
+        return len(self.ids) - len(self._removed) + len(self._pending)
+
+    def __contains__(self, seq_id):
+        return seq_id in self._pending or (seq_id in self._id_set and seq_id not in self._removed)
+
+    def add(self, seq_id, sequence):
+        """افزودن تدریجی یک مدخل بدون ساخت دوباره‌ی کل اندیس"""
+        if seq_id in self._id_set:
+            self._removed.add(seq_id)
+        self._pending[seq_id] = sequence.upper()
+        self.digests[seq_id] = sequence_digest(sequence)
+        pending_size = sum(len(s) for s in self._pending.values())
+        if pending_size > self.rebuild_ratio * len(self.text):
+            self.rebuild()
+
+    def remove(self, seq_id):
+        """حذف یک مدخل از نتایج جستجو"""
+        self._pending.pop(seq_id, None)
+        self.digests.pop(seq_id, None)
+        if seq_id in self._id_set:
+            self._removed.add(seq_id)
+
+    def sync(self, database):
+        """هم‌گام‌سازی با دیتابیس بر اساس digest محتوا؛ خروجی True اگر اندیس تغییر کرد
+
+        مدخل‌های حذف‌شده کنار گذاشته و مدخل‌های جدید یا تغییرکرده دوباره
+        افزوده می‌شوند.
+        """
+        current = database_fingerprints(database)
+        live = {seq_id for seq_id in self.ids if seq_id not in self._removed} | set(self._pending)
+        removed = [seq_id for seq_id in live if seq_id not in current]
+        changed = [seq_id for seq_id, digest in current.items()
+                   if self.digests.get(seq_id) != digest]
+        for seq_id in removed:
+            self.remove(seq_id)
+        for seq_id in changed:
+            self.add(seq_id, database[seq_id]['sequence'])
+        return bool(removed or changed)
+
+    def rebuild(self):
+        """ادغام مدخل‌های جدید و حذف‌شده در اندیس اصلی"""
+        ends = np.append(self.starts[1:] - 1, len(self.text) - 2)
+        entries = [
+            (seq_id, self.text[start:end] - _OFFSET)
+            for seq_id, start, end in zip(self.ids, self.starts, ends)
+            if seq_id not in self._removed and seq_id not in self._pending
+        ]
+        entries.extend(self._pending.items())
+        # digest از توالی اصلی است، نه متن رمزگشایی‌شده (که نویسه‌های دیگر را N می‌کند)
+        digests = self.digests
+        self.build(
+            (seq_id, codes if isinstance(codes, str) else decode_sequence(codes))
+            for seq_id, codes in entries
+        )
+        self.digests = {seq_id: digests[seq_id] for seq_id in self.ids if seq_id in digests}
+
+    def search(self, query, limit=None):
+        """یافتن همه‌ی (شناسه، موقعیت)های حاوی query به ترتیب مدخل‌ها"""
+        query = query.upper()
+        if not query:
+            return []
+        lo, hi = self._backward_search(encode_sequence(query) + _OFFSET)
+        hits = []
+        if hi > lo:
+            positions = np.sort(self.sa[lo:hi])
+            entry = np.searchsorted(self.starts, positions, side='right') - 1
+            for e, pos in zip(entry.tolist(), (positions - self.starts[entry]).tolist()):
+                seq_id = self.ids[e]
+                if seq_id not in self._removed:
+                    hits.append((seq_id, pos))
+                    if limit is not None and len(hits) >= limit:
+                        return hits
+        if self._pending and not isinstance(query, str):
+            query = str(query)
+        for seq_id, sequence in self._pending.items():
+            pos = sequence.find(query)
+            while pos != -1:
+                hits.append((seq_id, pos))
+                if limit is not None and len(hits) >= limit:
+                    return hits
+                pos = sequence.find(query, pos + 1)
+        return hits
+
+    def count(self, query):
+        """تعداد رخدادهای query در کل دیتابیس"""
+        return len(self.search(query))
+
+    def save(self, path):
+        """ذخیره‌ی اندیس در یک پوشه برای بارگذاری سریع با memmap"""
+        if self._pending or self._removed:
+            self.rebuild()
+        os.makedirs(path, exist_ok=True)
+        for name in _FILES:
+            np.save(os.path.join(path, f'{name}.npy'), getattr(self, name))
+        with open(os.path.join(path, 'meta.json'), 'w') as meta_file:
+            json.dump({'ids': self.ids, 'sample_rate': self.sample_rate,
+                       'rebuild_ratio': self.rebuild_ratio, 'digests': self.digests}, meta_file)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """بارگذاری اندیس ذخیره‌شده؛ آرایه‌ها به صورت memmap باز می‌شوند"""
+        with open(os.path.join(path, 'meta.json')) as meta_file:
+            meta = json.load(meta_file)
+        index = cls(sample_rate=meta['sample_rate'], rebuild_ratio=meta['rebuild_ratio'])
+        mode = 'r' if mmap else None
+        for name in _FILES:
+            setattr(index, name, np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode))
+        index.ids = meta['ids']
+        index._id_set = set(index.ids)
+        # اندیس‌های قدیمی digest ندارند؛ sync همه‌ی مدخل‌ها را تغییرکرده می‌بیند
+        index.digests = meta.get('digests', {})
+        return index
+
@@ -0,0 +1,244 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from itertools import islice
+
+from utils.file_io import read_records
+
+FIELDS = ('name', 'sequence', 'type', 'description')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    type TEXT NOT NULL,
+    description TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    sequence TEXT NOT NULL,
+    digest TEXT
+);
+CREATE INDEX IF NOT EXISTS entries_type ON entries (type);
+CREATE INDEX IF NOT EXISTS entries_name ON entries (name COLLATE NOCASE);
+"""
+
+
+def sequence_digest(sequence):
+    """اثر انگشت محتوای یک توالی (بدون حساسیت به حروف کوچک و بزرگ)"""
+    return hashlib.sha1(str(sequence).upper().encode('ascii', 'replace')).hexdigest()
+
+
+def database_fingerprints(database):
+    """اثر انگشت همه‌ی مدخل‌ها {شناسه: digest} برای هم‌گام‌سازی اندیس‌ها"""
+    if hasattr(database, 'fingerprints'):
+        return database.fingerprints()
+    return {seq_id: sequence_digest(data['sequence']) for seq_id, data in database.items()}
+
+
+class SequenceStore(MutableMapping):
+    """دیتابیس توالی روی SQLite با رابط دیکشنری
+
+    store[id] همان دیکشنری name، sequence، type و description دیتابیس قدیمی
+    را برمی‌گرداند. مدخل‌ها فقط هنگام دسترسی خوانده می‌شوند و تعداد
+    محدودی از آن‌ها در کش LRU می‌مانند، پس باز کردن دیتابیس به اندازه‌ی آن
+    بستگی ندارد. یک اتصال بین نخ‌ها مشترک است و با قفل محافظت می‌شود.
+    """
+
+    def __init__(self, path=':memory:', cache_size=1024):
+        self.path = path
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._cache = OrderedDict()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        self._writes = 0
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(entries)")]
+        if 'digest' not in columns:
+            # دیتابیس‌های قدیمی؛ digest هنگام اولین fingerprints پر می‌شود
+            with self._connection:
+                self._connection.execute("ALTER TABLE entries ADD COLUMN digest TEXT")
+
+    @classmethod
+    def from_dict(cls, database, path=':memory:', **kwargs):
+        """ساخت دیتابیس از دیکشنری قدیمی {شناسه: مدخل}"""
+        store = cls(path, **kwargs)
+        store.update(database)
+        return store
+
+    def __getstate__(self):
+        # پردازه‌های کارگر همان فایل را دوباره باز می‌کنند
+        if self.path == ':memory:':
+            raise TypeError("An in-memory SequenceStore cannot be shared between processes")
+        return {'path': self.path, 'cache_size': self.cache_size}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'], state['cache_size'])
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    @property
+    def revision(self):
+        """نشانه‌ای که با هر تغییر دیتابیس (از این اتصال یا اتصال‌های دیگر) عوض می‌شود"""
+        data_version = self._query("PRAGMA data_version")[0][0]
+        return self._writes, data_version
+
+    def fingerprints(self):
+        """{شناسه: digest} همه‌ی مدخل‌ها بدون خواندن توالی‌هایی که digest دارند"""
+        missing = [seq_id for (seq_id,) in self._query(
+            "SELECT id FROM entries WHERE digest IS NULL")]
+        for batch in _batched(missing, 1000):
+            placeholders = ','.join('?' * len(batch))
+            rows = self._query(f"SELECT id, sequence FROM entries WHERE id IN ({placeholders})",
+                               batch)
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "UPDATE entries SET digest = ? WHERE id = ?",
+                    [(sequence_digest(sequence), seq_id) for seq_id, sequence in rows])
+        return dict(self._query("SELECT id, digest FROM entries"))
+
+    def __getitem__(self, seq_id):
+        with self._lock:
+            if seq_id in self._cache:
+                self._cache.move_to_end(seq_id)
+                return self._cache[seq_id]
+            rows = self._connection.execute(
+                "SELECT name, sequence, type, description FROM entries WHERE id = ?",
+                (seq_id,)).fetchall()
+            if not rows:
+                raise KeyError(seq_id)
+            data = dict(zip(FIELDS, rows[0]))
+            self._cache[seq_id] = data
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return data
+
+    def __setitem__(self, seq_id, data):
+        self._insert([(seq_id, data)])
+
+    def __delitem__(self, seq_id):
+        with self._lock, self._connection:
+            deleted = self._connection.execute("DELETE FROM entries WHERE id = ?", (seq_id,))
+            self._cache.pop(seq_id, None)
+            self._writes += 1
+        if not deleted.rowcount:
+            raise KeyError(seq_id)
+
+    def __contains__(self, seq_id):
+        return bool(self._query("SELECT 1 FROM entries WHERE id = ?", (seq_id,)))
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM entries")[0][0]
+
+    def __iter__(self):
+        # شناسه‌ها دسته‌ای خوانده می‌شوند تا حلقه‌ی بیرونی قفل را نگه ندارد
+        last = None
+        while True:
+            if last is None:
+                rows = self._query("SELECT id FROM entries ORDER BY id LIMIT 1000")
+            else:
+                rows = self._query("SELECT id FROM entries WHERE id > ? ORDER BY id LIMIT 1000",
+                                   (last,))
+            if not rows:
+                return
+            for (seq_id,) in rows:
+                yield seq_id
+            last = rows[-1][0]
+
+    def items(self):
+        """همه‌ی مدخل‌ها به صورت جریانی با یک پرس‌وجو برای هر دسته"""
+        for batch in _batched(iter(self), 1000):
+            placeholders = ','.join('?' * len(batch))
+            rows = self._query(
+                f"SELECT id, name, sequence, type, description FROM entries "
+                f"WHERE id IN ({placeholders}) ORDER BY id", batch)
+            for seq_id, *values in rows:
+                yield seq_id, dict(zip(FIELDS, values))
+
+    def update(self, other=(), **kwargs):
+        entries = other.items() if hasattr(other, 'items') else other
+        self._insert(entries)
+        if kwargs:
+            self._insert(kwargs.items())
+
+    def _insert(self, entries, batch_size=1000):
+        count = 0
+        for batch in _batched(entries, batch_size):
+            rows = [
+                (seq_id, data.get('name', seq_id), data.get('type', 'custom'),
+                 data.get('description', ''), len(data['sequence']), data['sequence'].upper(),
+                 sequence_digest(data['sequence']))
+                for seq_id, data in batch
+            ]
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO entries "
+                    "(id, name, type, description, length, sequence, digest) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                for seq_id, _ in batch:
+                    self._cache.pop(seq_id, None)
+                self._writes += 1
+            count += len(rows)
+        return count
+
+    def import_fasta(self, file_path, seq_type='custom', description='', batch_size=1000):
+        """وارد کردن جریانی همه‌ی رکوردهای یک فایل FASTA/FASTQ (ساده یا gzip)
+
+        شناسه اولین کلمه‌ی سرآیند و نام بقیه‌ی آن است؛ خروجی تعداد مدخل‌هاست.
+        """
+        def entries():
+            for number, (header, sequence) in enumerate(read_records(file_path, alphabet='ACGTN')):
+                seq_id, _, name = (header or f"record_{number}").partition(' ')
+                yield seq_id, {'name': name or seq_id, 'sequence': sequence, 'type': seq_type,
+                               'description': description}
+        return self._insert(entries(), batch_size)
+
+    def find(self, seq_type=None, name=None, limit=None):
+        """جستجوی فراداده بر اساس نوع و بخشی از نام (بدون خواندن توالی‌ها)"""
+        conditions, parameters = [], []
+        if seq_type is not None:
+            conditions.append("type = ?")
+            parameters.append(seq_type)
+        if name is not None:
+            conditions.append("name LIKE ? COLLATE NOCASE")
+            parameters.append(f"%{name}%")
+        sql = "SELECT id, name, type, description, length FROM entries"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            parameters.append(limit)
+        return [
+            dict(zip(('id', 'name', 'type', 'description', 'length'), row))
+            for row in self._query(sql, parameters)
+        ]
+
+    def types(self):
+        """تعداد مدخل‌های هر نوع"""
+        return dict(self._query("SELECT type, COUNT(*) FROM entries GROUP BY type ORDER BY type"))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+
+def _batched(items, size):
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def open_database(database=None):
+    """دیتابیس پیش‌فرض داخلی، یک مسیر SQLite یا هر نگاشت دیکشنری‌مانند"""
+    if database is None:
+        from analysis.sequence_db import SEQUENCE_DATABASE
+        return SEQUENCE_DATABASE
+    if isinstance(database, str):
+        return SequenceStore(database)
+    return database
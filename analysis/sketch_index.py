@@ -0,0 +1,213 @@
+import sqlite3
+import threading
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+
+from analysis.encoding import encode_sequence
+from analysis.hairpin_finder import reverse_complement_codes
+from analysis.packed_sequence import as_text
+from analysis.repeat_finder import kmer_codes
+from analysis.sequence_store import database_fingerprints, sequence_digest
+
+# بیشترین تعداد پارامتر در هر پرس‌وجوی IN
+_QUERY_BATCH = 900
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sketch_params (k INTEGER NOT NULL, scaled INTEGER NOT NULL);
+CREATE TABLE IF NOT EXISTS sketch_entries (
+    id TEXT PRIMARY KEY,
+    kmers INTEGER NOT NULL,
+    hashes INTEGER NOT NULL,
+    sketch BLOB NOT NULL,
+    digest TEXT
+);
+CREATE TABLE IF NOT EXISTS sketch_hashes (
+    hash INTEGER NOT NULL,
+    id TEXT NOT NULL,
+    PRIMARY KEY (hash, id)
+) WITHOUT ROWID;
+"""
+
+
+def _mix(values):
+    """درهم‌سازی splitmix64 روی آرایه‌ی uint64 (ضرب‌ها به پیمانه‌ی ۲^۶۴)"""
+    values = values + np.uint64(0x9E3779B97F4A7C15)
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+def _canonical_codes(sequence, k):
+    """کد k-merهای متعارف هر موقعیت بدون N (با تکرار)"""
+    codes = encode_sequence(as_text(sequence).upper())
+    forward, valid = kmer_codes(codes, k)
+    if not len(forward):
+        return forward
+    backward, _ = kmer_codes(reverse_complement_codes(codes), k)
+    return np.minimum(forward, backward[::-1])[valid]
+
+
+def _sorted_unique(values):
+    """مقادیر یکتای مرتب؛ مرتب‌سازی و مقایسه با همسایه از np.unique سریع‌تر است"""
+    values = np.sort(values)
+    return values[np.concatenate(([True], values[1:] != values[:-1]))] if len(values) else values
+
+
+def canonical_kmers(sequence, k):
+    """کد k-merهای متعارف (کمینه‌ی k-mer و مکمل معکوس آن) بدون N، به صورت یکتا"""
+    return _sorted_unique(_canonical_codes(sequence, k))
+
+
+def sketch(sequence, k=15, scaled=8):
+    """طرح FracMinHash: درهم همه‌ی k-merهای متعارفی که در کسر 1/scaled پایینی فضا هستند
+
+    خروجی (تخمین تعداد k-merهای یکتا، آرایه‌ی مرتب درهم‌ها به صورت int64) است.
+    درهم‌ها پیش از یکتاسازی فیلتر می‌شوند تا مرتب‌سازی فقط روی کسر 1/scaled
+    اجرا شود؛ چون splitmix64 دوسویی است، تعداد k-merهای یکتا scaled برابر
+    تعداد درهم‌های طرح تخمین زده می‌شود (با scaled=1 دقیق است).
+    """
+    hashes = _mix(_canonical_codes(sequence, k))
+    limit = np.uint64(np.iinfo(np.uint64).max // np.uint64(scaled))
+    hashes = _sorted_unique(hashes[hashes <= limit])
+    return len(hashes) * scaled, hashes.view(np.int64)
+
+
+class SketchIndex:
+    """اندیس طرح‌های k-mer برای شناسایی تقریبی روی SQLite
+
+    برای هر مرجع طرح FracMinHash ذخیره می‌شود و یک اندیس معکوس درهم به
+    مرجع‌ها امکان می‌دهد فقط مرجع‌هایی که درهم مشترک دارند بررسی شوند. چون
+    درهم‌های طرح کسر ثابتی از k-merها هستند، شباهت (Jaccard) و شمول
+    (containment: کسری از k-merهای پرسش که در مرجع هستند) مستقیماً از
+    تعداد درهم‌های مشترک تخمین زده می‌شود. حافظه‌ی هر پرسش فقط به طول پرسش
+    و تعداد مرجع‌های نامزد بستگی دارد.
+    """
+
+    def __init__(self, path=':memory:', k=15, scaled=8):
+        self.path = path
+        self._lock = threading.RLock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.executescript(_SCHEMA)
+        columns = [row[1] for row in self._connection.execute("PRAGMA table_info(sketch_entries)")]
+        if 'digest' not in columns:
+            # طرح‌های قدیمی بدون digest در اولین sync دوباره ساخته می‌شوند
+            with self._connection:
+                self._connection.execute("ALTER TABLE sketch_entries ADD COLUMN digest TEXT")
+        stored = self._connection.execute("SELECT k, scaled FROM sketch_params").fetchall()
+        if stored:
+            # پارامترهای طرح‌های ذخیره‌شده بر پارامترهای داده‌شده مقدم است
+            k, scaled = stored[0]
+        else:
+            with self._connection:
+                self._connection.execute("INSERT INTO sketch_params VALUES (?, ?)", (k, scaled))
+        self.k = k
+        self.scaled = scaled
+
+    def __getstate__(self):
+        if self.path == ':memory:':
+            raise TypeError("An in-memory SketchIndex cannot be shared between processes")
+        return {'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(state['path'])
+
+    def _query(self, sql, parameters=()):
+        with self._lock:
+            return self._connection.execute(sql, parameters).fetchall()
+
+    def __len__(self):
+        return self._query("SELECT COUNT(*) FROM sketch_entries")[0][0]
+
+    def __contains__(self, seq_id):
+        return bool(self._query("SELECT 1 FROM sketch_entries WHERE id = ?", (seq_id,)))
+
+    def add(self, seq_id, sequence):
+        self.add_many([(seq_id, sequence)])
+
+    def add_many(self, entries, batch_size=500):
+        """افزودن یا جایگزینی طرح مرجع‌ها از زوج‌های (شناسه، توالی)"""
+        entries = iter(entries)
+        while True:
+            batch = [(seq_id, sketch(sequence, self.k, self.scaled), sequence_digest(sequence))
+                     for seq_id, sequence in islice(entries, batch_size)]
+            if not batch:
+                return
+            # درج به ترتیب درهم، صفحه‌های B-tree را پشت سر هم پر می‌کند
+            postings = sorted((value, seq_id) for seq_id, (_, hashes), _ in batch
+                              for value in hashes.tolist())
+            with self._lock, self._connection:
+                for seq_id, (kmers, hashes), digest in batch:
+                    self._remove(seq_id)
+                    self._connection.execute(
+                        "INSERT INTO sketch_entries (id, kmers, hashes, sketch, digest) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (seq_id, kmers, len(hashes), hashes.tobytes(), digest))
+                self._connection.executemany("INSERT INTO sketch_hashes VALUES (?, ?)", postings)
+
+    def remove(self, seq_id):
+        with self._lock, self._connection:
+            self._remove(seq_id)
+
+    def _remove(self, seq_id):
+        rows = self._connection.execute(
+            "SELECT sketch FROM sketch_entries WHERE id = ?", (seq_id,)).fetchall()
+        if not rows:
+            return
+        hashes = np.frombuffer(rows[0][0], dtype=np.int64).tolist()
+        self._connection.executemany("DELETE FROM sketch_hashes WHERE hash = ? AND id = ?",
+                                     ((value, seq_id) for value in hashes))
+        self._connection.execute("DELETE FROM sketch_entries WHERE id = ?", (seq_id,))
+
+    def sync(self, database):
+        """هم‌گام‌سازی با database: طرح مدخل‌های حذف‌شده پاک و مدخل‌های جدید یا
+        تغییرکرده (بر اساس digest محتوا) دوباره ساخته می‌شوند"""
+        current = database_fingerprints(database)
+        stored = dict(self._query("SELECT id, digest FROM sketch_entries"))
+        removed = stored.keys() - current.keys()
+        if removed:
+            with self._lock, self._connection:
+                for seq_id in removed:
+                    self._remove(seq_id)
+        self.add_many(
+            (seq_id, database[seq_id]['sequence'])
+            for seq_id, digest in current.items() if stored.get(seq_id) != digest
+        )
+
+    def search(self, sequence, limit=10, min_containment=0.0):
+        """مرجع‌ها به ترتیب شمول تخمینی پرسش در آن‌ها
+
+        خروجی دیکشنری‌های id، shared (درهم مشترک)، containment و jaccard است.
+        """
+        _, hashes = sketch(sequence, self.k, self.scaled)
+        if not len(hashes):
+            return []
+        shared = Counter()
+        values = hashes.tolist()
+        for start in range(0, len(values), _QUERY_BATCH):
+            batch = values[start:start + _QUERY_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            shared.update(dict(self._query(
+                f"SELECT id, COUNT(*) FROM sketch_hashes WHERE hash IN ({placeholders}) GROUP BY id",
+                batch)))
+        results = []
+        for seq_id, count in shared.most_common():
+            containment = count / len(hashes)
+            if containment < min_containment:
+                break
+            reference_hashes = self._query(
+                "SELECT hashes FROM sketch_entries WHERE id = ?", (seq_id,))[0][0]
+            results.append({
+                'id': seq_id,
+                'shared': count,
+                'containment': round(containment, 4),
+                'jaccard': round(count / (len(hashes) + reference_hashes - count), 4),
+            })
+            if limit and len(results) >= limit:
+                break
+        return results
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -1,15 +1,167 @@
+import os
+
+import numpy as np
+
+from analysis.packed_sequence import PackedSequence, as_text
+from analysis.parallel import imap_bounded
+from analysis.sequence_aligner import SequenceAligner
+
+_GAP = ord('-')
+
+def _call_in_worker(shared, task):
+    _, sample = task
+    analyzer, reference = shared
+    return analyzer.call_variants(reference, sample)
+
+
+def _as_bytes(sequence):
+    """آرایه‌ی بایتی نویسه‌ها؛ توالی فشرده بدون ساخت رشته‌ی میانی باز می‌شود"""
+    if isinstance(sequence, PackedSequence):
+        return np.frombuffer(b'ACGTN', dtype=np.uint8)[sequence.to_codes()]
+    return np.frombuffer(sequence.encode('latin-1'), dtype=np.uint8)
+
+
+def _runs(mask):
+    """ابتدا و انتهای بازه‌های پیوسته‌ی True"""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return edges[0::2].tolist(), edges[1::2].tolist()
+
+
 class SNPAnalyzer:
+    def __init__(self, aligner=None, ungapped_threshold=0.02, banded_length=5000):
+        # بالاتر از این نسبت ناهمخوانی، توالی‌های هم‌طول هم همتراز می‌شوند
+        self.ungapped_threshold = ungapped_threshold
+        self.banded_length = banded_length
+        self.aligner = aligner
+
     def find_snps(self, reference, sample):
         """شناسایی تفاوت‌های توالی"""
-        snps = []
-        for i, (ref, sam) in enumerate(zip(reference, sample)):
-            if ref != sam:
-                snps.append({
-                    'position': i+1,
-                    'reference': ref,
-                    'sample': sam
-                })
-        return snps
+        ref, sam = _as_bytes(reference), _as_bytes(sample)
+        length = min(len(ref), len(sam))
+        positions = np.flatnonzero(ref[:length] != sam[:length])
+        return self._snps(positions, ref, sam)
+
+    def _snps(self, positions, ref, sam):
+        return [
+            {
+                'position': i + 1,
+                'reference': chr(r),
+                'sample': chr(s)
+            }
+            for i, r, s in zip(positions.tolist(), ref[positions].tolist(), sam[positions].tolist())
+        ]
+
+    def call_variants(self, reference, sample):
+        """فراخوانی SNP، درج و حذف با همترازی نمونه به مرجع
+
+        موقعیت‌ها ۱-مبنا و به سبک VCF هستند: درج و حذف به باز قبلی مرجع
+        (یا باز بعدی در ابتدای توالی) لنگر می‌شوند.
+        """
+        ref, sam = _as_bytes(reference), _as_bytes(sample)
+        if len(ref) == len(sam):
+            # مسیر سریع بدون همترازی برای توالی‌های هم‌طول با تفاوت کم
+            positions = np.flatnonzero(ref != sam)
+            if len(positions) <= self.ungapped_threshold * len(ref):
+                return [dict(snp, type='snp') for snp in self._snps(positions, ref, sam)]
+        alignment = self._aligner_for(len(ref), len(sam)).align(sample, reference)
+        return self.variants_from_alignment(as_text(reference), alignment['aligned_target'],
+                                            alignment['aligned_query'])
+
+    def _aligner_for(self, reference_length, sample_length):
+        if self.aligner is not None:
+            return self.aligner
+        if max(reference_length, sample_length) > self.banded_length:
+            return SequenceAligner(band=32)
+        return SequenceAligner()
+
+    def variants_from_alignment(self, reference, aligned_reference, aligned_sample):
+        """استخراج واریانت‌ها از دو رشته‌ی همترازشده‌ی global"""
+        ref = _as_bytes(aligned_reference)
+        sam = _as_bytes(aligned_sample)
+        ref_gap, sam_gap = ref == _GAP, sam == _GAP
+        # تعداد بازهای مرجع تا هر ستون (شامل خود ستون)
+        ref_position = np.cumsum(~ref_gap)
+        variants = []
+
+        columns = np.flatnonzero(~ref_gap & ~sam_gap & (ref != sam))
+        for column, r, s in zip(columns.tolist(), ref[columns].tolist(), sam[columns].tolist()):
+            variants.append({'type': 'snp', 'position': int(ref_position[column]),
+                             'reference': chr(r), 'sample': chr(s)})
+
+        for start, end in zip(*_runs(ref_gap)):
+            inserted = aligned_sample[start:end]
+            after = int(ref_position[start])
+            if after:
+                anchor = reference[after - 1]
+                variants.append({'type': 'insertion', 'position': after,
+                                 'reference': anchor, 'sample': anchor + inserted})
+            elif reference:
+                variants.append({'type': 'insertion', 'position': 1,
+                                 'reference': reference[0], 'sample': inserted + reference[0]})
+
+        for start, end in zip(*_runs(sam_gap & ~ref_gap)):
+            first, last = int(ref_position[start]), int(ref_position[end - 1])
+            if first > 1:
+                variants.append({'type': 'deletion', 'position': first - 1,
+                                 'reference': reference[first - 2:last],
+                                 'sample': reference[first - 2]})
+            elif last < len(reference):
+                variants.append({'type': 'deletion', 'position': 1,
+                                 'reference': reference[:last + 1],
+                                 'sample': reference[last]})
+
+        variants.sort(key=lambda variant: variant['position'])
+        return variants
+
+    def call_variants_batch(self, reference, samples, workers=None, chunk_size=4, ordered=True):
+        """فراخوانی واریانت برای تعداد زیادی نمونه در برابر یک مرجع
+
+        samples می‌تواند شامل رشته یا زوج (نام، توالی) باشد؛ خروجی برای هر
+        نمونه {'id', 'variants'} یا {'id', 'error'} است.
+        """
+        tasks = (
+            record if isinstance(record, tuple) and len(record) == 2 else (number, record)
+            for number, record in enumerate(samples)
+        )
+        for (name, _), variants, error in imap_bounded(
+                _call_in_worker, tasks, workers=workers, chunk_size=chunk_size,
+                ordered=ordered, shared=(self, reference)):
+            yield {'id': name, 'error': error} if error else {'id': name, 'variants': variants}
+
+    def write_vcf(self, handle, variants, sample='SAMPLE', chrom='ref', reference_length=None):
+        """نوشتن جریانی واریانت‌های یک نمونه به قالب VCF 4.2 (ژنوتیپ هاپلوئید)"""
+        handle.write('##fileformat=VCFv4.2\n')
+        handle.write('##source=DNA Analyzer\n')
+        if reference_length is not None:
+            handle.write(f'##contig=<ID={chrom},length={reference_length}>\n')
+        handle.write('##INFO=<ID=TYPE,Number=1,Type=String,Description="Variant type">\n')
+        handle.write('##FORMAT=<ID=GT,Number=1,Type=String,Description="Genotype">\n')
+        handle.write(f'#CHROM\tPOS\tID\tREF\tALT\tQUAL\tFILTER\tINFO\tFORMAT\t{sample}\n')
+        count = 0
+        for variant in variants:
+            handle.write(f"{chrom}\t{variant['position']}\t.\t{variant['reference']}\t"
+                         f"{variant['sample']}\t.\tPASS\tTYPE={variant['type']}\tGT\t1\n")
+            count += 1
+        return count
+
+    def write_cohort_vcf(self, reference, samples, directory, chrom='ref', workers=None):
+        """فراخوانی دسته‌ای و نوشتن یک فایل VCF برای هر نمونه به محض آماده شدن
+
+        فقط واریانت‌های یک نمونه در هر لحظه در حافظه نگه داشته می‌شود.
+        خروجی زوج‌های (نام نمونه، مسیر فایل یا پیام خطا) است.
+        """
+        os.makedirs(directory, exist_ok=True)
+        reference_length = len(reference)
+        for result in self.call_variants_batch(reference, samples, workers=workers, ordered=False):
+            name = str(result['id'])
+            if 'error' in result:
+                yield name, result['error']
+                continue
+            path = os.path.join(directory, f"{name}.vcf")
+            with open(path, 'w') as handle:
+                self.write_vcf(handle, result['variants'], sample=name, chrom=chrom,
+                               reference_length=reference_length)
+            yield name, path
 
     def predict_impact(self, snp):
         """پیش‌بینی تاثیر SNP با هوش مصنوعی"""
@@ -0,0 +1,144 @@
+"""Import-time and cold-start measurements
+
+Every measurement runs in a fresh interpreter so nothing is served from an
+already-populated sys.modules. Examples:
+
+    python -m benchmarks.startup                       # default modules and startup paths
+    python -m benchmarks.startup --module analysis.dna_detector --top 15
+    python -m benchmarks.startup --runs 10 --json
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MODULES = ('main', 'analysis.dna_detector', 'analysis.enzyme_analyzer',
+                   'models.alphafold', 'models.llm_integration')
+
+# Dependencies that should only be loaded once the feature using them runs
+HEAVY = ('numpy', 'Bio', 'requests', 'transformers', 'torch', 'concurrent.futures.process')
+
+# Cold start to the first shown window, offscreen so it runs without a display
+WINDOW_SCRIPT = """
+import sys
+from qtpy.QtWidgets import QApplication
+import main
+app = QApplication(sys.argv)
+window = main.MainWindow()
+window.show()
+app.processEvents()
+"""
+
+# Cold start to the first analysis result
+CLI_SCRIPT = """
+from analysis.dna_detector import DNADetector
+DNADetector().detect_features('ATGCGTATAAATGCGCGCGCTTAGGCATATATAT' * 4)
+"""
+
+STARTUP = {'window': WINDOW_SCRIPT, 'cli': CLI_SCRIPT}
+
+
+def _run(args, env=None):
+    environment = dict(os.environ, PYTHONPATH=ROOT, **(env or {}))
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=environment,
+                          capture_output=True, text=True, check=True)
+
+
+def import_profile(module):
+    """One `-X importtime` run: {module name: (self us, cumulative us)} for module's imports
+
+    Imports made by interpreter startup (site, .pth hooks) are left out.
+    """
+    result = _run(['-X', 'importtime', '-c', f'import {module}'])
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        top_level = not name[1:].startswith(' ')
+        name = name.strip()
+        if top_level and name != module:
+            # Post-order: everything up to here belongs to an earlier top-level import
+            profile.clear()
+            continue
+        profile[name] = (int(own), int(cumulative))
+        if top_level:
+            break
+    return profile
+
+
+def import_time(module, runs=5, top=8):
+    """Median cumulative import time of module (seconds), its slowest imports and heavy deps"""
+    profiles = [import_profile(module) for _ in range(runs)]
+    totals = [profile[module][1] for profile in profiles if module in profile]
+    last = profiles[-1]
+    return {
+        'module': module,
+        'seconds': statistics.median(totals) / 1e6,
+        'modules': len(last),
+        'heavy': sorted(name for name in HEAVY if name in last),
+        'slowest': sorted(((name, cumulative / 1e6) for name, (_, cumulative) in last.items()
+                           if name != module), key=lambda item: -item[1])[:top],
+    }
+
+
+def startup_time(target, runs=5):
+    """Median wall time (seconds) of a fresh interpreter running a startup script"""
+    env = {'QT_QPA_PLATFORM': 'offscreen'} if target == 'window' else None
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _run(['-c', STARTUP[target]], env)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure import time and cold start")
+    parser.add_argument('--module', action='append', help="module to import (repeatable)")
+    parser.add_argument('--startup', action='append', choices=sorted(STARTUP),
+                        help="startup path to time (repeatable, default: all)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8, help="slowest imports to list per module")
+    parser.add_argument('--json', action='store_true', help="print results as JSON")
+    args = parser.parse_args(argv)
+
+    report = {'imports': [], 'startup': {}}
+    for module in args.module or DEFAULT_MODULES:
+        try:
+            entry = import_time(module, args.runs, args.top)
+        except subprocess.CalledProcessError as error:
+            entry = {'module': module, 'error': error.stderr.strip().splitlines()[-1]}
+        report['imports'].append(entry)
+    for target in args.startup or sorted(STARTUP):
+        try:
+            report['startup'][target] = startup_time(target, args.runs)
+        except subprocess.CalledProcessError as error:
+            report['startup'][target] = {'error': error.stderr.strip().splitlines()[-1]}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    for entry in report['imports']:
+        if 'error' in entry:
+            print(f"{entry['module']}: {entry['error']}")
+            continue
+        heavy = ', '.join(entry['heavy']) or '-'
+        print(f"{entry['module']}: {entry['seconds'] * 1000:.1f} ms, "
+              f"{entry['modules']} modules, heavy: {heavy}")
+        for name, seconds in entry['slowest']:
+            print(f"    {seconds * 1000:8.1f} ms  {name}")
+    for target, seconds in report['startup'].items():
+        if isinstance(seconds, dict):
+            print(f"startup {target}: {seconds['error']}")
+        else:
+            print(f"startup {target}: {seconds * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
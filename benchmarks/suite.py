@@ -0,0 +1,252 @@
+"""Scaling benchmarks for the analysis package on seeded synthetic genomes
+
+Each case (analyzer x profile x size) runs in a fresh interpreter so a slow or
+memory-hungry case can be stopped by --timeout without losing the others.
+Wall time is the best of several runs, peak memory is measured with
+tracemalloc in a separate run, and the number of results is recorded so
+behaviour changes show up next to performance changes.
+
+    python -m benchmarks.suite --quick                  # 1 kb - 100 kb
+    python -m benchmarks.suite --analyzer find_repeats --max-size 10000000
+    python -m benchmarks.suite --quick --save-baseline  # record benchmarks/baseline.json
+
+When a baseline exists every case present in it is compared; times are scaled
+by a calibration workload so baselines recorded on another machine still
+apply. The exit status is 1 if any case regressed or changed its results.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from benchmarks.synthetic import PROFILES, generate, mutate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+QUICK_SIZES = (1_000, 10_000, 100_000)
+
+
+# Each setup returns a one-argument callable; imports and construction are not timed
+def _detector_method(name):
+    def setup(sequence, seed):
+        from analysis.dna_detector import DNADetector
+
+        return getattr(DNADetector(), name)
+    return setup
+
+
+def _find_snps(sequence, seed):
+    from analysis.snp_analyzer import SNPAnalyzer
+
+    analyzer = SNPAnalyzer()
+    sample = mutate(sequence, rate=0.001, seed=seed + 1)
+    return lambda reference: analyzer.find_snps(reference, sample[:len(reference)])
+
+
+def _find_cut_sites(sequence, seed):
+    from analysis.enzyme_analyzer import EnzymeAnalyzer
+
+    return EnzymeAnalyzer().find_cut_sites
+
+
+def _genome_tracks(sequence, seed):
+    from analysis.genome_tracks import genome_tracks
+
+    return lambda text: genome_tracks(text, 1000, 100)['start']
+
+
+ANALYZERS = {
+    'find_repeats': _detector_method('find_repeats'),
+    'detect_hairpins': _detector_method('detect_hairpins'),
+    'find_open_reading_frames': _detector_method('find_open_reading_frames'),
+    'find_patterns': _detector_method('find_patterns'),
+    'find_snps': _find_snps,
+    'find_cut_sites': _find_cut_sites,
+    'genome_tracks': _genome_tracks,
+}
+
+
+def case_key(analyzer, profile, size):
+    return f"{analyzer}/{profile}/{size}"
+
+
+def count_results(result):
+    """Number of reported items; mappings of lists count every listed item"""
+    if isinstance(result, dict):
+        return sum(len(value) if hasattr(value, '__len__') else 1 for value in result.values())
+    return len(result)
+
+
+def run_case(analyzer, profile, size, seed=0, min_time=0.2, max_repeats=5):
+    """Measure one case in this process"""
+    sequence = generate(profile, size, seed)
+    function = ANALYZERS[analyzer](sequence, seed)
+    # Warm caches (compiled tables, lazy imports) on a short prefix
+    function(sequence[:1000])
+
+    timings = []
+    while len(timings) < max_repeats and sum(timings) < min_time:
+        start = time.perf_counter()
+        result = function(sequence)
+        timings.append(time.perf_counter() - start)
+    count = count_results(result)
+    del result
+
+    tracemalloc.start()
+    function(sequence)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = min(timings)
+    return {
+        'analyzer': analyzer,
+        'profile': profile,
+        'size': size,
+        'seconds': seconds,
+        'peak_bytes': peak,
+        'bases_per_second': size / seconds if seconds else None,
+        'results': count,
+        'repeats': len(timings),
+    }
+
+
+def run_case_isolated(analyzer, profile, size, seed=0, timeout=None):
+    """run_case in a fresh interpreter; failures and timeouts become an 'error' entry"""
+    command = [sys.executable, '-m', 'benchmarks.suite', '--run-case', analyzer, profile,
+               str(size), '--seed', str(seed)]
+    entry = {'analyzer': analyzer, 'profile': profile, 'size': size}
+    try:
+        completed = subprocess.run(command, cwd=ROOT, capture_output=True, text=True,
+                                   timeout=timeout, env=dict(os.environ, PYTHONPATH=ROOT))
+    except subprocess.TimeoutExpired:
+        return dict(entry, error=f"timeout after {timeout} s")
+    if completed.returncode:
+        lines = completed.stderr.strip().splitlines() or ['failed']
+        return dict(entry, error=lines[-1])
+    return json.loads(completed.stdout)
+
+
+def calibrate(repeats=10):
+    """Seconds for a fixed NumPy + interpreter workload, used to scale baselines"""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 1 << 30, size=1_000_000)
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        np.sort(values)
+        np.cumsum(values)
+        total = 0
+        for number in range(200_000):
+            total += number % 7
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def compare(results, baseline, scale, tolerance, memory_tolerance):
+    """Regressions against a baseline: (key, message) for every failing case"""
+    failures = []
+    for entry in results:
+        key = case_key(entry['analyzer'], entry['profile'], entry['size'])
+        reference = baseline.get(key)
+        if reference is None or 'error' in reference:
+            continue
+        if 'error' in entry:
+            failures.append((key, entry['error']))
+            continue
+        if entry['results'] != reference['results']:
+            failures.append((key, f"results changed: {reference['results']} -> {entry['results']}"))
+        expected = reference['seconds'] * scale
+        # Differences of a few milliseconds are timer noise, not regressions
+        if entry['seconds'] > expected * (1 + tolerance) and entry['seconds'] - expected > 0.005:
+            failures.append((key, f"time {expected:.4f} s -> {entry['seconds']:.4f} s"))
+        allowed = reference['peak_bytes'] * (1 + memory_tolerance) + (1 << 20)
+        if entry['peak_bytes'] > allowed:
+            failures.append((key, f"peak memory {reference['peak_bytes']:,} -> "
+                                  f"{entry['peak_bytes']:,} bytes"))
+    return failures
+
+
+def _format(entry):
+    label = f"{entry['analyzer']:<26}{entry['profile']:<16}{entry['size']:>10,}"
+    if 'error' in entry:
+        return f"{label}  {entry['error']}"
+    return (f"{label}  {entry['seconds'] * 1000:10.2f} ms  {entry['peak_bytes'] / 2**20:9.2f} MiB"
+            f"  {entry['bases_per_second'] / 1e6:9.2f} Mb/s  {entry['results']:>10,} results")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analysis scaling benchmarks")
+    parser.add_argument('--analyzer', action='append', choices=sorted(ANALYZERS))
+    parser.add_argument('--profile', action='append', choices=sorted(PROFILES))
+    parser.add_argument('--sizes', type=lambda value: [int(size) for size in value.split(',')],
+                        help="comma-separated sizes in bases (default: 1 kb to 10 Mb)")
+    parser.add_argument('--quick', action='store_true', help="sizes up to 100 kb only")
+    parser.add_argument('--max-size', type=int, help="skip sizes above this")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=300, help="seconds per case")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="write this run as the baseline instead of comparing")
+    parser.add_argument('--tolerance', type=float, default=0.5, help="allowed slowdown fraction")
+    parser.add_argument('--memory-tolerance', type=float, default=0.2)
+    parser.add_argument('--json', help="also write all results to this file")
+    parser.add_argument('--run-case', nargs=3, metavar=('ANALYZER', 'PROFILE', 'SIZE'),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.run_case:
+        analyzer, profile, size = args.run_case
+        print(json.dumps(run_case(analyzer, profile, int(size), args.seed)))
+        return 0
+
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+    if args.max_size:
+        sizes = [size for size in sizes if size <= args.max_size]
+    calibration = calibrate()
+    results = []
+    for analyzer in args.analyzer or ANALYZERS:
+        for profile in args.profile or PROFILES:
+            for size in sizes:
+                entry = run_case_isolated(analyzer, profile, size, args.seed, args.timeout)
+                results.append(entry)
+                print(_format(entry), flush=True)
+    # The faster of two calibrations, before and after the run, is least affected by load
+    calibration = min(calibration, calibrate())
+
+    if args.json:
+        with open(args.json, 'w') as handle:
+            json.dump({'calibration': calibration, 'results': results}, handle, indent=2)
+    if args.save_baseline:
+        cases = {case_key(entry['analyzer'], entry['profile'], entry['size']): entry
+                 for entry in results}
+        with open(args.baseline, 'w') as handle:
+            json.dump({'calibration': calibration, 'seed': args.seed, 'cases': cases}, handle,
+                      indent=1, sort_keys=True)
+            handle.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        return 0
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+    if baseline.get('seed', 0) != args.seed:
+        print(f"Baseline was recorded with seed {baseline.get('seed')}; not comparing")
+        return 0
+    scale = calibration / baseline['calibration']
+    failures = compare(results, baseline['cases'], scale, args.tolerance, args.memory_tolerance)
+    print(f"Compared with {args.baseline} (machine speed factor {scale:.2f}): "
+          f"{len(failures)} regression(s)")
+    for key, message in failures:
+        print(f"  {key}: {message}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Seeded synthetic genomes for benchmarks
+
+Every generator takes (length, seed) and returns an uppercase DNA string; the
+same arguments always produce the same sequence, so result counts can be
+compared across runs and machines.
+"""
+import numpy as np
+
+BASES = np.frombuffer(b'ACGT', dtype=np.uint8)
+
+
+def _decode(codes):
+    return BASES[codes].tobytes().decode('ascii')
+
+
+def random_genome(length, seed=0, gc=0.5):
+    """Independent bases with the given GC fraction"""
+    rng = np.random.default_rng(seed)
+    probabilities = [(1 - gc) / 2, gc / 2, gc / 2, (1 - gc) / 2]
+    return _decode(rng.choice(4, size=length, p=probabilities))
+
+
+def repeat_rich(length, seed=0, families=20, family_length=(50, 400), fraction=0.5,
+                divergence=0.02):
+    """Random background with interspersed copies of a few repeat families
+
+    About `fraction` of the genome is covered by copies of `families` random
+    elements, each copy mutated at `divergence` of its positions, plus short
+    tandem repeats.
+    """
+    rng = np.random.default_rng(seed)
+    codes = rng.integers(0, 4, size=length, dtype=np.uint8)
+    low, high = family_length
+    elements = [rng.integers(0, 4, size=rng.integers(low, high + 1), dtype=np.uint8)
+                for _ in range(families)]
+    covered = 0
+    while covered < fraction * length:
+        element = elements[rng.integers(families)]
+        if rng.random() < 0.2:
+            # Tandem repeat of a short unit
+            unit = rng.integers(0, 4, size=rng.integers(2, 7), dtype=np.uint8)
+            element = np.tile(unit, rng.integers(5, 40))
+        element = element.copy()
+        mutated = rng.random(len(element)) < divergence
+        element[mutated] = rng.integers(0, 4, size=int(mutated.sum()), dtype=np.uint8)
+        start = rng.integers(0, max(1, length - len(element)))
+        piece = element[:length - start]
+        codes[start:start + len(piece)] = piece
+        covered += len(piece)
+    return _decode(codes)
+
+
+def low_complexity(length, seed=0):
+    """Homopolymer, dinucleotide and short-period runs with little random sequence"""
+    rng = np.random.default_rng(seed)
+    pieces, total = [], 0
+    while total < length:
+        kind = rng.integers(4)
+        run = int(rng.integers(10, 200))
+        if kind == 0:
+            piece = np.full(run, rng.integers(4), dtype=np.uint8)
+        elif kind == 1:
+            piece = np.resize(rng.integers(0, 4, size=2, dtype=np.uint8), run)
+        elif kind == 2:
+            piece = np.resize(rng.integers(0, 4, size=rng.integers(3, 7), dtype=np.uint8), run)
+        else:
+            piece = rng.integers(0, 4, size=int(rng.integers(5, 20)), dtype=np.uint8)
+        pieces.append(piece)
+        total += len(piece)
+    return _decode(np.concatenate(pieces)[:length])
+
+
+def mutate(sequence, rate=0.001, seed=0):
+    """Copy of sequence with substitutions at `rate` of its positions (same length)"""
+    rng = np.random.default_rng(seed)
+    codes = np.frombuffer(sequence.encode('ascii'), dtype=np.uint8).copy()
+    positions = np.flatnonzero(rng.random(len(codes)) < rate)
+    # Shift each chosen base to one of the three other bases
+    lookup = np.zeros(256, dtype=np.uint8)
+    lookup[BASES] = np.arange(4)
+    shifted = (lookup[codes[positions]] + rng.integers(1, 4, size=len(positions))) % 4
+    codes[positions] = BASES[shifted]
+    return codes.tobytes().decode('ascii')
+
+
+PROFILES = {
+    'random': random_genome,
+    'gc_rich': lambda length, seed=0: random_genome(length, seed, gc=0.65),
+    'repeat_rich': repeat_rich,
+    'low_complexity': low_complexity,
+}
+
+
+def generate(profile, length, seed=0):
+    """Sequence of the named profile"""
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown profile: {profile}")
+    return PROFILES[profile](length, seed)
@@ -0,0 +1,288 @@
+"""اجرای دسته‌ای تحلیل‌ها روی فایل‌های FASTA بدون رابط گرافیکی
+
+هیچ ماژول Qt بارگذاری نمی‌شود، پس روی سرورهای بدون نمایشگر هم اجرا می‌شود:
+
+    python cli.py detect genome.fa -o features.jsonl --window 100000
+    python cli.py detect reads.fa -o features.jsonl --metrics stages.prom --profile
+    python cli.py digest plasmids.fa -o digests.tsv --enzymes EcoRI,BamHI --enzymes HindIII
+    python cli.py snps reference.fa samples.fq.gz -o variants.parquet
+    python cli.py codon proteins.fa -o optimized.jsonl --host human --strategy balanced
+    python cli.py tracks genome.fa -o genome --window 1000 --step 100 --track gc --track cpg_oe
+
+نتایج به ترتیب ورودی و به محض آماده شدن نوشته می‌شوند. با --resume خروجی
+موجود نگه داشته می‌شود و اجرا از اولین رکورد کامل‌نشده ادامه پیدا می‌کند.
+"""
+import argparse
+import re
+import sys
+import time
+from itertools import islice
+
+from utils.file_io import read_records, read_windows
+from utils.result_writers import FORMATS, open_writer
+
+# N و کدهای مبهم IUPAC حذف نمی‌شوند تا مختصات با ژنوم یکی بماند؛ detect
+# رکوردها و پنجره‌ها را در محل Nها می‌شکند و سایر کدهای مبهم را با خطا گزارش می‌کند
+IUPAC_DNA = 'ACGTNRYKMSWBDHV'
+
+# بخش‌های بدون N میان شکاف‌های اسمبلی
+_CALLED_SEGMENT = re.compile(r'[^N]+')
+
+# حروف مجاز پروتئین در ورودی بهینه‌سازی کدون (* = کدون پایان)
+PROTEIN_ALPHABET = 'ACDEFGHIKLMNPQRSTVWYXBZ*'
+
+
+def _record_id(name, number):
+    """شناسه‌ی رکورد اولین کلمه‌ی سرآیند است؛ رکورد بدون سرآیند با شماره‌اش نام‌گذاری می‌شود"""
+    return (name or '').partition(' ')[0] or f"record_{number}"
+
+
+def _named(records):
+    for number, (name, sequence) in enumerate(records):
+        yield _record_id(name, number), sequence
+
+
+def _split_gaps(record_id, name, start, sequence):
+    """شکستن توالی در محل Nها؛ هر بخش با ناحیه‌ی ژنومی name:start-end (یک‌مبنا) نام‌گذاری می‌شود
+
+    توالی بدون N با همان record_id برمی‌گردد و توالی تماماً N حذف می‌شود.
+    """
+    if 'N' not in sequence:
+        yield record_id, sequence
+        return
+    for match in _CALLED_SEGMENT.finditer(sequence):
+        yield f"{name}:{start + match.start() + 1}-{start + match.end()}", match.group()
+
+
+def _comma_list(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+
+def _sizes(value):
+    return [int(size) for size in _comma_list(value)]
+
+
+def detect_columns():
+    from analysis.dna_detector import STAGES
+
+    columns = dict.fromkeys(('id',) + STAGES, 'json')
+    columns.update(id='str', length='int', gc_content='float', error='str')
+    return columns
+
+
+def run_detect(args, skip):
+    from analysis.dna_detector import DNADetector
+
+    # با --metrics یا متغیر محیطی DNA_INSTRUMENT زمان هر مرحله اندازه‌گیری می‌شود
+    detector = DNADetector(database=args.database,
+                           instrument=True if args.metrics else None,
+                           approximate=args.approximate)
+    detector.instrumentation.profile |= args.profile
+    detector.instrumentation.memory |= args.trace_memory
+    collector = None
+    if args.metrics:
+        from analysis.instrumentation import MetricsCollector
+
+        collector = detector.add_observer(MetricsCollector())
+    if args.window:
+        # هر پنجره یک رکورد با شناسه‌ی ناحیه‌ی name:start-end (یک‌مبنا) است
+        records = (
+            segment
+            for name, start, chunk in read_windows(args.input, args.window, args.step,
+                                                   alphabet=IUPAC_DNA)
+            for segment in _split_gaps(
+                f"{_record_id(name, 0)}:{start + 1}-{start + len(chunk)}",
+                _record_id(name, 0), start, chunk)
+        )
+    else:
+        records = (
+            segment
+            for record_id, sequence in _named(read_records(args.input, alphabet=IUPAC_DNA))
+            for segment in _split_gaps(record_id, record_id, 0, sequence)
+        )
+    try:
+        yield from detector.detect_features_batch(
+            islice(records, skip, None), workers=args.workers, chunk_size=args.chunk_size,
+            analyses=args.analyses)
+    finally:
+        # متریک‌های بخش انجام‌شده حتی با توقف زودهنگام نوشته می‌شوند
+        if collector is not None:
+            if args.metrics.endswith('.prom'):
+                collector.write_prometheus(args.metrics)
+            else:
+                collector.write_json(args.metrics)
+
+
+def run_digest(args, skip):
+    from analysis.enzyme_analyzer import EnzymeAnalyzer
+
+    analyzer = EnzymeAnalyzer()
+    records = islice(_named(read_records(args.input)), skip, None)
+    return analyzer.digest_batch(
+        records, args.enzymes, circular=args.circular, target=args.target,
+        workers=args.workers, chunk_size=args.chunk_size)
+
+
+def run_snps(args, skip):
+    from analysis.snp_analyzer import SNPAnalyzer
+
+    # N حذف نمی‌شود تا مختصات واریانت‌ها جابه‌جا نشود
+    reference = next(read_records(args.reference, alphabet='ACGTN'), None)
+    if reference is None:
+        raise ValueError(f"No reference sequence in {args.reference}")
+    records = islice(_named(read_records(args.input, alphabet='ACGTN')), skip, None)
+    return SNPAnalyzer().call_variants_batch(
+        reference[1], records, workers=args.workers, chunk_size=args.chunk_size)
+
+
+def run_codon(args, skip):
+    from analysis.codon_optimizer import CodonOptimizer
+
+    records = islice(_named(read_records(args.input, alphabet=PROTEIN_ALPHABET)), skip, None)
+    options = {}
+    if args.gc_target is not None:
+        options['gc_target'] = args.gc_target
+    if args.avoid_sites:
+        options['avoid_sites'] = args.avoid_sites
+    return CodonOptimizer().optimize_batch(
+        records, host=args.host, strategy=args.strategy, seed=args.seed, workers=args.workers,
+        chunk_size=args.chunk_size, start=skip, **options)
+
+
+def run_tracks(args):
+    """نوشتن هر ترک به فایل bedGraph (یا bigWig) جداگانه با پیشوند output"""
+    from analysis.genome_tracks import TRACKS, genome_tracks_file, write_bedgraph, write_bigwig
+
+    tracks = args.track or TRACKS
+    profiles = genome_tracks_file(args.input, args.window, args.step, tracks)
+    if args.bigwig:
+        # هدر bigWig طول همه‌ی رکوردها را لازم دارد، پس پروفایل‌ها (نه توالی‌ها) نگه داشته می‌شوند
+        profiles = [(_record_id(name, number), profile)
+                    for number, (name, profile) in enumerate(profiles)]
+        for track in tracks:
+            write_bigwig(f"{args.output}.{track}.bw", profiles, track, args.window, args.step)
+        return 0
+    handles = {track: open(f"{args.output}.{track}.bedGraph", 'w') for track in tracks}
+    try:
+        for track, handle in handles.items():
+            handle.write(f'track type=bedGraph name="{track}"\n')
+        for number, (name, profile) in enumerate(profiles):
+            for track, handle in handles.items():
+                write_bedgraph(handle, _record_id(name, number), profile, track, args.window,
+                               args.step)
+    finally:
+        for handle in handles.values():
+            handle.close()
+    return 0
+
+
+# ستون‌های خروجی و اجراکننده‌ی هر فرمان؛ run(args, skip) نتایج را از رکورد skip به بعد برمی‌گرداند
+COMMANDS = {
+    'detect': (detect_columns, run_detect),
+    'digest': (lambda: {'id': 'str', 'digests': 'json', 'error': 'str'}, run_digest),
+    'snps': (lambda: {'id': 'str', 'variants': 'json', 'error': 'str'}, run_snps),
+    'codon': (lambda: {'id': 'str', 'sequence': 'str', 'cai': 'float', 'gc_content': 'float',
+                       'error': 'str'}, run_codon),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='cli.py', description="Headless batch analysis of FASTA/FASTQ files")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('-o', '--output', default='-',
+                        help="output file (.jsonl, .tsv) or Parquet directory; default stdout")
+    common.add_argument('--format', choices=FORMATS, help="output format (default: from extension)")
+    common.add_argument('--workers', type=int, default=None,
+                        help="worker processes (default: all CPUs, 0: run in this process)")
+    common.add_argument('--chunk-size', type=int, default=4, help="records per worker task")
+    common.add_argument('--resume', action='store_true',
+                        help="keep existing output and continue after the last complete record")
+    common.add_argument('--quiet', action='store_true', help="no progress on stderr")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    detect = commands.add_parser('detect', parents=[common], help="DNADetector.detect_features")
+    detect.add_argument('input')
+    detect.add_argument('--analyses', type=_comma_list, default=None,
+                        help="comma-separated subset of patterns,orf,repeats,hairpins")
+    detect.add_argument('--window', type=int, help="analyze sliding windows of this size")
+    detect.add_argument('--step', type=int, help="window step (default: window size)")
+    detect.add_argument('--database', help="SQLite reference database for identification")
+    detect.add_argument('--approximate', action='store_true',
+                        help="identify by k-mer sketches when there is no exact match")
+    detect.add_argument('--metrics',
+                        help="write per-stage timings to this file (.prom: Prometheus, else JSON)")
+    detect.add_argument('--profile', action='store_true',
+                        help="cProfile each stage (top functions go to --metrics)")
+    detect.add_argument('--trace-memory', action='store_true',
+                        help="record each stage's tracemalloc peak")
+
+    digest = commands.add_parser('digest', parents=[common], help="restriction digestion")
+    digest.add_argument('input')
+    digest.add_argument('--enzymes', type=_comma_list, action='append', required=True,
+                        help="comma-separated enzyme combination (repeat for several)")
+    digest.add_argument('--circular', action='store_true')
+    digest.add_argument('--target', type=_sizes,
+                        help="comma-separated target fragment sizes to score digests against")
+
+    snps = commands.add_parser('snps', parents=[common], help="variant calling against a reference")
+    snps.add_argument('reference', help="FASTA file; its first record is the reference")
+    snps.add_argument('input', help="samples")
+
+    codon = commands.add_parser('codon', parents=[common], help="codon optimization of proteins")
+    codon.add_argument('input')
+    codon.add_argument('--host', default='e_coli')
+    codon.add_argument('--strategy', default='most_frequent')
+    codon.add_argument('--seed', type=int)
+    codon.add_argument('--gc-target', type=float)
+    codon.add_argument('--avoid-sites', type=_comma_list)
+
+    tracks = commands.add_parser('tracks', help="sliding-window GC, skew, entropy and CpG tracks")
+    tracks.add_argument('input')
+    tracks.add_argument('-o', '--output', required=True,
+                        help="output prefix; writes <prefix>.<track>.bedGraph")
+    tracks.add_argument('--window', type=int, default=1000)
+    tracks.add_argument('--step', type=int, help="window step (default: window size)")
+    tracks.add_argument('--track', action='append',
+                        choices=('gc', 'gc_skew', 'at_skew', 'entropy', 'cpg_oe'),
+                        help="track to write (repeatable, default: all)")
+    tracks.add_argument('--bigwig', action='store_true', help="write bigWig (needs pyBigWig)")
+    return parser
+
+
+def _progress(written, skipped, errors, started):
+    elapsed = time.perf_counter() - started
+    rate = written / elapsed if elapsed else 0.0
+    print(f"\r{written} records ({rate:.1f}/s), {errors} errors, {skipped} resumed",
+          end='', file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'tracks':
+        return run_tracks(args)
+    columns, run = COMMANDS[args.command]
+    started = time.perf_counter()
+    written = errors = 0
+    with open_writer(args.output, columns(), args.format, args.resume) as writer:
+        skipped = writer.completed
+        try:
+            for result in run(args, skipped):
+                writer.write(result)
+                written += 1
+                errors += 'error' in result
+                if not args.quiet and written % 100 == 0:
+                    _progress(written, skipped, errors, started)
+        except BrokenPipeError:
+            # خواننده‌ی خروجی استاندارد (مثلاً head) زودتر بسته شده است
+            sys.stdout = None
+            return 0
+    if not args.quiet:
+        _progress(written, skipped, errors, started)
+        print(file=sys.stderr)
+    # وضعیت خروج فقط وقتی خطاست که هیچ رکوردی موفق نبوده باشد
+    return 1 if errors and errors == written else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
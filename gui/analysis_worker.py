@@ -0,0 +1,48 @@
+import threading
+
+from qtpy.QtCore import QObject, QRunnable, Signal
+
+from analysis.dna_detector import ANALYSES, STAGES
+
+
+class AnalysisSignals(QObject):
+    # نام مرحله، نتیجه، تعداد مراحل انجام‌شده، کل مراحل
+    stage_finished = Signal(str, object, int, int)
+    finished = Signal(object)
+    failed = Signal(str)
+    cancelled = Signal()
+
+
+class AnalysisWorker(QRunnable):
+    """اجرای detect_features در QThreadPool با گزارش پیشرفت هر مرحله
+
+    detector هر شیئی با متد iter_stages است (DNADetector یا IncrementalAnalyzer).
+    """
+
+    def __init__(self, detector, sequence, analyses=None):
+        super().__init__()
+        self.detector = detector
+        self.sequence = sequence
+        self.analyses = analyses
+        self.signals = AnalysisSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        """لغو تحلیل؛ مرحله‌ی در حال اجرا تمام می‌شود و مرحله‌ی بعد اجرا نمی‌شود"""
+        self._cancel.set()
+
+    def run(self):
+        selected = ANALYSES if self.analyses is None else tuple(self.analyses)
+        total = len([stage for stage in STAGES if stage not in ANALYSES or stage in selected])
+        results = {}
+        try:
+            for done, (name, value) in enumerate(
+                    self.detector.iter_stages(self.sequence, self.analyses), start=1):
+                results[name] = value
+                self.signals.stage_finished.emit(name, value, done, total)
+                if self._cancel.is_set():
+                    self.signals.cancelled.emit()
+                    return
+            self.signals.finished.emit(results)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
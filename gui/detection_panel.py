@@ -1,28 +1,68 @@
+from functools import partial
 from qtpy.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                           QPushButton, QTextEdit, QTableWidget, 
-                          QTableWidgetItem, QHeaderView, QMessageBox)
-from qtpy.QtCore import Qt
+                          QTableWidgetItem, QHeaderView, QMessageBox, QProgressBar)
+from qtpy.QtCore import Qt, QThreadPool
 from qtpy.QtGui import QColor
-from analysis.sequence_db import SEQUENCE_DATABASE
+
+# برچسب نوار پیشرفت برای هر مرحله
+STAGE_LABELS = {
+    'sequence_info': 'Identification',
+    'length': 'Length',
+    'gc_content': 'GC content',
+    'patterns': 'Patterns',
+    'orf': 'ORFs',
+    'repeats': 'Repeats',
+    'hairpins': 'Hairpins'
+}
 
 class DetectionPanel(QWidget):
-    def __init__(self, detector):
+    def __init__(self, detector=None):
         super().__init__()
-        self.detector = detector
+        self._detector = detector
+        self._analyzer = None
+        self.worker = None
+        self.thread_pool = QThreadPool.globalInstance()
         self.init_ui()
 
+    @property
+    def detector(self):
+        # بسته‌ی analysis (NumPy و Biopython) در اولین تحلیل import می‌شود تا پنجره سریع باز شود
+        if self._detector is None:
+            from analysis.dna_detector import DNADetector
+            self._detector = DNADetector()
+        return self._detector
+
+    @property
+    def analyzer(self):
+        # ویرایش‌های انتهای توالی فقط بخش تغییرکرده را دوباره تحلیل می‌کنند
+        if self._analyzer is None:
+            from analysis.incremental_analyzer import IncrementalAnalyzer
+            self._analyzer = IncrementalAnalyzer(self.detector)
+        return self._analyzer
+
     def init_ui(self):
         self.layout = QVBoxLayout()
         
         # دکمه‌های تحلیل
         self.analyze_btn = QPushButton("Analyze DNA")
         self.export_btn = QPushButton("Export Results")
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
         self.analyze_btn.clicked.connect(self.analyze_sequence)
+        self.cancel_btn.clicked.connect(self.cancel_analysis)
         
         btn_layout = QHBoxLayout()
         btn_layout.addWidget(self.analyze_btn)
+        btn_layout.addWidget(self.cancel_btn)
         btn_layout.addWidget(self.export_btn)
         
+        # نوار پیشرفت مراحل تحلیل
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("Ready")
+        
         # نمایش نتایج
         self.results_table = QTableWidget()
         self.results_table.setColumnCount(3)
@@ -33,6 +73,7 @@ class DetectionPanel(QWidget):
         self.details_text.setReadOnly(True)
         
         self.layout.addLayout(btn_layout)
+        self.layout.addWidget(self.progress_bar)
         self.layout.addWidget(self.results_table)
         self.layout.addWidget(self.details_text)
         self.setLayout(self.layout)
@@ -58,15 +99,19 @@ class DetectionPanel(QWidget):
                 QMessageBox.warning(self, "Error", "Invalid sequence type!\nMust be a string.")
                 return
                 
+            from analysis.core_analysis import validate_batch
+
             sequence = sequence.upper().strip()
-            valid_chars = {'A', 'T', 'C', 'G'}
+            # همان مسیر جدول‌محور core_analysis؛ موقعیت‌ها برای پیام خطا یک‌مبنا می‌شوند
+            validation = validate_batch([sequence], max_positions=5)[0]
             
-            if not all(c in valid_chars for c in sequence):
-                invalid_chars = set(sequence) - valid_chars
+            if not validation['valid']:
+                positions = ', '.join(str(position + 1) for position in validation['invalid_positions'])
                 QMessageBox.warning(
                     self, 
                     "Invalid Characters",
-                    f"Sequence contains invalid DNA characters: {', '.join(invalid_chars)}\n"
+                    f"Sequence contains invalid DNA characters: {', '.join(validation['invalid_characters'])}\n"
+                    f"First invalid positions: {positions}\n"
                     "Only A, T, C, G are allowed."
                 )
                 return
@@ -75,9 +120,8 @@ class DetectionPanel(QWidget):
                 QMessageBox.warning(self, "Error", "Sequence is too short!\nMinimum length is 10 bases.")
                 return
                 
-            # اجرای تحلیل
-            results = self.detector.detect_features(sequence)
-            self.display_results(results)
+            # اجرای تحلیل در نخ پس‌زمینه
+            self.start_analysis(sequence)
             
         except Exception as e:
             QMessageBox.critical(
@@ -86,6 +130,68 @@ class DetectionPanel(QWidget):
                 f"An unexpected error occurred:\n{str(e)}"
             )
 
+    def start_analysis(self, sequence):
+        """شروع تحلیل در QThreadPool؛ نتایج هر مرحله به محض آماده شدن نمایش داده می‌شوند"""
+        from gui.analysis_worker import AnalysisWorker
+
+        if self.worker is not None:
+            self.worker.cancel()
+        self.results_table.setRowCount(0)
+        self.worker = worker = AnalysisWorker(self.analyzer, sequence)
+        worker.signals.stage_finished.connect(partial(self.on_stage_finished, worker))
+        worker.signals.finished.connect(partial(self.on_analysis_finished, worker))
+        worker.signals.failed.connect(partial(self.on_analysis_failed, worker))
+        worker.signals.cancelled.connect(partial(self.on_analysis_cancelled, worker))
+        self.progress_bar.setRange(0, 1)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setFormat("Starting...")
+        self.analyze_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.thread_pool.start(self.worker)
+
+    def cancel_analysis(self):
+        """لغو تحلیل در حال اجرا"""
+        if self.worker is not None:
+            self.worker.cancel()
+            self.progress_bar.setFormat("Cancelling...")
+            self.cancel_btn.setEnabled(False)
+
+    def on_stage_finished(self, worker, name, value, done, total):
+        # نتایج کارگرهای قدیمی‌تر (لغوشده) نادیده گرفته می‌شوند
+        if worker is not self.worker:
+            return
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+        self.progress_bar.setFormat(f"{STAGE_LABELS.get(name, name)} done (%v/%m)")
+        self.display_stage(name, value)
+
+    def on_analysis_finished(self, worker, results):
+        if worker is not self.worker:
+            return
+        self.progress_bar.setFormat("Analysis complete")
+        self._finish_worker()
+        main_window = self.window()
+        if hasattr(main_window, 'show_features'):
+            main_window.show_features(results)
+
+    def on_analysis_failed(self, worker, message):
+        if worker is not self.worker:
+            return
+        self.display_results({'error': message})
+        self.progress_bar.setFormat("Analysis failed")
+        self._finish_worker()
+
+    def on_analysis_cancelled(self, worker):
+        if worker is not self.worker:
+            return
+        self.progress_bar.setFormat("Cancelled")
+        self._finish_worker()
+
+    def _finish_worker(self):
+        self.worker = None
+        self.analyze_btn.setEnabled(True)
+        self.cancel_btn.setEnabled(False)
+
     def display_results(self, results):
         """نمایش نتایج با مدیریت خطا"""
         self.results_table.setRowCount(0)
@@ -100,44 +206,53 @@ class DetectionPanel(QWidget):
             )
             return
             
-        # نمایش اطلاعات توالی (حتی اگر ناشناخته باشد)
-        seq_info = results.get('sequence_info', {})
-        self.add_table_row(
-            "Sequence Identification",
-            seq_info.get('name', 'Unknown'),
-            f"Type: {seq_info.get('type', 'custom')}\n"
-            f"{seq_info.get('description', 'No description available')}",
-        )
-        
-        # نمایش سایر نتایج
-        self.add_table_row("Length", f"{results.get('length', 0)} bp", "")
+        for name in STAGE_LABELS:
+            if name in results:
+                self.display_stage(name, results[name])
 
-        # GC Content
-        self.add_table_row("GC Content", f"{results['gc_content']}%", "Percentage of G and C nucleotides")
-        
-        # Patterns
-        for pattern, matches in results['patterns'].items():
+    def display_stage(self, name, value):
+        """اضافه کردن سطرهای جدول برای نتیجه‌ی یک مرحله"""
+        if name == 'sequence_info':
+            # نمایش اطلاعات توالی (حتی اگر ناشناخته باشد)
+            # شناسایی تقریبی (طرح k-mer) از تطبیق دقیق جدا نمایش داده می‌شود
+            label = "Sequence Identification"
+            if value.get('approximate'):
+                label += f" (approximate, containment {value.get('containment', 0):.0%})"
             self.add_table_row(
-                f"{pattern.capitalize()} Sites", 
-                str(len(matches)), 
-                f"Positions: {', '.join(str(m['start']) for m in matches)}",
+                label,
+                value.get('name', 'Unknown'),
+                f"Type: {value.get('type', 'custom')}\n"
+                f"{value.get('description', 'No description available')}",
+            )
+        elif name == 'length':
+            self.add_table_row("Length", f"{value} bp", "")
+        elif name == 'gc_content':
+            self.add_table_row("GC Content", f"{value}%", "Percentage of G and C nucleotides")
+        elif name == 'patterns':
+            for pattern, matches in value.items():
+                self.add_table_row(
+                    f"{pattern.capitalize()} Sites", 
+                    str(len(matches)), 
+                    f"Positions: {', '.join(str(m['start']) + m.get('strand', '') for m in matches)}",
+                )
+        elif name == 'orf':
+            self.add_table_row(
+                "ORFs", 
+                str(len(value)), 
+                f"Longest: {max((orf['length'] for orf in value), default=0)} bp",
+            )
+        elif name == 'repeats':
+            self.add_table_row(
+                "Repeats", 
+                str(len(value)), 
+                f"Most frequent: {max(value.items(), key=lambda x: len(x[1]), default=('', []))[0]}",
+            )
+        elif name == 'hairpins':
+            self.add_table_row(
+                "Hairpins",
+                str(len(value)),
+                f"Positions: {', '.join(str(h['start']) for h in value[:20])}",
             )
-        
-        # ORFs
-        orfs = results['orf']
-        self.add_table_row(
-            "ORFs", 
-            str(len(orfs)), 
-            f"Longest: {max((orf['length'] for orf in orfs), default=0)} bp",
-        )
-        
-        # Repeats
-        repeats = results['repeats']
-        self.add_table_row(
-            "Repeats", 
-            str(len(repeats)), 
-            f"Most frequent: {max(repeats.items(), key=lambda x: len(x[1]), default=('', []))[0]}",
-        )
 
     def add_table_row(self, feature, value, details, bg_color=None):
         """اضافه کردن سطر جدید به جدول نتایج"""
@@ -0,0 +1,225 @@
+import math
+
+from qtpy.QtCore import QPointF, QRectF, Qt
+from qtpy.QtGui import QBrush, QColor, QFont, QPen
+from qtpy.QtWidgets import QGraphicsItem, QStyleOptionGraphicsItem
+
+# رنگ‌های نوکلئوتیدها
+NT_COLORS = {
+    'A': QColor('#e74c3c'),
+    'T': QColor('#3498db'),
+    'C': QColor('#2ecc71'),
+    'G': QColor('#f1c40f')
+}
+
+# پارامترهای مارپیچ DNA
+CENTER_Y = 175
+RADIUS = 80
+STEP_X = 50
+MARGIN_X = 100
+HEIGHT = 350
+
+# الگوی نمایش: موقعیت‌های False نقاط تلاقی بدون نوکلئوتید هستند
+PATTERN = [False, True, True, True, True, False] + [True, True, True, True, False] * 100
+_BASE_VISUALS = [v for v, shown in enumerate(PATTERN) if shown]
+# تعداد نوکلئوتیدهای پیش از هر موقعیت بصری در یک دوره‌ی الگو
+_BASES_BEFORE = [sum(PATTERN[:v]) for v in range(len(PATTERN))]
+
+# زیر این سطح جزئیات، نمای خلاصه (نمودار GC) رسم می‌شود
+OVERVIEW_LOD = 0.35
+OVERVIEW_PIXELS_PER_BIN = 4
+
+# رنگ ویژگی‌های نمای خلاصه؛ موتیف‌های بدون رنگ نمایش داده نمی‌شوند
+FEATURE_COLORS = {
+    'orf': '#2980b9',
+    'hairpins': '#8e44ad',
+    'promoter': '#f39c12',
+    'terminator': '#c0392b',
+}
+
+
+def features_from_results(results):
+    """ویژگی‌های (شروع، پایان، رنگ) نمای خلاصه از خروجی detect_features
+
+    تکرارها (k-merهای کوتاه) بیش از آن‌اند که در نمای دور معنا داشته باشند.
+    """
+    features = [(orf['start'], orf['end'], FEATURE_COLORS['orf'])
+                for orf in results.get('orf') or ()]
+    features += [(hairpin['start'], hairpin['end'], FEATURE_COLORS['hairpins'])
+                 for hairpin in results.get('hairpins') or ()]
+    for motif, hits in (results.get('patterns') or {}).items():
+        if motif in FEATURE_COLORS and motif != 'orf':
+            features += [(hit['start'], hit['end'], FEATURE_COLORS[motif]) for hit in hits]
+    return features
+
+
+def visual_index(base_index):
+    """اندیس بصری نوکلئوتید base_index روی مارپیچ"""
+    period, offset = divmod(base_index, len(_BASE_VISUALS))
+    return period * len(PATTERN) + _BASE_VISUALS[offset]
+
+
+def bases_before(visual):
+    """تعداد نوکلئوتیدهایی که پیش از موقعیت بصری visual رسم می‌شوند"""
+    period, offset = divmod(visual, len(PATTERN))
+    return period * len(_BASE_VISUALS) + _BASES_BEFORE[offset]
+
+
+def base_at(visual):
+    """اندیس نوکلئوتید در موقعیت بصری visual یا None برای نقاط تلاقی"""
+    return bases_before(visual) if PATTERN[visual % len(PATTERN)] else None
+
+
+def strand_points(visual):
+    x = MARGIN_X + visual * STEP_X
+    angle = visual * (2 * math.pi / 10)
+    offset = RADIUS * math.sin(angle)
+    return x, CENTER_Y - offset, CENTER_Y + offset
+
+
+class HelixItem(QGraphicsItem):
+    """رسم مجازی مارپیچ DNA: فقط بخش قابل مشاهده نقاشی می‌شود"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setFlag(QGraphicsItem.ItemUsesExtendedStyleOption, True)
+        self.sequence = ""
+        self.complement = ""
+        self.features = []
+        self._gc_prefix = [0]
+        self._font = QFont("Arial", 12, QFont.Bold)
+        self._backbone_pen = QPen(QColor("#34495e"), 1.5)
+        self._connector_pen = QPen(QColor("#7f8c8d"), 1, Qt.DotLine)
+        self._outline_pen = QPen(Qt.black, 1)
+
+    def visual_count(self):
+        return visual_index(len(self.sequence) - 1) + 1 if self.sequence else 0
+
+    def scene_width(self):
+        return max(1000, self.visual_count() * STEP_X + MARGIN_X)
+
+    def last_x(self):
+        return MARGIN_X + (self.visual_count() - 1) * STEP_X if self.sequence else 0
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.scene_width(), HEIGHT)
+
+    def set_sequence(self, sequence, complement=""):
+        """جایگزینی کامل توالی (بارگذاری فایل یا پاک کردن)"""
+        self.prepareGeometryChange()
+        if sequence != self.sequence:
+            # ویژگی‌های تحلیل قبلی به توالی دیگری تعلق دارند
+            self.features = []
+        self.sequence = sequence
+        self.complement = complement
+        prefix = [0] * (len(sequence) + 1)
+        running = 0
+        for i, nt in enumerate(sequence, start=1):
+            running += nt in 'GC'
+            prefix[i] = running
+        self._gc_prefix = prefix
+        self.update()
+
+    def set_complement(self, complement):
+        self.complement = complement
+        self.update()
+
+    def set_features(self, features):
+        """ویژگی‌ها برای نمای خلاصه: فهرست (شروع، پایان، رنگ)"""
+        self.features = list(features)
+        self.update()
+
+    def append(self, nucleotide):
+        """افزودن یک نوکلئوتید و بازنقاشی فقط ناحیه‌ی انتهایی"""
+        self.prepareGeometryChange()
+        self.sequence += nucleotide
+        self._gc_prefix.append(self._gc_prefix[-1] + (nucleotide in 'GC'))
+        self.update(self._tail_rect())
+
+    def pop(self):
+        """حذف آخرین نوکلئوتید"""
+        if not self.sequence:
+            return
+        tail = self._tail_rect()
+        self.prepareGeometryChange()
+        self.sequence = self.sequence[:-1]
+        self.complement = self.complement[:len(self.sequence)]
+        self._gc_prefix.pop()
+        self.update(tail)
+
+    def _tail_rect(self):
+        # آخرین نوکلئوتید حداکثر سه گام بصری از نوکلئوتید قبلی فاصله دارد
+        right = self.last_x()
+        return QRectF(right - 3 * STEP_X - 20, 0, 3 * STEP_X + 40, HEIGHT)
+
+    def paint(self, painter, option, widget=None):
+        if not self.sequence:
+            return
+        exposed = option.exposedRect
+        lod = QStyleOptionGraphicsItem.levelOfDetailFromTransform(painter.worldTransform())
+        first = max(0, int((exposed.left() - MARGIN_X) // STEP_X) - 1)
+        last = min(self.visual_count() - 1, int((exposed.right() - MARGIN_X) // STEP_X) + 1)
+        if last < first:
+            return
+        if lod < OVERVIEW_LOD:
+            self._paint_overview(painter, first, last, lod)
+        else:
+            self._paint_detail(painter, first, last)
+
+    def _paint_detail(self, painter, first, last):
+        for visual in range(max(first, 1), last + 1):
+            x, y1, y2 = strand_points(visual)
+            prev_x, prev_y1, prev_y2 = strand_points(visual - 1)
+            painter.setPen(self._connector_pen)
+            painter.drawLine(QPointF(x, y1), QPointF(x, y2))
+            painter.setPen(self._backbone_pen)
+            painter.drawLine(QPointF(prev_x, prev_y1), QPointF(x, y1))
+            painter.drawLine(QPointF(prev_x, prev_y2), QPointF(x, y2))
+
+        painter.setFont(self._font)
+        for visual in range(first, last + 1):
+            index = base_at(visual)
+            if index is None or index >= len(self.sequence):
+                continue
+            x, y1, y2 = strand_points(visual)
+            self._paint_base(painter, x, y1, self.sequence[index])
+            if index < len(self.complement):
+                self._paint_base(painter, x, y2, self.complement[index])
+
+    def _paint_base(self, painter, x, y, nt):
+        rect = QRectF(x - 15, y - 15, 30, 30)
+        painter.setPen(self._outline_pen)
+        painter.setBrush(QBrush(NT_COLORS.get(nt, Qt.white)))
+        painter.drawEllipse(rect)
+        painter.setPen(Qt.white)
+        painter.drawText(rect, Qt.AlignCenter, nt)
+
+    def _paint_overview(self, painter, first, last, lod):
+        # در نمای دور، هر ستون چند پیکسلی میانگین GC چند نوکلئوتید را نشان می‌دهد
+        first_base = bases_before(first)
+        last_base = min(bases_before(last + 1), len(self.sequence)) - 1
+        if last_base < first_base:
+            return
+        bases_per_pixel = len(_BASE_VISUALS) / (len(PATTERN) * STEP_X * lod)
+        bin_size = max(1, int(bases_per_pixel * OVERVIEW_PIXELS_PER_BIN))
+
+        painter.setPen(self._backbone_pen)
+        painter.drawLine(QPointF(strand_points(first)[0], CENTER_Y),
+                         QPointF(strand_points(last)[0], CENTER_Y))
+        painter.setPen(Qt.NoPen)
+        for start in range(first_base - first_base % bin_size, last_base + 1, bin_size):
+            end = min(start + bin_size, len(self.sequence))
+            gc = (self._gc_prefix[end] - self._gc_prefix[start]) / (end - start)
+            left = strand_points(visual_index(start))[0]
+            right = strand_points(visual_index(end - 1))[0] + STEP_X
+            height = RADIUS * 2 * gc
+            painter.setBrush(QColor(46, 204, 113, 180) if gc >= 0.5 else QColor(231, 76, 60, 180))
+            painter.drawRect(QRectF(left, CENTER_Y + RADIUS - height, right - left, height))
+
+        for start, end, color in self.features:
+            if end <= first_base or start > last_base:
+                continue
+            left = strand_points(visual_index(max(start, 0)))[0]
+            right = strand_points(visual_index(min(end, len(self.sequence)) - 1))[0] + STEP_X
+            painter.setBrush(QColor(color))
+            painter.drawRect(QRectF(left, CENTER_Y - RADIUS - 20, right - left, 12))
@@ -1,12 +1,21 @@
 import sys
-import math
 from qtpy.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-                           QLabel, QPushButton, QGraphicsView, QGraphicsScene, 
-                           QGraphicsTextItem, QGraphicsEllipseItem, QMenuBar, QMenu,
+                           QLabel, QPushButton, QGraphicsView, QGraphicsScene, QMenuBar, QMenu,
                            QFileDialog, QMessageBox)
-from qtpy.QtCore import Qt, QPointF, QRectF
-from qtpy.QtGui import (QColor, QPen, QFont, QBrush, QPainterPath, QTransform, QPainter, QAction, QKeySequence)
-from Bio.Seq import Seq
+from qtpy.QtCore import Qt
+from qtpy.QtGui import (QColor, QFont, QPainter, QAction, QKeySequence)
+from utils.file_io import load_dna_file
+from gui.helix_item import HelixItem, features_from_results
+
+# برچسب‌ها فقط انتهای توالی‌های بلند را نمایش می‌دهند
+LABEL_PREVIEW = 80
+
+
+def sequence_preview(sequence):
+    if len(sequence) <= LABEL_PREVIEW:
+        return sequence
+    return f"…{sequence[-LABEL_PREVIEW:]} ({len(sequence)} bp)"
+
 
 class MainWindow(QMainWindow):
     def __init__(self):
@@ -18,7 +27,6 @@ class MainWindow(QMainWindow):
         self.sequence = ""  # فقط نوکلئوتیدهای واقعی
         self.complement_sequence = ""
         self.scene_width = 1000
-        self.visual_positions = []  # موقعیت‌های بصری (شامل نقاط تلاقی)
         
         # تنظیم رابط کاربری
         self.init_ui()
@@ -124,6 +132,10 @@ class MainWindow(QMainWindow):
         
     def init_dna_graphics(self):
         self.dna_scene = QGraphicsScene()
+        # یک آیتم واحد کل مارپیچ را رسم می‌کند؛ نیازی به اندیس BSP نیست
+        self.dna_scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        self.helix_item = HelixItem()
+        self.dna_scene.addItem(self.helix_item)
         self.dna_view = CustomGraphicsView(self.dna_scene)
         self.dna_view.setFixedHeight(350)
         self.dna_view.setRenderHint(QPainter.Antialiasing)
@@ -132,106 +144,26 @@ class MainWindow(QMainWindow):
         self.dna_scene.setSceneRect(0, 0, self.scene_width, 350)
         
     def draw_dna_helix(self):
-        self.dna_scene.clear()
-        self.visual_positions = []
-        
-        if not self.sequence:
-            return
-            
-        # رنگ‌های نوکلئوتیدها
-        nt_colors = {
-            'A': QColor('#e74c3c'),
-            'T': QColor('#3498db'),
-            'C': QColor('#2ecc71'),
-            'G': QColor('#f1c40f')
-        }
-        
-        # پارامترهای مارپیچ DNA
-        center_y = 175
-        radius = 80
-        visual_index = 0
-        sequence_index = 0
-        
-        # الگوی نمایش
-        pattern = [False, True, True, True, True, False] + [True, True, True, True, False] * 100
-        
-        while sequence_index < len(self.sequence):
-            x = 100 + visual_index * 50
-            angle = visual_index * (2 * math.pi / 10)
-            y1 = center_y - radius * math.sin(angle)
-            y2 = center_y + radius * math.sin(angle)
-            
-            self.visual_positions.append((x, y1, y2))
-            
-            if pattern[visual_index % len(pattern)] and sequence_index < len(self.sequence):
-                nt = self.sequence[sequence_index]
-                
-                # نمایش نوکلئوتیدها
-                ellipse = QGraphicsEllipseItem(x - 15, y1 - 15, 30, 30)
-                ellipse.setBrush(QBrush(nt_colors.get(nt, Qt.white)))
-                ellipse.setPen(QPen(Qt.black, 1))
-                ellipse.setZValue(2)
-                self.dna_scene.addItem(ellipse)
-                
-                text = QGraphicsTextItem(nt)
-                text.setPos(x - 8, y1 - 10)
-                text.setFont(QFont("Arial", 12, QFont.Bold))
-                text.setDefaultTextColor(Qt.white)
-                text.setZValue(3)
-                self.dna_scene.addItem(text)
-                
-                if self.complement_sequence and sequence_index < len(self.complement_sequence):
-                    comp_nt = self.complement_sequence[sequence_index]
-                    comp_ellipse = QGraphicsEllipseItem(x - 15, y2 - 15, 30, 30)
-                    comp_ellipse.setBrush(QBrush(nt_colors.get(comp_nt, Qt.white)))
-                    comp_ellipse.setPen(QPen(Qt.black, 1))
-                    comp_ellipse.setZValue(2)
-                    self.dna_scene.addItem(comp_ellipse)
-                    
-                    comp_text = QGraphicsTextItem(comp_nt)
-                    comp_text.setPos(x - 8, y2 - 10)
-                    comp_text.setFont(QFont("Arial", 12, QFont.Bold))
-                    comp_text.setDefaultTextColor(Qt.white)
-                    comp_text.setZValue(3)
-                    self.dna_scene.addItem(comp_text)
-                
-                sequence_index += 1
-            
-            if visual_index > 0:
-                prev_x, prev_y1, prev_y2 = self.visual_positions[visual_index - 1]
-                
-                path1 = QPainterPath()
-                path1.moveTo(prev_x, prev_y1)
-                path1.lineTo(x, y1)
-                path_item1 = self.dna_scene.addPath(path1, QPen(QColor("#34495e"), 1.5))
-                path_item1.setZValue(1)
-                
-                path2 = QPainterPath()
-                path2.moveTo(prev_x, prev_y2)
-                path2.lineTo(x, y2)
-                path_item2 = self.dna_scene.addPath(path2, QPen(QColor("#34495e"), 1.5))
-                path_item2.setZValue(1)
-                
-                connector = QPainterPath()
-                connector.moveTo(x, y1)
-                connector.lineTo(x, y2)
-                connector_item = self.dna_scene.addPath(connector, QPen(QColor("#7f8c8d"), 1, Qt.DotLine))
-                connector_item.setZValue(0)
-            
-            visual_index += 1
+        """بازسازی کامل نمایش (بارگذاری، پاک کردن یا محاسبه‌ی مکمل)"""
+        self.helix_item.set_sequence(self.sequence, self.complement_sequence)
+        self.update_scene_rect()
+        self.scroll_to_end()
         
-        new_width = max(1000, visual_index * 50 + 100)
-        if new_width > self.scene_width:
+    def show_features(self, results):
+        """نمایش ORFها، سنجاق‌سرها و موتیف‌های نتیجه‌ی تحلیل در نمای خلاصه‌ی مارپیچ"""
+        self.helix_item.set_features(features_from_results(results))
+
+    def update_scene_rect(self):
+        new_width = self.helix_item.scene_width()
+        if new_width != self.scene_width:
             self.scene_width = new_width
             self.dna_scene.setSceneRect(0, 0, self.scene_width, 350)
         
-        self.scroll_to_end()
-        
     def scroll_to_end(self):
-        if self.visual_positions:
-            last_x = self.visual_positions[-1][0]
+        if self.sequence:
+            last_x = self.helix_item.last_x() * self.dna_view.transform().m11()
             scroll_pos = last_x - self.dna_view.width() + 100
-            self.dna_view.horizontalScrollBar().setValue(scroll_pos)
+            self.dna_view.horizontalScrollBar().setValue(int(scroll_pos))
         
     def keyPressEvent(self, event):
         key = event.text().upper()
@@ -262,25 +194,32 @@ class MainWindow(QMainWindow):
         
     def add_nucleotide(self, nucleotide):
         self.sequence += nucleotide
-        self.dna_label.setText(f"DNA Sequence: {self.sequence}")
-        self.draw_dna_helix()
+        self.dna_label.setText(f"DNA Sequence: {sequence_preview(self.sequence)}")
+        # فقط انتهای مارپیچ بازنقاشی می‌شود
+        self.helix_item.append(nucleotide)
+        self.update_scene_rect()
+        self.scroll_to_end()
         
     def remove_last_nucleotide(self):
         if self.sequence:
             self.sequence = self.sequence[:-1]
-            self.dna_label.setText(f"DNA Sequence: {self.sequence if self.sequence else '---'}")
+            self.dna_label.setText(f"DNA Sequence: {sequence_preview(self.sequence) if self.sequence else '---'}")
             self.complement_sequence = ""
             self.complement_label.setText("Complement: Ready for simulation")
-            self.draw_dna_helix()
+            self.helix_item.pop()
+            self.helix_item.set_complement("")
+            self.update_scene_rect()
+            self.scroll_to_end()
         
     def calculate_complement(self):
         if not self.sequence:
             return
             
         try:
-            seq = Seq(self.sequence)
-            self.complement_sequence = str(seq.complement())
-            self.complement_label.setText(f"Complement: {self.complement_sequence}")
+            from analysis.core_analysis import calculate_complement
+
+            self.complement_sequence = calculate_complement(self.sequence)
+            self.complement_label.setText(f"Complement: {sequence_preview(self.complement_sequence)}")
             self.draw_dna_helix()
         except Exception as e:
             print(f"Error: {str(e)}")
@@ -288,7 +227,6 @@ class MainWindow(QMainWindow):
     def clear_all(self):
         self.sequence = ""
         self.complement_sequence = ""
-        self.visual_positions = []
         self.dna_label.setText("DNA Sequence: ")
         self.complement_label.setText("Complement: Ready for simulation")
         self.draw_dna_helix()
@@ -297,19 +235,17 @@ class MainWindow(QMainWindow):
         options = QFileDialog.Options()
         file_name, _ = QFileDialog.getOpenFileName(
             self, "Load DNA Sequence", "", 
-            "Text Files (*.txt);;All Files (*)", 
+            "Sequence Files (*.txt *.fa *.fasta *.fna *.fq *.fastq *.gz);;All Files (*)", 
             options=options)
         
         if file_name:
             try:
-                with open(file_name, 'r', encoding='utf-8') as file:
-                    content = file.read().strip().upper()
-                    valid_chars = {'A', 'T', 'C', 'G'}
-                    self.sequence = ''.join([c for c in content if c in valid_chars])
-                    self.dna_label.setText(f"DNA Sequence: {self.sequence}")
-                    self.complement_sequence = ""
-                    self.complement_label.setText("Complement: Ready for simulation")
-                    self.draw_dna_helix()
+                # فقط اولین رکورد فایل‌های FASTA/FASTQ بارگذاری می‌شود
+                self.sequence = load_dna_file(file_name)
+                self.dna_label.setText(f"DNA Sequence: {sequence_preview(self.sequence)}")
+                self.complement_sequence = ""
+                self.complement_label.setText("Complement: Ready for simulation")
+                self.draw_dna_helix()
             except Exception as e:
                 QMessageBox.warning(self, "Error", f"Failed to load file: {str(e)}")
 
@@ -344,6 +280,11 @@ class CustomGraphicsView(QGraphicsView):
         self.setInteractive(True)
         
     def wheelEvent(self, event):
+        # Ctrl + چرخ: بزرگ‌نمایی؛ در بزرگ‌نمایی کم نمای خلاصه رسم می‌شود
+        if event.modifiers() & Qt.ControlModifier:
+            factor = 1.25 if event.angleDelta().y() > 0 else 0.8
+            self.scale(factor, 1)
+            return
         scroll_bar = self.horizontalScrollBar()
         scroll_bar.setValue(scroll_bar.value() - event.angleDelta().y())
 
@@ -0,0 +1,251 @@
+from functools import partial
+
+from qtpy.QtCore import QObject, QPointF, QRunnable, QThreadPool, Signal
+from qtpy.QtGui import QColor, QPainter, QPen, QPixmap, QPolygonF
+from qtpy.QtWidgets import (QComboBox, QFileDialog, QHBoxLayout, QLabel, QMessageBox,
+                            QPushButton, QSpinBox, QVBoxLayout, QWidget)
+
+# برچسب هر ترک در فهرست انتخاب
+TRACK_LABELS = {
+    'gc': 'GC content (%)',
+    'gc_skew': 'GC skew',
+    'at_skew': 'AT skew',
+    'entropy': 'Shannon entropy (bits)',
+    'cpg_oe': 'CpG observed/expected',
+}
+
+
+class TrackSignals(QObject):
+    finished = Signal(object)
+    failed = Signal(str)
+
+
+class TrackWorker(QRunnable):
+    """محاسبه‌ی ترک‌ها در QThreadPool؛ خروجی فهرست (نام، پروفایل) است
+
+    source یک توالی یا مسیر فایل FASTA/FASTQ (با from_file=True) است.
+    """
+
+    def __init__(self, source, window, step, from_file=False):
+        super().__init__()
+        self.source = source
+        self.window = window
+        self.step = step
+        self.from_file = from_file
+        self.signals = TrackSignals()
+
+    def run(self):
+        from analysis.genome_tracks import genome_tracks, genome_tracks_file
+
+        try:
+            if self.from_file:
+                profiles = list(genome_tracks_file(self.source, self.window, self.step))
+            else:
+                profiles = [('sequence', genome_tracks(self.source, self.window, self.step))]
+            self.signals.finished.emit(profiles)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
+class TrackView(QWidget):
+    """نمایش یک ترک؛ تصویر فقط با تغییر داده، ترک یا اندازه دوباره ساخته می‌شود
+
+    برای ژنوم‌های بزرگ مقدارهای هر ستون پیکسلی به کمینه و بیشینه خلاصه
+    می‌شوند، پس هزینه‌ی رسم به عرض ویجت بستگی دارد نه تعداد پنجره‌ها.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.profile = None
+        self.track = 'gc'
+        self._pixmap = None
+        self.setMinimumHeight(160)
+
+    def set_profile(self, profile, track=None):
+        self.profile = profile
+        if track is not None:
+            self.track = track
+        self._pixmap = None
+        self.update()
+
+    def set_track(self, track):
+        self.track = track
+        self._pixmap = None
+        self.update()
+
+    def resizeEvent(self, event):
+        self._pixmap = None
+        super().resizeEvent(event)
+
+    def paintEvent(self, event):
+        if self._pixmap is None or self._pixmap.size() != self.size():
+            self._pixmap = self._render()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+        painter.end()
+
+    def _render(self):
+        import numpy as np
+
+        pixmap = QPixmap(self.size())
+        pixmap.fill(QColor('white'))
+        if self.profile is None or not len(self.profile['start']):
+            return pixmap
+        width, height = max(self.width(), 1), max(self.height() - 20, 1)
+        values = self.profile[self.track]
+        length = int(self.profile['end'][-1])
+        # کمینه و بیشینه‌ی مقدار پنجره‌هایی که مرکزشان در هر ستون پیکسلی است
+        centers = (self.profile['start'] + self.profile['end']) / 2
+        columns = np.minimum((centers * width / length).astype(np.int64), width - 1)
+        boundaries = np.flatnonzero(np.diff(columns, prepend=-1))
+        lows = np.minimum.reduceat(values, boundaries)
+        highs = np.maximum.reduceat(values, boundaries)
+        low, high = float(values.min()), float(values.max())
+        scale = (height - 1) / (high - low) if high > low else 0.0
+
+        def y(value):
+            return height - 1 - (value - low) * scale
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setPen(QPen(QColor('#2980b9'), 1))
+        xs = columns[boundaries].tolist()
+        for x, lo, hi in zip(xs, lows.tolist(), highs.tolist()):
+            painter.drawLine(QPointF(x, y(lo)), QPointF(x, y(hi)))
+        middle = (lows + highs) / 2
+        painter.drawPolyline(QPolygonF([QPointF(x, y(v)) for x, v in zip(xs, middle.tolist())]))
+        painter.setPen(QColor('#555555'))
+        painter.drawText(4, height + 15, f"{TRACK_LABELS.get(self.track, self.track)}: "
+                                         f"{low:.3g} – {high:.3g}, {length:,} bp")
+        painter.end()
+        return pixmap
+
+
+class TrackPanel(QWidget):
+    """ترک‌های پنجره‌ای (GC، skew، آنتروپی، CpG) توالی جاری یا یک فایل ژنوم
+
+    همه‌ی ترک‌ها یک بار محاسبه می‌شوند؛ تغییر ترک یا رکورد فقط نمایش را عوض می‌کند.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.profiles = {}
+        # اندازه‌ی پنجره و گام پروفایل‌های فعلی برای خروجی bedGraph
+        self.parameters = None
+        self.worker = None
+        self.thread_pool = QThreadPool.globalInstance()
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout()
+
+        controls = QHBoxLayout()
+        self.window_box = QSpinBox()
+        self.window_box.setRange(10, 10_000_000)
+        self.window_box.setValue(1000)
+        self.step_box = QSpinBox()
+        self.step_box.setRange(1, 10_000_000)
+        self.step_box.setValue(500)
+        self.compute_btn = QPushButton("Current Sequence")
+        self.load_btn = QPushButton("Load Genome...")
+        self.export_btn = QPushButton("Export bedGraph")
+        self.export_btn.setEnabled(False)
+        self.compute_btn.clicked.connect(self.compute_current)
+        self.load_btn.clicked.connect(self.compute_file)
+        self.export_btn.clicked.connect(self.export_bedgraph)
+        for widget in (QLabel("Window"), self.window_box, QLabel("Step"), self.step_box,
+                       self.compute_btn, self.load_btn, self.export_btn):
+            controls.addWidget(widget)
+
+        selectors = QHBoxLayout()
+        self.track_box = QComboBox()
+        for track, label in TRACK_LABELS.items():
+            self.track_box.addItem(label, track)
+        self.record_box = QComboBox()
+        self.track_box.currentIndexChanged.connect(self.show_track)
+        self.record_box.currentIndexChanged.connect(self.show_track)
+        self.status_label = QLabel("")
+        selectors.addWidget(QLabel("Track"))
+        selectors.addWidget(self.track_box)
+        selectors.addWidget(QLabel("Record"))
+        selectors.addWidget(self.record_box)
+        selectors.addWidget(self.status_label, 1)
+
+        self.view = TrackView()
+        layout.addLayout(controls)
+        layout.addLayout(selectors)
+        layout.addWidget(self.view, 1)
+        self.setLayout(layout)
+
+    def compute_current(self):
+        main_window = self.window()
+        sequence = main_window.get_current_sequence() if hasattr(
+            main_window, 'get_current_sequence') else ''
+        if not sequence:
+            QMessageBox.warning(self, "Error", "No DNA sequence entered!")
+            return
+        self.start(sequence, from_file=False)
+
+    def compute_file(self):
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Load Genome", "", "Sequence Files (*.fa *.fasta *.fna *.fq *.fastq *.gz);;All Files (*)")
+        if file_path:
+            self.start(file_path, from_file=True)
+
+    def start(self, source, from_file):
+        self.worker = worker = TrackWorker(source, self.window_box.value(), self.step_box.value(),
+                                           from_file)
+        worker.signals.finished.connect(partial(self.on_finished, worker))
+        worker.signals.failed.connect(partial(self.on_failed, worker))
+        self.compute_btn.setEnabled(False)
+        self.load_btn.setEnabled(False)
+        self.status_label.setText("Computing...")
+        self.thread_pool.start(worker)
+
+    def on_finished(self, worker, profiles):
+        if worker is not self.worker:
+            return
+        self._finish_worker()
+        self.parameters = (worker.window, worker.step)
+        self.profiles = {name or f"record_{number}": profile
+                         for number, (name, profile) in enumerate(profiles)}
+        self.record_box.blockSignals(True)
+        self.record_box.clear()
+        self.record_box.addItems(list(self.profiles))
+        self.record_box.blockSignals(False)
+        self.export_btn.setEnabled(bool(self.profiles))
+        self.status_label.setText(
+            f"{sum(len(p['start']) for p in self.profiles.values()):,} windows")
+        self.show_track()
+
+    def on_failed(self, worker, message):
+        if worker is not self.worker:
+            return
+        self._finish_worker()
+        self.status_label.setText("Failed")
+        QMessageBox.critical(self, "Track Failed", message)
+
+    def _finish_worker(self):
+        self.worker = None
+        self.compute_btn.setEnabled(True)
+        self.load_btn.setEnabled(True)
+
+    def show_track(self):
+        profile = self.profiles.get(self.record_box.currentText())
+        self.view.set_profile(profile, self.track_box.currentData())
+
+    def export_bedgraph(self):
+        from analysis.genome_tracks import write_bedgraph
+
+        track = self.track_box.currentData()
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export bedGraph", f"{track}.bedGraph", "bedGraph Files (*.bedGraph *.bg)")
+        if not file_path:
+            return
+        try:
+            with open(file_path, 'w') as handle:
+                handle.write(f'track type=bedGraph name="{track}"\n')
+                for name, profile in self.profiles.items():
+                    write_bedgraph(handle, name.split()[0], profile, track, *self.parameters)
+        except OSError as e:
+            QMessageBox.critical(self, "Export Failed", str(e))
@@ -1,17 +1,19 @@
 import sys
-from qtpy.QtWidgets import QApplication
+from qtpy.QtWidgets import QApplication, QTabWidget
 from gui.main_window import MainWindow
-from gui.main_window import MainWindow
-from qtpy.QtWidgets import QTabWidget
 from gui.detection_panel import DetectionPanel
-from analysis.dna_detector import DNADetector
+from gui.track_panel import TrackPanel
 
 class MainWindow(MainWindow):
     def __init__(self):
         super().__init__()
         # ... کدهای قبلی ...
-        self.detector = DNADetector()
         self.init_detection_tab()  # اضافه کردن تب تشخیص
+
+    @property
+    def detector(self):
+        # آشکارساز (و NumPy/Biopython) در اولین تحلیل بارگذاری می‌شود، نه هنگام باز شدن پنجره
+        return self.detection_panel.detector
         
     def init_detection_tab(self):
         """اضافه کردن تب تشخیص به رابط کاربری"""
@@ -22,10 +24,11 @@ class MainWindow(MainWindow):
         main_tab.setLayout(self.main_layout)  # استفاده از لایه‌بندی قبلی
         
         # تب تشخیص
-        detection_tab = DetectionPanel(self.detector)
+        self.detection_panel = detection_tab = DetectionPanel()
         
         tabs.addTab(main_tab, "DNA Editor")
         tabs.addTab(detection_tab, "Analysis Tools")
+        tabs.addTab(TrackPanel(), "Genome Tracks")
         
         self.setCentralWidget(tabs)  # جایگزینی ویجت مرکزی با تب‌ها
         
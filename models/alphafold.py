@@ -1,20 +1,57 @@
-import requests
+import os
+
+from utils.api_client import APIClient, APIError, DEFAULT_CACHE_DIR, sequence_key
 
 class AlphaFoldIntegration:
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, base_url="https://api.alphafold.com/v1", cache_dir=None,
+                 rate=None, max_retries=3, timeout=(5, 300), pool_size=16):
         self.api_key = api_key
-        self.base_url = "https://api.alphafold.com/v1"
+        self.base_url = base_url
+        # Predictions are cached on disk by sequence hash; pass cache_dir=False to disable
+        if cache_dir is None:
+            cache_dir = os.path.join(DEFAULT_CACHE_DIR, 'alphafold')
+        self.client = APIClient(base_url, api_key=api_key, timeout=timeout,
+                                max_retries=max_retries, rate=rate,
+                                cache_dir=cache_dir or None, pool_size=pool_size)
 
     def predict_structure(self, sequence):
         """Predict protein structure using AlphaFold API"""
         try:
-            headers = {"Authorization": f"Bearer {self.api_key}"}
-            response = requests.post(
-                f"{self.base_url}/predict",
-                json={"sequence": sequence},
-                headers=headers
-            )
-            return response.json()
-        except Exception as e:
+            return self.client.post("predict", {"sequence": sequence},
+                                    cache_key=sequence_key(sequence, 'alphafold'))
+        except APIError as e:
             print(f"AlphaFold API error: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+
+    def predict_structures(self, sequences, concurrency=8):
+        """Predict many structures concurrently; failed predictions are None, order is kept"""
+        sequences = list(sequences)
+        results = self.client.post_many(
+            "predict",
+            ({"sequence": sequence} for sequence in sequences),
+            cache_keys=[sequence_key(sequence, 'alphafold') for sequence in sequences],
+            concurrency=concurrency
+        )
+        return self._collect(sequences, results)
+
+    async def apredict_structures(self, sequences, concurrency=8):
+        """Async variant of predict_structures for callers already in an event loop"""
+        sequences = list(sequences)
+        results = await self.client.apost_many(
+            "predict",
+            ({"sequence": sequence} for sequence in sequences),
+            cache_keys=[sequence_key(sequence, 'alphafold') for sequence in sequences],
+            concurrency=concurrency
+        )
+        return self._collect(sequences, results)
+
+    def _collect(self, sequences, results):
+        """Report each failed prediction with its input position and replace it with None"""
+        for number, (sequence, result) in enumerate(zip(sequences, results)):
+            if isinstance(result, APIError):
+                preview = sequence if len(sequence) <= 20 else f"{sequence[:20]}..."
+                print(f"AlphaFold API error for sequence {number} ({preview}): {str(result)}")
+        return [None if isinstance(result, APIError) else result for result in results]
+
+    def close(self):
+        self.client.close()
\ No newline at end of file
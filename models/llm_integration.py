@@ -1,12 +1,209 @@
-from transformers import pipeline
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+DEFAULT_MODEL = "bio-llm/protein-function"
+BACKENDS = ('torch', 'quantized', 'onnx')
+
+# نشانه‌ی توقف نخ دسته‌بندی در صف درخواست‌ها
+_STOP = object()
+
+# pipelineهای بارگذاری‌شده به ازای (مدل، backend، تعداد نخ)؛ بین همه‌ی نمونه‌ها مشترک است
+_PIPELINES = {}
+_PIPELINES_LOCK = threading.Lock()
+
+
+def _load_pipeline(model, backend, threads):
+    """بارگذاری یک‌باره‌ی مدل در هر پردازه؛ transformers فقط اینجا import می‌شود"""
+    key = (model, backend, threads)
+    with _PIPELINES_LOCK:
+        if key in _PIPELINES:
+            return _PIPELINES[key]
+        from transformers import AutoTokenizer, pipeline
+
+        if threads:
+            import torch
+            torch.set_num_threads(threads)
+        tokenizer = AutoTokenizer.from_pretrained(model)
+        # دسته‌های هم‌طول‌شده برای مدل‌های تولید متن از چپ پر می‌شوند
+        tokenizer.padding_side = 'left'
+        if tokenizer.pad_token is None:
+            tokenizer.pad_token = tokenizer.eos_token
+        if backend == 'onnx':
+            from optimum.onnxruntime import ORTModelForCausalLM
+            predictor = pipeline("text-generation", tokenizer=tokenizer,
+                                 model=ORTModelForCausalLM.from_pretrained(model, export=True))
+        else:
+            predictor = pipeline("text-generation", model=model, tokenizer=tokenizer, device=-1)
+            if backend == 'quantized':
+                # کوانتیزه‌سازی پویای int8 لایه‌های خطی برای استنتاج روی CPU
+                import torch
+                predictor.model = torch.quantization.quantize_dynamic(
+                    predictor.model, {torch.nn.Linear}, dtype=torch.qint8)
+        _PIPELINES[key] = predictor
+        return predictor
+
+
+def length_batches(sequences, batch_size, max_tokens=None):
+    """گروه‌بندی اندیس توالی‌ها به دسته‌های هم‌طول برای کمینه کردن padding
+
+    توالی‌ها بر اساس طول مرتب می‌شوند؛ هر دسته حداکثر batch_size عضو دارد و
+    با max_tokens مجموع طول پس از padding (طول بلندترین × تعداد) محدود می‌شود.
+    """
+    order = sorted(range(len(sequences)), key=lambda i: len(sequences[i]))
+    batch = []
+    for index in order:
+        longest = len(sequences[index])
+        if batch and (len(batch) >= batch_size
+                      or (max_tokens and longest * (len(batch) + 1) > max_tokens)):
+            yield batch
+            batch = []
+        batch.append(index)
+    if batch:
+        yield batch
+
+
+class _Batcher:
+    """جمع کردن درخواست‌های هم‌زمان نخ‌های مختلف در دسته‌های پویا
+
+    یک نخ پس‌زمینه تا max_batch درخواست یا max_wait ثانیه منتظر می‌ماند و
+    سپس همه را با یک فراخوانی مدل اجرا می‌کند.
+    """
+
+    def __init__(self, run, max_batch, max_wait):
+        self.run = run
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, sequence):
+        future = Future()
+        self._queue.put((sequence, future))
+        return future
+
+    def close(self):
+        """اجرای درخواست‌های در صف و پایان نخ پس‌زمینه"""
+        self._queue.put(_STOP)
+        self._thread.join()
+
+    def _loop(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            pending = [item]
+            try:
+                while len(pending) < self.max_batch:
+                    item = self._queue.get(timeout=self.max_wait)
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    pending.append(item)
+            except queue.Empty:
+                pass
+            self._complete(pending)
+
+    def _complete(self, pending):
+        try:
+            results = list(self.run([sequence for sequence, _ in pending]))
+        except Exception as error:
+            for _, future in pending:
+                future.set_exception(error)
+            return
+        for (_, future), result in zip(pending, results):
+            future.set_result(result)
+        # نتیجه‌ی کمتر از ورودی نباید فراخواننده را برای همیشه منتظر بگذارد
+        for _, future in pending[len(results):]:
+            future.set_exception(RuntimeError(
+                f"Model returned {len(results)} results for {len(pending)} inputs"))
+
 
 class LLMAnalysis:
-    def __init__(self):
-        self.function_predictor = pipeline(
-            "text-generation",
-            model="bio-llm/protein-function"
-        )
+    """پیش‌بینی عملکرد پروتئین با مدل زبان
+
+    مدل در اولین استفاده بارگذاری و در کل پردازه به اشتراک گذاشته می‌شود.
+    نتایج در کش LRU بر اساس توالی پروتئین نگه داشته می‌شوند. backend یکی از
+    torch، quantized (کوانتیزه‌سازی پویای int8) یا onnx (onnxruntime از طریق
+    optimum) است و threads تعداد نخ‌های CPU را تعیین می‌کند.
+    """
+
+    def __init__(self, model=DEFAULT_MODEL, backend='torch', threads=None, batch_size=16,
+                 max_tokens=None, cache_size=10000, max_wait=0.01, **generate_kwargs):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend: {backend}")
+        self.model = model
+        self.backend = backend
+        self.threads = threads
+        self.batch_size = batch_size
+        self.max_tokens = max_tokens
+        self.cache_size = cache_size
+        self.max_wait = max_wait
+        self.generate_kwargs = generate_kwargs
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._batcher = None
+
+    @property
+    def function_predictor(self):
+        return _load_pipeline(self.model, self.backend, self.threads)
 
     def predict_function(self, protein_sequence):
         """پیش‌بینی عملکرد پروتئین با مدل زبان"""
-        return self.function_predictor(protein_sequence)
\ No newline at end of file
+        cached = self._cached(protein_sequence)
+        if cached is not None:
+            return cached
+        # فراخوانی‌های هم‌زمان از نخ‌های مختلف در یک دسته اجرا می‌شوند
+        with self._lock:
+            if self._batcher is None:
+                self._batcher = _Batcher(self.predict_functions, self.batch_size, self.max_wait)
+        return self._batcher.submit(protein_sequence).result()
+
+    def close(self):
+        """توقف نخ دسته‌بندی تا نمونه و کش آن آزاد شوند؛ استفاده‌ی بعدی نخ تازه می‌سازد"""
+        with self._lock:
+            batcher, self._batcher = self._batcher, None
+        if batcher is not None:
+            batcher.close()
+
+    def predict_functions(self, protein_sequences, batch_size=None):
+        """پیش‌بینی دسته‌ای؛ توالی‌های تکراری و کش‌شده دوباره اجرا نمی‌شوند"""
+        protein_sequences = list(protein_sequences)
+        results = {}
+        missing = []
+        for sequence in protein_sequences:
+            if sequence in results:
+                continue
+            cached = self._cached(sequence)
+            if cached is None:
+                missing.append(sequence)
+                results[sequence] = None
+            else:
+                results[sequence] = cached
+        if missing:
+            predictor = self.function_predictor
+            size = batch_size or self.batch_size
+            for batch in length_batches(missing, size, self.max_tokens):
+                inputs = [missing[i] for i in batch]
+                outputs = predictor(inputs, batch_size=len(inputs), **self.generate_kwargs)
+                for sequence, output in zip(inputs, outputs):
+                    results[sequence] = output
+                    self._store(sequence, output)
+        return [results[sequence] for sequence in protein_sequences]
+
+    def _cached(self, sequence):
+        with self._lock:
+            if sequence not in self._cache:
+                return None
+            self._cache.move_to_end(sequence)
+            return self._cache[sequence]
+
+    def _store(self, sequence, output):
+        with self._lock:
+            self._cache[sequence] = output
+            self._cache.move_to_end(sequence)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
\ No newline at end of file
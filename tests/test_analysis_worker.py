@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+pytest.importorskip('qtpy')
+
+from qtpy.QtWidgets import QApplication  # noqa: E402
+
+from analysis.dna_detector import DNADetector  # noqa: E402
+from benchmarks.synthetic import random_genome  # noqa: E402
+from gui.analysis_worker import AnalysisWorker  # noqa: E402
+from gui.detection_panel import DetectionPanel  # noqa: E402
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def _record(worker):
+    events = []
+    worker.signals.stage_finished.connect(
+        lambda name, value, done, total: events.append(('stage', name, done, total)))
+    worker.signals.finished.connect(lambda results: events.append(('finished', results)))
+    worker.signals.failed.connect(lambda message: events.append(('failed', message)))
+    worker.signals.cancelled.connect(lambda: events.append(('cancelled',)))
+    return events
+
+
+def test_worker_reports_every_stage(app):
+    detector = DNADetector()
+    sequence = random_genome(500, seed=1)
+    worker = AnalysisWorker(detector, sequence, analyses=['orf'])
+    events = _record(worker)
+    worker.run()
+    assert [event[1:] for event in events[:-1]] == [
+        ('sequence_info', 1, 4), ('length', 2, 4), ('gc_content', 3, 4), ('orf', 4, 4)]
+    assert events[-1] == ('finished', detector.detect_features(sequence, ['orf']))
+
+
+def test_worker_cancel_and_failure(app):
+    worker = AnalysisWorker(DNADetector(), 'ACGTACGT')
+    events = _record(worker)
+    worker.signals.stage_finished.connect(lambda *args: worker.cancel())
+    worker.run()
+    assert events == [('stage', 'sequence_info', 1, 7), ('cancelled',)]
+    worker = AnalysisWorker(DNADetector(), 'ACGX')
+    events = _record(worker)
+    worker.run()
+    assert events == [('failed', 'Invalid DNA sequence')]
+
+
+def test_panel_runs_analysis_off_the_gui_thread(app):
+    panel = DetectionPanel(DNADetector())
+    panel.start_analysis(random_genome(800, seed=2))
+    assert not panel.analyze_btn.isEnabled() and panel.cancel_btn.isEnabled()
+    panel.thread_pool.waitForDone(10000)
+    app.processEvents()
+    assert panel.worker is None and panel.analyze_btn.isEnabled()
+    assert panel.progress_bar.format() == 'Analysis complete'
+    assert panel.results_table.rowCount() > 0
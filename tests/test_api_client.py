@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from models.alphafold import AlphaFoldIntegration
+from utils.api_client import APIClient, APIError
+from utils.mock_server import MockPredictionServer, fake_structure
+
+
+@pytest.fixture
+def server():
+    with MockPredictionServer() as mock:
+        yield mock
+
+
+def test_retries_throttling_and_server_errors(server):
+    server.throttle_every, server.fail_every = 3, 5
+    with APIClient(f"{server.url}/v1", backoff=0.001, max_retries=20) as client:
+        results = client.post_many('predict', ({'sequence': f"M{'A' * n}"} for n in range(20)))
+    assert results == [fake_structure(f"M{'A' * n}") for n in range(20)]
+
+
+def test_cache_answers_repeated_requests(server, tmp_path):
+    with APIClient(f"{server.url}/v1", cache_dir=str(tmp_path)) as client:
+        first = client.post('predict', {'sequence': 'MKV'}, cache_key='k')
+        before = server.requests
+        assert client.post('predict', {'sequence': 'MKV'}, cache_key='k') == first
+        assert server.requests == before
+
+
+def test_non_retryable_errors_become_api_error(server):
+    with APIClient(f"{server.url}/v1") as client:
+        with pytest.raises(APIError) as error:
+            client.post('missing', {'sequence': 'MKV'})
+        assert error.value.status == 404
+    with APIClient('http://') as client:
+        with pytest.raises(APIError):
+            client.post('predict', {'sequence': 'MKV'})
+
+
+def test_unwritable_cache_keeps_the_response(server, tmp_path):
+    blocker = tmp_path / 'cache'
+    blocker.write_text('not a directory')
+    with APIClient(f"{server.url}/v1", cache_dir=str(blocker)) as client:
+        assert client.post('predict', {'sequence': 'MKV'}, cache_key='k') == fake_structure('MKV')
+
+
+def test_alphafold_failures_are_none(server, capsys):
+    alphafold = AlphaFoldIntegration(base_url='http://', cache_dir=False)
+    assert alphafold.predict_structure('MKV') is None
+    alphafold = AlphaFoldIntegration(base_url=f"{server.url}/v1", cache_dir=False, max_retries=0)
+    server.fail_every = 2
+    results = alphafold.predict_structures(['MKV', 'MKVL', 'MKVLA'], concurrency=1)
+    assert results.count(None) == 1
+    assert 'for sequence 1 (MKVL)' in capsys.readouterr().out
+    results = asyncio.run(alphafold.apredict_structures(['MA', 'MAA'], concurrency=1))
+    assert results.count(None) == 1
+    assert 'AlphaFold API error for sequence' in capsys.readouterr().out
+    alphafold.close()
@@ -0,0 +1,41 @@
+import pytest
+
+from benchmarks import suite
+from benchmarks.synthetic import PROFILES, generate, mutate, random_genome
+
+
+def test_generators_are_seeded_and_sized():
+    for profile in PROFILES:
+        sequence = generate(profile, 5000, seed=3)
+        assert len(sequence) == 5000 and set(sequence) <= set('ACGT'), profile
+        assert sequence == generate(profile, 5000, seed=3)
+        assert sequence != generate(profile, 5000, seed=4)
+    rich = random_genome(20000, seed=1, gc=0.65)
+    assert (rich.count('G') + rich.count('C')) / len(rich) == pytest.approx(0.65, abs=0.02)
+    with pytest.raises(ValueError):
+        generate('martian', 100)
+
+
+def test_mutate_substitutes_at_the_rate():
+    sequence = random_genome(20000, seed=2)
+    sample = mutate(sequence, rate=0.01, seed=5)
+    assert len(sample) == len(sequence)
+    differences = sum(a != b for a, b in zip(sequence, sample))
+    assert 140 < differences < 260
+    assert mutate(sequence, rate=0.0) == sequence
+
+
+def test_run_case_and_compare():
+    entry = suite.run_case('find_cut_sites', 'random', 2000, max_repeats=1)
+    assert entry['size'] == 2000 and entry['seconds'] > 0 and entry['peak_bytes'] > 0
+    assert entry['results'] == suite.run_case('find_cut_sites', 'random', 2000,
+                                              max_repeats=1)['results']
+    key = suite.case_key('find_cut_sites', 'random', 2000)
+    baseline = {key: dict(entry)}
+    assert suite.compare([entry], baseline, 1.0, 0.5, 0.2) == []
+    slower = dict(entry, seconds=entry['seconds'] * 3 + 0.01, results=entry['results'] + 1)
+    messages = [message for _, message in suite.compare([slower], baseline, 1.0, 0.5, 0.2)]
+    assert len(messages) == 2 and messages[0].startswith('results changed')
+    # On a machine five times slower the allowed time scales with it
+    assert len(suite.compare([slower], baseline, 5.0, 0.5, 0.2)) == 1
+    assert suite.count_results({'a': [1, 2], 'b': [3]}) == 3
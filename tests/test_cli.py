@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+import cli
+from benchmarks.synthetic import random_genome
+from utils.result_writers import open_writer
+
+COLUMNS = {'id': 'str', 'length': 'int', 'value': 'json'}
+
+
+def _fasta(path, records):
+    path.write_text(''.join(f">{name}\n{sequence}\n" for name, sequence in records))
+    return str(path)
+
+
+def _rows(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_detect_windows_keep_genome_coordinates(tmp_path):
+    source = _fasta(tmp_path / 'n.fa', [('c', 'AAAAANNNNNNNNNNCCCCC')])
+    output = tmp_path / 'out.jsonl'
+    assert cli.main(['detect', source, '-o', str(output), '--window', '5', '--workers', '0',
+                     '--quiet']) == 0
+    rows = {row['id']: row for row in _rows(output)}
+    # Windows made only of N are gaps and produce no row
+    assert list(rows) == ['c:1-5', 'c:16-20']
+    assert rows['c:16-20']['gc_content'] == 100.0
+
+
+def test_detect_splits_records_at_n_gaps(tmp_path):
+    left, right = random_genome(1500, seed=21), random_genome(1450, seed=22)
+    source = _fasta(tmp_path / 'gap.fa', [('g assembly', left + 'N' * 50 + right),
+                                          ('plain', left[:300]), ('odd', 'ACGTRACGT')])
+    output = tmp_path / 'out.jsonl'
+    cli.main(['detect', source, '-o', str(output), '--workers', '0', '--quiet'])
+    rows = {row['id']: row for row in _rows(output)}
+    assert list(rows) == ['g:1-1500', 'g:1551-3000', 'plain', 'odd']
+    assert rows['g:1551-3000']['length'] == 1450 and 'error' not in rows['g:1-1500']
+    assert rows['odd']['error'] == 'Invalid DNA sequence'
+    windows = tmp_path / 'windows.jsonl'
+    cli.main(['detect', source, '-o', str(windows), '--window', '1000', '--workers', '0',
+              '--quiet', '--analyses', 'orf'])
+    ids = [row['id'] for row in _rows(windows) if row['id'].startswith('g:')]
+    assert ids == ['g:1-1000', 'g:1001-1500', 'g:1551-2000', 'g:2001-3000']
+    assert not any('error' in row for row in _rows(windows)[:4])
+
+
+def test_detect_resume_matches_full_run(tmp_path):
+    records = [(f"r{number} description", random_genome(300, seed=number)) for number in range(12)]
+    source = _fasta(tmp_path / 'in.fa', records)
+    full, partial = tmp_path / 'full.jsonl', tmp_path / 'partial.jsonl'
+    options = ['--workers', '0', '--quiet', '--analyses', 'orf,repeats']
+    cli.main(['detect', source, '-o', str(full)] + options)
+    lines = full.read_text().splitlines(keepends=True)
+    # Five complete records and a torn sixth line, as after an interrupted run
+    partial.write_text(''.join(lines[:5]) + lines[5][:20])
+    cli.main(['detect', source, '-o', str(partial), '--resume'] + options)
+    assert partial.read_text() == full.read_text()
+    assert [row['id'] for row in _rows(full)] == [f"r{number}" for number in range(12)]
+
+
+@pytest.mark.parametrize('suffix', ['.jsonl', '.tsv'])
+def test_writer_resume_counts_complete_rows(tmp_path, suffix):
+    path = str(tmp_path / f"out{suffix}")
+    with open_writer(path, COLUMNS) as writer:
+        for number in range(3):
+            writer.write({'id': f"r{number}", 'length': number, 'value': {'n': number}})
+    with open(path, 'a') as handle:
+        handle.write('r3\t')
+    with open_writer(path, COLUMNS, resume=True) as writer:
+        assert writer.completed == 3
+        writer.write({'id': 'r3', 'length': 3, 'value': [1, 2]})
+    with open(path) as handle:
+        lines = handle.read().splitlines()
+    assert len(lines) == (5 if suffix == '.tsv' else 4)
+    assert lines[-1].startswith('r3' if suffix == '.tsv' else '{"id": "r3"')
@@ -0,0 +1,70 @@
+import re
+
+import pytest
+from Bio.Seq import Seq
+
+from analysis.codon_optimizer import CodonOptimizer
+from analysis.codon_tables import CODON_USAGE
+
+PROTEIN = ('MKTAYIAKQRQISFVKSHFSRQLEERLGLIEVQAPILSRVGDGTQDNLSGAEKAVQVKVKALPDAQFEVVHSLAKWKRQT'
+           'LGQHDFSAGEGLYTHMKALRPDEDRLSPLHSVYVDQWDWERVMGDGERQFSTLKSTVEAIWAGIKATEAAVSEEFGLAPF'
+           'LPDQIHFVHSQELLSRYPDLDAKGRERAIAKDLGAVFLVGIGGKLSDGHRHDVRAPDYDDWSTPSELGHAGLNGDILVWN'
+           'PVLEDAFELSSMGIRVDADTLKHALALTGDEDRLELEWHQALLRGEMPQTIGGGIGQSRLTMLLLQLPHIGQVQAGVWPA'
+           'ACRESVPALL*')
+
+
+@pytest.fixture(scope='module')
+def optimizer():
+    return CodonOptimizer()
+
+
+def test_every_strategy_encodes_the_protein(optimizer):
+    for host in CODON_USAGE:
+        for strategy in ('most_frequent', 'weighted', 'balanced'):
+            dna = optimizer.optimize(PROTEIN, host, strategy, seed=1, gc_target=0.5)
+            assert str(Seq(dna).translate()) == PROTEIN, (host, strategy)
+    with pytest.raises(ValueError):
+        optimizer.optimize('MKZ')
+    with pytest.raises(ValueError):
+        optimizer.optimize('MK', host='mars')
+
+
+def test_most_frequent_has_the_highest_cai(optimizer):
+    best = optimizer.optimize(PROTEIN)
+    assert optimizer.cai(best) == pytest.approx(1.0)
+    assert optimizer.optimize('MLW*') == 'ATGCTGTGGTAA'
+    weighted = optimizer.optimize(PROTEIN, strategy='weighted', seed=3)
+    assert weighted == optimizer.optimize(PROTEIN, strategy='weighted', seed=3)
+    assert 0.3 < optimizer.cai(weighted) < 1.0
+    assert optimizer.gc_content('GGCCAT') == pytest.approx(66.666, rel=1e-3)
+
+
+def test_balanced_avoids_sites_and_homopolymers(optimizer):
+    plain = optimizer.optimize(PROTEIN, strategy='balanced')
+    dna = optimizer.optimize(PROTEIN, strategy='balanced', avoid_sites=['EcoRI', 'BsaI', 'GGATCC'],
+                             max_homopolymer=5)
+    assert str(Seq(dna).translate()) == PROTEIN
+    for site in ('GAATTC', 'GGTCTC', 'GAGACC', 'GGATCC'):
+        assert site not in dna
+    assert not re.search(r'(.)\1{5,}', dna)
+    assert optimizer.cai(dna) > 0.7 and optimizer.cai(plain) > 0.7
+    assert optimizer.optimize(PROTEIN, strategy='balanced', avoid_sites=['gaattc', 'ggtctc']) == \
+        optimizer.optimize(PROTEIN, strategy='balanced', avoid_sites=['EcoRI', 'BsaI'])
+    with pytest.raises(ValueError, match='Unknown site or enzyme: NotI1'):
+        optimizer.optimize('MK', strategy='balanced', avoid_sites=['NotI1'])
+    target = optimizer.optimize(PROTEIN, strategy='balanced', gc_target=0.4, gc_weight=2.0)
+    assert abs(optimizer.gc_content(target) - 40) < abs(optimizer.gc_content(plain) - 40)
+
+
+def test_custom_host_and_batches():
+    optimizer = CodonOptimizer()
+    optimizer.add_host('only_gcu', {'GCU': 10.0, 'GCC': 1.0, 'AUG': 1.0})
+    assert optimizer.optimize('MA', host='only_gcu') == 'ATGGCT'
+    proteins = ['MKV', ('named', 'MAL*'), 'MXQ']
+    results = list(optimizer.optimize_batch(proteins, strategy='weighted', seed=7, workers=2,
+                                            chunk_size=1))
+    assert [result['id'] for result in results] == [0, 'named', 2]
+    assert 'error' in results[2]
+    again = list(optimizer.optimize_batch(proteins[1:], strategy='weighted', seed=7, workers=0,
+                                          start=1))
+    assert again[0]['sequence'] == results[1]['sequence']
@@ -0,0 +1,50 @@
+from Bio.Seq import Seq
+from Bio.SeqUtils import gc_fraction
+
+from analysis.core_analysis import (calculate_complement, calculate_gc_content,
+                                    composition_batch, find_invalid_positions,
+                                    gc_content_batch, reverse_complement, validate_batch,
+                                    validate_dna_sequence)
+from analysis.dna_detector import DNADetector
+from analysis.packed_sequence import PackedSequence
+from benchmarks.synthetic import random_genome
+
+MIXED = ['ACGN', 'ACGS', 'acgw', 'NNNN', 'ATGCGCRYacgt', random_genome(5000, seed=3)]
+
+
+def test_complement_matches_biopython():
+    for sequence in ('ACGTacgtNRYKMBDHVU', random_genome(1000, seed=1)):
+        assert calculate_complement(sequence) == str(Seq(sequence).complement())
+        assert reverse_complement(sequence) == str(Seq(sequence).reverse_complement())
+    packed = PackedSequence.from_string('ACGTTN')
+    assert str(reverse_complement(packed)) == 'NAACGT'
+
+
+def test_validation_reports_positions():
+    assert validate_dna_sequence('ACGTacgt')
+    assert not validate_dna_sequence('ACGNT-')
+    assert find_invalid_positions('ACGNT-') == [3, 5]
+    assert find_invalid_positions('ACGNT-', max_positions=1) == [3]
+    assert validate_batch(['ACGT', 'AnX']) == [
+        {'valid': True, 'invalid_positions': [], 'invalid_characters': []},
+        {'valid': False, 'invalid_positions': [1, 2], 'invalid_characters': ['N', 'X']},
+    ]
+
+
+def test_composition_and_gc_counts_every_character():
+    assert composition_batch(['AACG', '', 'tnT']).tolist() == [
+        [2, 1, 1, 0, 0], [0, 0, 0, 0, 0], [0, 0, 0, 2, 1]]
+    assert gc_content_batch(['ACGN', '']).tolist() == [50.0, 0.0]
+    assert calculate_gc_content('ACGN') == 50.0
+    assert calculate_gc_content(PackedSequence.from_string('ACGN')) == 50.0
+
+
+def test_gc_excluding_ambiguous_matches_biopython():
+    detector = DNADetector()
+    for sequence in MIXED:
+        expected = gc_fraction(sequence) * 100
+        assert abs(calculate_gc_content(sequence, exclude_ambiguous=True) - expected) < 1e-9
+        assert detector.calculate_gc_content(sequence) == round(expected, 2)
+    packed = PackedSequence.from_string('ACGN')
+    assert round(calculate_gc_content(packed, exclude_ambiguous=True), 2) == 66.67
+    assert calculate_gc_content('', exclude_ambiguous=True) == 0.0
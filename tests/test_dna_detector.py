@@ -0,0 +1,31 @@
+import pickle
+import subprocess
+import sys
+
+from analysis.dna_detector import DNADetector
+
+
+def test_import_does_not_load_engines():
+    code = ('import sys, analysis.dna_detector; '
+            'print("numpy" in sys.modules, "analysis.core_analysis" in sys.modules)')
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            check=True).stdout
+    assert output.split() == ['False', 'False']
+
+
+def test_engines_are_built_on_first_use():
+    detector = DNADetector()
+    result = detector.detect_features('ATGAAATAGCGCGCGC')
+    assert result['patterns']['orf'] == [{'start': 0, 'end': 9, 'strand': '+'}]
+    assert detector.motifs.names() == ['promoter', 'terminator', 'orf']
+    assert detector.repeat_finder is detector.repeat_finder
+
+
+def test_pickled_detector_keeps_configuration():
+    detector = DNADetector(instrument=True)
+    detector.instrumentation.profile = True
+    detector.motifs.add_iupac('box', 'GGNCC')
+    copy = pickle.loads(pickle.dumps(detector))
+    assert 'box' in copy.motifs.names()
+    assert copy.instrumentation.active and copy.instrumentation.profile
+    assert copy.detect_features('AAGGACCAA')['patterns']['box']
@@ -0,0 +1,67 @@
+import pytest
+from Bio.Restriction import AllEnzymes
+from Bio.Seq import Seq
+
+from analysis.enzyme_analyzer import EnzymeAnalyzer, fragment_lengths, pattern_distance
+from benchmarks.synthetic import random_genome
+
+# Modification-dependent enzymes, whose Bio.Restriction positions include duplicates
+MODIFICATION_DEPENDENT = {'AbaSI', 'FspEI', 'LpnPI', 'MspJI'}
+
+
+@pytest.fixture(scope='module')
+def analyzer():
+    return EnzymeAnalyzer()
+
+
+def test_cut_sites_match_biopython(analyzer):
+    sequence = random_genome(3000, seed=61)
+    for circular in (False, True):
+        found = analyzer.find_cut_sites(sequence, circular=circular)
+        for name in set(analyzer.enzymes) - MODIFICATION_DEPENDENT:
+            expected = sorted(AllEnzymes.get(name).search(Seq(sequence), linear=not circular))
+            assert found[name] == expected, name
+
+
+def test_sites_across_the_origin():
+    analyzer = EnzymeAnalyzer(['EcoRI', 'BsaI'])
+    plasmid = 'ATTC' + random_genome(200, seed=62).replace('GAATTC', 'GAATTA') + 'GA'
+    assert analyzer.find_cut_sites(plasmid, 'EcoRI') == {'EcoRI': []}
+    assert analyzer.find_cut_sites(plasmid, 'EcoRI', circular=True) == \
+        {'EcoRI': sorted(AllEnzymes.get('EcoRI').search(Seq(plasmid), linear=False))}
+    with pytest.raises(ValueError):
+        analyzer.find_cut_sites(plasmid, 'NotAnEnzyme')
+
+
+def test_digests_and_fragment_patterns():
+    analyzer = EnzymeAnalyzer(['EcoRI', 'BamHI', 'HindIII'])
+    sequence = 'A' * 100 + 'GAATTC' + 'C' * 200 + 'GGATCC' + 'T' * 300
+    digest = analyzer.digest(sequence, ['EcoRI', 'BamHI'])
+    assert digest['cuts'] == [102, 308]
+    assert [fragment['length'] for fragment in digest['fragments']] == [101, 206, 305]
+    circular = analyzer.digest(sequence, 'EcoRI', circular=True)
+    assert circular['fragments'] == [{'start': 101, 'end': 101, 'length': len(sequence)}]
+    assert fragment_lengths([10, 50], 100, circular=True).tolist() == [40, 60]
+    assert pattern_distance([100, 200], [200, 100]) == 0
+    assert pattern_distance([100], [100, 50]) == 1.0
+    ranked = analyzer.rank_combinations(sequence, [305, 206, 101], max_enzymes=2)
+    assert ranked[0] == {'enzymes': ['BamHI', 'EcoRI'], 'fragments': [101, 206, 305],
+                         'score': 0.0}
+    combos = analyzer.digest_combinations(sequence, [['EcoRI'], ['EcoRI', 'BamHI']],
+                                          target=[101, 511])
+    assert [combo['enzymes'] for combo in combos] == [['EcoRI'], ['EcoRI', 'BamHI']]
+    batch = list(analyzer.digest_batch([sequence, ('bad', 'GAATTC')], [['EcoRI']], workers=2))
+    assert batch[0]['digests'] == analyzer.digest_combinations(sequence, [['EcoRI']])
+    assert batch[1]['id'] == 'bad'
+
+
+def test_gel_and_conditions():
+    analyzer = EnzymeAnalyzer(['EcoRI', 'BamHI'])
+    gel = analyzer.simulate_gel({'ladder': [10000, 1000, 1010, 100]})
+    bands = gel['ladder']
+    assert [band['size'] for band in bands] == [10000, 1005, 100]
+    assert bands[0]['position'] < bands[1]['position'] < bands[2]['position'] == 1.0
+    assert bands[1]['intensity'] == 2010
+    conditions = analyzer.optimize_digestion('GAATTC' + 'A' * 50, ['EcoRI', 'BamHI'])
+    assert conditions['missing_sites'] == ['BamHI']
+    assert conditions['simultaneous'] and conditions['temperatures'] == [37]
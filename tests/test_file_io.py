@@ -0,0 +1,53 @@
+import gzip
+
+from benchmarks.synthetic import random_genome
+from utils.file_io import (clean_sequence, load_dna_file, read_records, read_windows,
+                           sliding_windows)
+
+RECORDS = [('chr1 first', random_genome(1000, seed=1)), ('chr2', random_genome(37, seed=2)),
+           ('empty', ''), ('chr3', random_genome(500, seed=3))]
+
+
+def _write_fasta(path, records, width=60, opener=open):
+    with opener(path, 'wt') as handle:
+        for name, sequence in records:
+            handle.write(f">{name}\n")
+            for i in range(0, len(sequence), width):
+                handle.write(sequence[i:i + width].lower() + '\n')
+    return str(path)
+
+
+def test_fasta_records_across_chunk_boundaries(tmp_path):
+    path = _write_fasta(tmp_path / 'genome.fa', RECORDS)
+    for chunk_size in (7, 61, 4096):
+        assert list(read_records(path, chunk_size=chunk_size)) == RECORDS
+    gz = _write_fasta(tmp_path / 'genome.fa.gz', RECORDS, opener=gzip.open)
+    assert list(read_records(gz, chunk_size=13)) == RECORDS
+    assert load_dna_file(path) == RECORDS[0][1]
+
+
+def test_fastq_and_plain_files(tmp_path):
+    fastq = tmp_path / 'reads.fq'
+    fastq.write_text('@r1\nACGTN\n+\nIIIII\n\n@r2 desc\nggcc\n+\nIIII\n')
+    assert list(read_records(str(fastq))) == [('r1', 'ACGT'), ('r2 desc', 'GGCC')]
+    assert list(read_records(str(fastq), alphabet='ACGTN')) == [('r1', 'ACGTN'), ('r2 desc', 'GGCC')]
+    plain = tmp_path / 'plain.txt'
+    plain.write_text('acgt 1234\nTTGA\n')
+    assert list(read_records(str(plain))) == [(None, 'ACGTTTGA')]
+    assert clean_sequence(b'ac-gt\r\nNx', 'ACGTN') == b'ACGTN'
+
+
+def test_read_windows_matches_sliding_windows(tmp_path):
+    path = _write_fasta(tmp_path / 'genome.fa', RECORDS, width=17)
+    for size, step in ((100, None), (100, 30), (64, 150), (2000, None)):
+        expected = [(name, start, window) for name, sequence in RECORDS
+                    for start, window in sliding_windows(sequence, size, step)]
+        for chunk_size in (11, 4096):
+            assert list(read_windows(path, size, step, chunk_size=chunk_size)) == expected
+
+
+def test_sliding_windows_tail():
+    assert list(sliding_windows('ACGTACG', 3)) == [(0, 'ACG'), (3, 'TAC'), (6, 'G')]
+    assert list(sliding_windows('ACGTAC', 4, 2)) == [(0, 'ACGT'), (2, 'GTAC')]
+    assert list(sliding_windows('ACGTACGT', 2, 5)) == [(0, 'AC'), (5, 'CG')]
+    assert list(sliding_windows('', 3)) == []
@@ -0,0 +1,74 @@
+import io
+import math
+
+import numpy as np
+import pytest
+
+from analysis.dna_detector import DNADetector
+from analysis.genome_tracks import genome_tracks, genome_tracks_file, write_bedgraph
+from benchmarks.synthetic import random_genome
+from utils.file_io import sliding_windows
+
+GENOME = random_genome(3000, seed=71, gc=0.6) + 'N' * 120 + random_genome(1111, seed=72)
+
+
+def _naive(sequence, window, step):
+    rows = []
+    for start, text in sliding_windows(sequence, window, step):
+        a, c, g, t = (text.count(base) for base in 'ACGT')
+        called = a + c + g + t
+        cpg = text.count('CG')
+        frequencies = [count / called for count in (a, c, g, t) if count] if called else []
+        rows.append({
+            'start': start,
+            'end': start + len(text),
+            'gc': (g + c) / called * 100 if called else 0.0,
+            'gc_skew': (g - c) / (g + c) if g + c else 0.0,
+            'at_skew': (a - t) / (a + t) if a + t else 0.0,
+            'entropy': -sum(p * math.log2(p) for p in frequencies),
+            'cpg_oe': cpg * called / (c * g) if c * g else 0.0,
+        })
+    return rows
+
+
+def _rows(profile):
+    return [{key: profile[key][i] for key in profile} for i in range(len(profile['start']))]
+
+
+def test_tracks_match_a_window_by_window_count():
+    for window, step in ((500, None), (250, 100), (64, 200), (10000, None)):
+        rows = _rows(genome_tracks(GENOME, window, step))
+        expected = _naive(GENOME, window, step)
+        assert len(rows) == len(expected)
+        for row, wanted in zip(rows, expected):
+            assert row == pytest.approx(wanted)
+
+
+def test_all_n_window_and_selected_tracks():
+    profile = genome_tracks(GENOME, 100, tracks=('gc',))
+    assert sorted(profile) == ['end', 'gc', 'start']
+    assert profile['gc'][30] == 0.0
+    with pytest.raises(ValueError):
+        genome_tracks(GENOME, 100, tracks=('gc', 'melting'))
+    with pytest.raises(ValueError):
+        genome_tracks(GENOME, 0)
+    detector_profile = DNADetector().gc_profile(GENOME, 500, 250)
+    assert np.array_equal(detector_profile['entropy'], genome_tracks(GENOME, 500, 250)['entropy'])
+
+
+def test_file_tracks_and_bedgraph(tmp_path):
+    path = tmp_path / 'genome.fa'
+    path.write_text('>one\n' + GENOME[:2000].lower() + '\n>two\n'
+                    + '\n'.join(GENOME[i:i + 70] for i in range(2000, len(GENOME), 70)) + '\n')
+    profiles = list(genome_tracks_file(str(path), 300, 150))
+    assert [name for name, _ in profiles] == ['one', 'two']
+    for (_, profile), sequence in zip(profiles, (GENOME[:2000], GENOME[2000:])):
+        expected = genome_tracks(sequence, 300, 150)
+        assert all(np.allclose(profile[key], expected[key]) for key in expected)
+    handle = io.StringIO()
+    count = write_bedgraph(handle, 'one', profiles[0][1], 'gc', 300, 150)
+    lines = handle.getvalue().splitlines()
+    assert len(lines) == count
+    intervals = [tuple(map(int, line.split('\t')[1:3])) for line in lines]
+    assert all(end <= following for (_, end), (following, _) in zip(intervals, intervals[1:]))
+    assert all(end - start <= 150 for start, end in intervals)
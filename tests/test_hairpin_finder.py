@@ -0,0 +1,47 @@
+from analysis.core_analysis import reverse_complement
+from analysis.hairpin_finder import HairpinFinder
+from benchmarks.synthetic import random_genome
+
+
+def _naive(sequence, k, min_loop, max_loop, mismatches):
+    hits = []
+    for i in range(len(sequence)):
+        for loop in range(min_loop, max_loop + 1):
+            if i + 2 * k + loop > len(sequence):
+                break
+            left = sequence[i:i + k]
+            right = reverse_complement(sequence[i + k + loop:i + 2 * k + loop])
+            errors = sum(a != b or a == 'N' for a, b in zip(left, right))
+            if errors <= mismatches:
+                hits.append((i, loop, errors))
+    return hits
+
+
+def _hits(hairpins):
+    return [(h['start'], h['loop_end'] - h['loop_start'], h['mismatches']) for h in hairpins]
+
+
+def test_exact_stems_match_naive_scan():
+    finder = HairpinFinder()
+    sequence = random_genome(600, seed=4)
+    for k, min_loop, max_loop in ((4, 3, 20), (5, 0, 50), (6, 3, 8)):
+        assert _hits(finder.find(sequence, k, min_loop, max_loop)) == \
+            _naive(sequence, k, min_loop, max_loop, 0)
+
+
+def test_mismatched_stems_match_naive_scan():
+    finder = HairpinFinder()
+    sequence = random_genome(300, seed=8) + 'NNNN' + random_genome(100, seed=1)
+    assert _hits(finder.find(sequence, 6, 3, 12, max_mismatches=1)) == \
+        _naive(sequence, 6, 3, 12, 1)
+
+
+def test_hairpin_coordinates_and_limits():
+    stem = 'GCGTACG'
+    sequence = 'TT' + stem + 'AAAA' + reverse_complement(stem) + 'TT'
+    hit = HairpinFinder().find(sequence, 7, 3, 10)[0]
+    assert hit == {'start': 2, 'end': 20, 'loop_start': 9, 'loop_end': 13,
+                   'stem_length': 7, 'mismatches': 0}
+    assert len(HairpinFinder(max_results=1).find(random_genome(400, seed=3), 4)) == 1
+    assert HairpinFinder().find('ACGT', 5) == []
+    assert HairpinFinder().find(sequence, 7, 10, 5) == []
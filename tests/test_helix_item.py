@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+pytest.importorskip('qtpy')
+
+from qtpy.QtWidgets import QApplication  # noqa: E402
+
+from analysis.dna_detector import DNADetector  # noqa: E402
+from benchmarks.synthetic import random_genome  # noqa: E402
+from gui.helix_item import (FEATURE_COLORS, HelixItem, base_at, bases_before,  # noqa: E402
+                            features_from_results, visual_index)
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+def test_visual_index_round_trip():
+    for base in range(0, 2000, 7):
+        visual = visual_index(base)
+        assert bases_before(visual) == base
+        assert base_at(visual) == base
+
+
+def test_features_from_detector_results():
+    sequence = 'ATG' + 'GCT' * 40 + 'TAA' + random_genome(300, seed=2)
+    features = features_from_results(DNADetector().detect_features(sequence))
+    assert (0, 126, FEATURE_COLORS['orf']) in features
+    assert all(start < end for start, end, _ in features)
+
+
+def test_features_cleared_when_sequence_changes(app):
+    item = HelixItem()
+    item.set_sequence('ACGT' * 50)
+    item.set_features([(0, 10, '#000000')])
+    item.set_sequence('ACGT' * 50, 'TGCA' * 50)
+    assert item.features
+    item.append('A')
+    assert item.features
+    item.set_sequence('GGCC' * 50)
+    assert item.features == []
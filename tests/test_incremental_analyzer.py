@@ -0,0 +1,61 @@
+from analysis.dna_detector import DNADetector
+from analysis.incremental_analyzer import AnalysisCache, IncrementalAnalyzer
+from analysis.instrumentation import StageObserver
+from benchmarks.synthetic import mutate, random_genome
+
+
+class Statuses(StageObserver):
+    def __init__(self):
+        self.statuses = []
+
+    def run_finished(self, summary):
+        self.statuses.append(summary['status'])
+
+
+def test_edits_match_full_analysis():
+    detector = DNADetector()
+    analyzer = IncrementalAnalyzer(detector)
+    genome = random_genome(3000, seed=21)
+    edits = [genome[:1200], genome[:2500], genome[:1900], genome[:1900] + 'GCGCGCTATAAATA',
+             genome[:2999], mutate(genome[:2000], rate=0.01, seed=3), genome[:10], '']
+    for sequence in edits:
+        assert analyzer.detect_features(sequence) == detector.detect_features(sequence)
+
+
+def test_append_and_pop_track_the_sequence():
+    detector = DNADetector()
+    analyzer = IncrementalAnalyzer(detector)
+    genome = random_genome(600, seed=22)
+    for base in genome[:200]:
+        analyzer.append(base)
+    analyzer.pop(17)
+    analyzer.append(genome[183:600].lower())
+    assert analyzer.sequence == genome
+    assert analyzer.detect_features(genome) == detector.detect_features(genome)
+    assert 'error' in analyzer.detect_features(genome + 'X')
+    assert analyzer.detect_features(genome) == detector.detect_features(genome)
+
+
+def test_repeated_sequences_come_from_the_cache():
+    detector = DNADetector()
+    statuses = detector.add_observer(Statuses())
+    analyzer = IncrementalAnalyzer(detector, cache_size=2)
+    first, second, third = (random_genome(300, seed=seed) for seed in (1, 2, 3))
+    for sequence in (first, second, first, third, second):
+        analyzer.detect_features(sequence)
+    assert statuses.statuses == ['ok', 'ok', 'cached', 'ok', 'ok']
+    assert len(analyzer.cache) == 2
+    assert AnalysisCache.key('ACGT', ('orf',)) != AnalysisCache.key('ACGT', ('orf', 'repeats'))
+
+
+def test_new_motifs_and_references_invalidate_state():
+    detector = DNADetector()
+    analyzer = IncrementalAnalyzer(detector)
+    genome = random_genome(800, seed=23) + 'GGACCTTGGTCC'
+    assert analyzer.detect_features(genome)['sequence_info']['name'] == 'Unknown Sequence'
+    detector.motifs.add_iupac('box', 'GGNCC')
+    assert analyzer.detect_features(genome) == detector.detect_features(genome)
+    assert len(analyzer.detect_features(genome)['patterns']['box']) >= 2
+    detector.add_reference('NEW', {'name': 'New', 'type': 'custom', 'description': '',
+                                   'sequence': genome})
+    assert analyzer.detect_features(genome)['sequence_info']['name'] == 'New'
@@ -0,0 +1,102 @@
+import json
+
+import pytest
+
+from analysis.dna_detector import DNADetector
+from analysis.instrumentation import (Instrumentation, JSONLinesObserver, MetricsCollector,
+                                      StageObserver, parse_options, size_class)
+
+
+class Recorder(StageObserver):
+    def __init__(self):
+        self.stages, self.runs = [], []
+
+    def stage_finished(self, record):
+        self.stages.append(record)
+
+    def run_finished(self, summary):
+        self.runs.append(summary)
+
+
+def test_parse_options_ignores_unknown_values(monkeypatch):
+    assert parse_options(None) is None
+    assert parse_options(' Off ') is None
+    assert parse_options('1') == {'timing'}
+    assert parse_options('profile, memory') == {'timing', 'profile', 'memory'}
+    with pytest.warns(RuntimeWarning, match='fast'):
+        assert parse_options('profile,fast') == {'timing', 'profile'}
+    monkeypatch.setenv('DNA_INSTRUMENT', 'memory,bogus')
+    with pytest.warns(RuntimeWarning):
+        instrumentation = Instrumentation()
+    assert instrumentation.memory and not instrumentation.profile
+
+
+def test_size_classes():
+    assert [size_class(n) for n in (0, 1000, 1001, 10_000_001)] == ['1k', '1k', '10k', '>10M']
+
+
+def test_stages_and_runs_reach_observers():
+    detector = DNADetector(instrument=False)
+    assert not detector.instrumentation.active
+    recorder = detector.add_observer(Recorder())
+    detector.detect_features('ATGAAATAGCCC', analyses=['orf'])
+    assert [record['stage'] for record in recorder.stages] == [
+        'validation', 'sequence_info', 'gc_content', 'orf']
+    assert recorder.runs[0]['status'] == 'ok'
+    assert recorder.stages[-1]['results'] == 1
+
+
+def test_error_and_cancelled_status():
+    detector = DNADetector()
+    recorder = detector.add_observer(Recorder())
+    assert 'error' in detector.detect_features('ACGTX')
+    stages = detector.iter_stages('ACGTACGT')
+    next(stages)
+    stages.close()
+    failed, cancelled = recorder.runs
+    assert failed['status'] == 'error' and failed['failed_stage'] == 'validation'
+    assert failed['error'] == 'ValueError: Invalid DNA sequence'
+    assert cancelled['status'] == 'cancelled'
+
+
+def test_failing_observer_only_warns():
+    class Broken(StageObserver):
+        def run_finished(self, summary):
+            raise OSError('disk full')
+
+    detector = DNADetector()
+    detector.add_observer(Broken())
+    with pytest.warns(RuntimeWarning, match='disk full'):
+        assert detector.detect_features('ACGT')['length'] == 4
+
+
+def test_collector_outputs(tmp_path):
+    detector = DNADetector(instrument=True)
+    detector.instrumentation.memory = True
+    collector = detector.add_observer(MetricsCollector())
+    for sequence in ('ACGT' * 10, 'ACGT' * 500, 'ACGN'):
+        detector.detect_features(sequence)
+    snapshot = json.loads(collector.to_json())
+    runs = {entry['size_class']: entry for entry in snapshot['runs']}
+    assert runs['1k']['statuses'] == {'ok': 1, 'error': 1}
+    assert runs['1k']['failed_stages'] == {'validation': 1}
+    assert runs['10k']['count'] == 1
+    assert sum(entry['share'] for entry in collector.hot_stages()) == pytest.approx(1.0)
+    text = collector.to_prometheus()
+    assert 'dna_detector_runs_total{size_class="1k",status="error"} 1' in text
+    assert 'dna_detector_stage_peak_bytes{' in text
+    collector.write_prometheus(tmp_path / 'dna.prom')
+    assert (tmp_path / 'dna.prom').read_text() == text
+    assert not (tmp_path / 'dna.prom.tmp').exists()
+
+
+def test_batch_summaries_are_published_in_parent(tmp_path):
+    detector = DNADetector()
+    collector = detector.add_observer(MetricsCollector())
+    with open(tmp_path / 'runs.jsonl', 'w') as handle:
+        detector.add_observer(JSONLinesObserver(handle))
+        results = list(detector.detect_features_batch(['ACGT', 'ATGAAATAG', 'NN'], workers=2))
+    assert [result['id'] for result in results] == [0, 1, 2]
+    statuses = [json.loads(line)['status'] for line in open(tmp_path / 'runs.jsonl')]
+    assert statuses == ['ok', 'ok', 'error']
+    assert collector.runs['1k']['count'] == 3
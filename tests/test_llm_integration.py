@@ -0,0 +1,93 @@
+import gc
+import threading
+import weakref
+
+import pytest
+
+from models import llm_integration
+from models.llm_integration import LLMAnalysis, _Batcher, length_batches
+
+
+class FakePipeline:
+    """Stands in for a transformers text-generation pipeline"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, batch_size, **options):
+        self.calls.append(list(inputs))
+        if any('X' in sequence for sequence in inputs):
+            raise RuntimeError('bad token')
+        return [f"function of {sequence}" for sequence in inputs]
+
+
+@pytest.fixture
+def pipeline():
+    fake = FakePipeline()
+    llm_integration._PIPELINES['fake-model', 'torch', None] = fake
+    yield fake
+    del llm_integration._PIPELINES['fake-model', 'torch', None]
+
+
+def test_length_batches_group_similar_lengths():
+    sequences = ['M' * n for n in (5, 50, 6, 48, 7, 49)]
+    assert list(length_batches(sequences, 3)) == [[0, 2, 4], [3, 5, 1]]
+    assert list(length_batches(sequences, 10, max_tokens=100)) == [[0, 2, 4], [3, 5], [1]]
+
+
+def test_batches_skip_duplicates_and_cached_sequences(pipeline):
+    analysis = LLMAnalysis('fake-model', batch_size=2, cache_size=3)
+    results = analysis.predict_functions(['MKV', 'MA', 'MKV', 'MLLL'])
+    assert results == ['function of MKV', 'function of MA', 'function of MKV', 'function of MLLL']
+    assert pipeline.calls == [['MA', 'MKV'], ['MLLL']]
+    assert analysis.predict_functions(['MA', 'MQ']) == ['function of MA', 'function of MQ']
+    assert pipeline.calls[-1] == ['MQ']
+    # MKV is the least recently used entry once MQ is stored
+    assert analysis._cached('MKV') is None
+
+
+def test_concurrent_calls_share_a_batch(pipeline):
+    analysis = LLMAnalysis('fake-model', batch_size=8, max_wait=0.2)
+    results = {}
+
+    def predict(sequence):
+        results[sequence] = analysis.predict_function(sequence)
+
+    threads = [threading.Thread(target=predict, args=('M' + 'A' * n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {'M' + 'A' * n: 'function of M' + 'A' * n for n in range(4)}
+    assert len(pipeline.calls) == 1
+    with pytest.raises(RuntimeError):
+        analysis.predict_function('MXX')
+    assert analysis.predict_function('MA') == 'function of MA'
+
+
+def test_close_stops_the_batcher(pipeline):
+    analysis = LLMAnalysis('fake-model')
+    assert analysis.predict_function('MKV') == 'function of MKV'
+    thread = analysis._batcher._thread
+    analysis.close()
+    assert not thread.is_alive()
+    assert analysis.predict_function('MA') == 'function of MA'
+    analysis.close()
+    reference = weakref.ref(analysis)
+    del analysis
+    gc.collect()
+    assert reference() is None
+
+
+def test_short_model_output_fails_the_unmatched_requests():
+    batcher = _Batcher(lambda sequences: sequences[:1], max_batch=2, max_wait=1.0)
+    first, second = batcher.submit('MA'), batcher.submit('MK')
+    assert first.result(timeout=5) == 'MA'
+    with pytest.raises(RuntimeError):
+        second.result(timeout=5)
+    batcher.close()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        LLMAnalysis(backend='gpu')
@@ -0,0 +1,89 @@
+import re
+
+import numpy as np
+import pytest
+
+from analysis.core_analysis import reverse_complement
+from analysis.motif_engine import IUPAC_CODES, MotifLibrary
+from benchmarks.synthetic import random_genome
+
+GENOME = random_genome(4000, seed=51) + 'NNNN' + random_genome(500, seed=52)
+ORF_PATTERN = r'ATG(?:\w{3})*?(?:TAA|TAG|TGA)'
+
+
+def _iupac_regex(pattern):
+    return ''.join(f"[{IUPAC_CODES[c]}]" for c in pattern)
+
+
+def _naive(pattern, sequence):
+    """Overlapping hits of a regex on both strands in forward coordinates"""
+    n = len(sequence)
+    hits = []
+    for strand, text in (('+', sequence), ('-', reverse_complement(sequence))):
+        for match in re.finditer(f"(?=({pattern}))", text):
+            start, end = match.span(1)
+            if strand == '-':
+                start, end = n - end, n - start
+            hits.append({'start': start, 'end': end, 'strand': strand})
+    return sorted(hits, key=lambda hit: (hit['start'], hit['end'], hit['strand']))
+
+
+def _hits(library, name, **options):
+    return [{key: hit[key] for key in ('start', 'end', 'strand')}
+            for hit in library.scan(GENOME, **options) if hit['motif'] == name]
+
+
+def test_iupac_words_and_masks_match_regex():
+    library = MotifLibrary()
+    for name, pattern in (('tata', 'TATAWAWR'), ('ecori', 'GAATTC'),
+                          ('gapped', 'NNNNNNNGATC'), ('long', 'ACGT' * 8 + 'N')):
+        library.add_iupac(name, pattern)
+    assert [motif.kind for motif in library] == ['words', 'words', 'mask', 'mask']
+    for name, pattern in (('tata', 'TATAWAWR'), ('ecori', 'GAATTC'), ('gapped', 'NNNNNNNGATC')):
+        assert _hits(library, name) == _naive(_iupac_regex(pattern), GENOME)
+    with pytest.raises(ValueError):
+        library.add_iupac('bad', 'ACGX')
+
+
+def test_regex_and_orf_motifs():
+    library = MotifLibrary()
+    library.add_regex('gc', r'GCGC[GC]+')
+    library.add_orf('orf')
+    plus = _hits(library, 'gc', strands='+', overlapping=False)
+    assert [(hit['start'], hit['end']) for hit in plus] == \
+        [match.span() for match in re.finditer(r'GCGC[GC]+', GENOME)]
+    orfs = _hits(library, 'orf', strands='+', overlapping=False)
+    assert [(hit['start'], hit['end']) for hit in orfs] == \
+        [match.span() for match in re.finditer(ORF_PATTERN, GENOME)]
+    assert library.motifs[0].width is None and library.motifs[1].width is None
+
+
+def test_pwm_scores_and_threshold():
+    counts = [[8, 0, 0, 1], [0, 8, 0, 1], [0, 0, 8, 1], [0, 0, 0, 5]]
+    library = MotifLibrary()
+    motif = library.add_pwm('acgt', counts, threshold=1.0)
+    sequence = 'TTACGTTTACGATT'
+    hits = library.scan(sequence, strands='+')
+    assert [(hit['start'], hit['end']) for hit in hits] == [(2, 6)]
+    expected = sum(motif.data['ACGT'.index(base), column] for column, base in enumerate('ACGT'))
+    assert hits[0]['score'] == round(expected, 3)
+    # ACGT is its own reverse complement
+    assert [hit['strand'] for hit in library.scan(sequence)] == ['+', '-']
+    loose = MotifLibrary()
+    loose.add_pwm('acgt', counts, threshold=0.0)
+    assert len(loose.scan(random_genome(100, seed=1), strands='+')) == 97
+
+
+def test_locate_and_jaspar(tmp_path):
+    library = MotifLibrary()
+    library.add_iupac('ecori', 'GAATTC')
+    located = library.locate(GENOME)
+    expected = [hit['start'] for hit in _naive('GAATTC', GENOME) if hit['strand'] == '+']
+    assert located['ecori', '+'].tolist() == expected
+    assert np.array_equal(located['ecori', '-'], located['ecori', '+'])
+    jaspar = tmp_path / 'motifs.jaspar'
+    jaspar.write_text('>MA0001.1 TEST\nA [ 9 0 0 ]\nC [ 0 9 0 ]\nG [ 0 0 9 ]\nT [ 0 0 0 ]\n')
+    loaded = library.load_jaspar(str(jaspar), threshold=1.0)
+    assert [motif.name for motif in loaded] == ['MA0001.1 TEST']
+    hits = library.scan('TTACGTT', strands='+', names=['MA0001.1 TEST'])
+    assert [hit['start'] for hit in hits] == [2]
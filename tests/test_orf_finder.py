@@ -0,0 +1,72 @@
+from analysis.core_analysis import reverse_complement
+from analysis.orf_finder import OrfFinder, OrfTracker
+from benchmarks.synthetic import random_genome
+
+STOPS = ('TAA', 'TAG', 'TGA')
+
+
+def _forward(sequence, starts=('ATG',)):
+    orfs = []
+    for phase in range(3):
+        open_start = None
+        for i in range(phase, len(sequence) - 2, 3):
+            codon = sequence[i:i + 3]
+            if codon in STOPS:
+                if open_start is not None:
+                    orfs.append((open_start, i + 3))
+                open_start = None
+            elif codon in starts and open_start is None:
+                open_start = i
+    return orfs
+
+
+def _naive(sequence, min_length=0, starts=('ATG',)):
+    n = len(sequence)
+    orfs = [{'frame': s % 3 + 1, 'strand': '+', 'start': s, 'end': e, 'length': e - s - 3}
+            for s, e in _forward(sequence, starts)]
+    orfs += [{'frame': -(s % 3 + 1), 'strand': '-', 'start': n - e, 'end': n - s,
+              'length': e - s - 3}
+             for s, e in _forward(reverse_complement(sequence), starts)]
+    orfs = [orf for orf in orfs if orf['length'] >= min_length]
+    return sorted(orfs, key=lambda orf: (orf['strand'] == '-', abs(orf['frame']), orf['start']))
+
+
+def test_six_frames_match_naive_scan():
+    for seed, length in ((1, 3000), (2, 3001), (3, 3002)):
+        sequence = random_genome(length, seed=seed)
+        assert OrfFinder().find(sequence) == _naive(sequence)
+        assert OrfFinder(min_length=60).find(sequence) == _naive(sequence, 60)
+    sequence = random_genome(500, seed=6)
+    assert OrfFinder(both_strands=False).find(sequence) == \
+        [orf for orf in _naive(sequence) if orf['strand'] == '+']
+
+
+def test_alternative_starts_and_n():
+    sequence = random_genome(2000, seed=7)
+    finder = OrfFinder(table=11, alternative_starts=True)
+    assert finder.find(sequence) == _naive(sequence, starts=tuple(finder.start_codons))
+    # Codons containing N are neither starts nor stops
+    assert OrfFinder(both_strands=False).find('ATGTANTAG') == [
+        {'frame': 1, 'strand': '+', 'start': 0, 'end': 9, 'length': 6}]
+    assert OrfFinder().find('ANGAAATAA') == []
+
+
+def test_stream_matches_whole_sequence():
+    sequence = random_genome(5000, seed=11)
+    expected = sorted(OrfFinder().find(sequence), key=lambda orf: orf['start'])
+    chunks = [sequence[i:i + 333] for i in range(0, len(sequence), 333)]
+    for length in (len(sequence), None):
+        streamed = list(OrfFinder().scan_stream(iter(chunks), length=length))
+        assert sorted(streamed, key=lambda orf: orf['start']) == expected
+    # With a known length, forward ORFs are yielded before the stream ends
+    stream = OrfFinder().scan_stream(iter(chunks), length=len(sequence))
+    assert next(stream)['end'] <= 2 * 333 + 2
+
+
+def test_tracker_follows_extend_and_truncate():
+    sequence = random_genome(20000, seed=12)
+    tracker = OrfTracker()
+    for length in (4000, 19000, 9000, 20000, 17, 12001):
+        tracker.truncate(length)
+        tracker.extend(sequence[:length])
+        assert tracker.orfs(length) == OrfFinder().find(sequence[:length])
@@ -0,0 +1,54 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from analysis.core_analysis import reverse_complement
+from analysis.dna_detector import DNADetector
+from analysis.packed_sequence import PackedSequence
+from benchmarks.synthetic import random_genome
+
+TEXT = 'NN' + random_genome(997, seed=4) + 'NNNN' + random_genome(301, seed=5) + 'N'
+
+
+def test_round_trip_views_and_counts():
+    packed = PackedSequence.from_string(TEXT)
+    assert str(packed) == TEXT and len(packed) == len(TEXT)
+    assert str(packed[5:730]) == TEXT[5:730]
+    assert packed[-1] == 'N' and packed[2] == TEXT[2]
+    assert str(packed.reverse_complement()) == reverse_complement(TEXT)
+    assert str(packed.reverse_complement()[10:500].complement()) == TEXT[::-1][10:500]
+    assert packed.base_counts() == {base: TEXT.count(base) for base in 'ACGTN'}
+    assert packed.has_mask() and not packed[2:999].has_mask()
+    assert packed[1000:1003] == 'NNN' and hash(packed[1000:1003]) == hash('NNN')
+    with pytest.raises(ValueError):
+        packed[::2]
+    with pytest.raises(IndexError):
+        packed[len(TEXT)]
+
+
+def test_saved_file_is_memory_mapped(tmp_path):
+    path = str(tmp_path / 'genome.2bit')
+    PackedSequence.from_string(TEXT).save(path)
+    opened = PackedSequence.open(path)
+    assert isinstance(opened.packed, np.memmap)
+    assert str(opened) == TEXT
+    view = opened[100:900].reverse_complement()
+    view.save(str(tmp_path / 'view.2bit'))
+    assert str(PackedSequence.open(str(tmp_path / 'view.2bit'))) == reverse_complement(TEXT[100:900])
+    # Pickled views reopen the file instead of copying the packed bytes
+    state = pickle.dumps(view)
+    assert len(state) < 1000
+    assert str(pickle.loads(state)) == str(view)
+    (tmp_path / 'bad').write_bytes(b'x' * 40)
+    with pytest.raises(ValueError):
+        PackedSequence.open(str(tmp_path / 'bad'))
+
+
+def test_detector_accepts_packed_sequences():
+    detector = DNADetector()
+    sequence = random_genome(3000, seed=6)
+    packed = PackedSequence.from_string(sequence)
+    expected = detector.detect_features(sequence)
+    assert detector.detect_features(packed) == expected
+    assert 'error' in detector.detect_features(PackedSequence.from_string('ACGTN'))
@@ -0,0 +1,63 @@
+import os
+
+from analysis.dna_detector import DNADetector
+from analysis.packed_sequence import PackedSequence
+from analysis.parallel import imap_bounded
+from benchmarks.synthetic import random_genome
+
+
+def _inverse(value):
+    return 1 / value
+
+
+def test_imap_bounded_reports_errors_per_item():
+    for workers in (0, 2):
+        outcomes = list(imap_bounded(_inverse, [1, 0, 4], workers=workers, chunk_size=2))
+        assert outcomes == [(1, 1.0, None), (0, None, 'ZeroDivisionError: division by zero'),
+                            (4, 0.25, None)]
+    unordered = imap_bounded(_inverse, range(1, 50), workers=2, chunk_size=3, ordered=False)
+    assert sorted(item for item, _, _ in unordered) == list(range(1, 50))
+
+
+def _scaled(shared, value):
+    factor, pid = shared
+    return factor * value, os.getpid() != pid
+
+
+def test_shared_state_reaches_every_worker():
+    shared = (3, os.getpid())
+    for workers in (0, 2):
+        outcomes = list(imap_bounded(_scaled, range(5), workers=workers, shared=shared))
+        assert [result for _, (result, _), _ in outcomes] == [0, 3, 6, 9, 12]
+        assert all(remote == bool(workers) for _, (_, remote), _ in outcomes)
+
+
+def test_imap_bounded_reads_input_lazily():
+    pulled = []
+
+    def items():
+        for number in range(1, 1000):
+            pulled.append(number)
+            yield number
+
+    outcomes = imap_bounded(_inverse, items(), workers=1, chunk_size=4)
+    next(outcomes)
+    # At most 2 * workers chunks are in flight at any time
+    assert len(pulled) <= 3 * 4
+    outcomes.close()
+
+
+def test_batch_matches_sequential_analysis():
+    detector = DNADetector()
+    sequences = [random_genome(400 + 50 * n, seed=n) for n in range(6)] + ['ACGX']
+    records = [(f"seq{n}", sequence) for n, sequence in enumerate(sequences)]
+    records[2] = ('packed', PackedSequence.from_string(sequences[2]))
+    expected = [dict(detector.detect_features(sequence), id=name)
+                for name, sequence in records]
+    assert list(detector.detect_features_batch(records, workers=2, chunk_size=2)) == expected
+    unordered = detector.detect_features_batch(records, workers=2, chunk_size=1, ordered=False)
+    assert sorted(unordered, key=lambda result: result['id']) == \
+        sorted(expected, key=lambda result: result['id'])
+    only_orf = list(detector.detect_features_batch(sequences[:2], workers=0, analyses=['orf']))
+    assert [result['id'] for result in only_orf] == [0, 1]
+    assert 'repeats' not in only_orf[0] and 'orf' in only_orf[0]
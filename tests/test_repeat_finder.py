@@ -0,0 +1,54 @@
+from analysis.dna_detector import DNADetector
+from analysis.repeat_finder import RepeatFinder
+from benchmarks.synthetic import random_genome
+
+
+def _naive(sequence, k):
+    table = {}
+    for i in range(len(sequence) - k + 1):
+        if 'N' not in sequence[i:i + k]:
+            table.setdefault(sequence[i:i + k], []).append(i)
+    return {kmer: positions for kmer, positions in table.items() if len(positions) > 1}
+
+
+def test_kmer_repeats_match_naive_scan():
+    finder = RepeatFinder()
+    sequence = random_genome(2000, seed=5)
+    for k in (4, 7, 12, 40):
+        assert finder.find_kmer_repeats(sequence, k) == _naive(sequence, k)
+
+
+def test_overlapping_occurrences_count_as_repeats():
+    # The str.count-based scan this replaced reported {} here
+    assert DNADetector().find_repeats('AAAAA') == {'AAAA': [0, 1]}
+    assert DNADetector().find_repeats('ACGTACGTA') == {'ACGT': [0, 4], 'CGTA': [1, 5]}
+
+
+def test_repeats_skip_n_and_respect_limit():
+    finder = RepeatFinder()
+    assert finder.find_kmer_repeats('ACGTNACGTNACGT', 4) == {'ACGT': [0, 5, 10]}
+    assert finder.find_kmer_repeats('ACGNACGN', 4) == {}
+    limited = finder.find_kmer_repeats(random_genome(500, seed=2), 4, max_results=3)
+    assert len(limited) == 3
+
+
+def test_classify_tandem_and_dispersed():
+    finder = RepeatFinder()
+    repeats = {entry['sequence']: entry
+               for entry in finder.classify_repeats('CACACACAGTTTTGGGCCGTTTTG', 5)}
+    assert repeats['CACAC']['type'] == 'tandem'
+    assert repeats['GTTTT'] == {'sequence': 'GTTTT', 'length': 5, 'count': 2,
+                                'positions': [8, 18], 'type': 'dispersed'}
+
+
+def test_maximal_repeats():
+    finder = RepeatFinder()
+    sequence = 'GATTACAGGGGATTACATT'
+    repeats = finder.find_maximal_repeats(sequence, 5)
+    assert [(entry['sequence'], entry['positions']) for entry in repeats] == [
+        ('GATTACA', [0, 10])]
+    genome = random_genome(800, seed=9)
+    for entry in finder.find_maximal_repeats(genome, 6):
+        assert entry['count'] > 1
+        assert all(genome[p:p + entry['length']] == entry['sequence']
+                   for p in entry['positions'])
@@ -0,0 +1,86 @@
+import re
+
+import pytest
+
+from analysis.dna_detector import DNADetector
+from analysis.sequence_aligner import SequenceAligner
+from benchmarks.synthetic import mutate, random_genome
+
+QUERY = random_genome(300, seed=31)
+TARGET = mutate(QUERY[:140] + 'ACG' + QUERY[140:250] + QUERY[262:], rate=0.03, seed=2)
+
+
+def _rescore(alignment, match=2, mismatch=-3, open_gap=-5, extend_gap=-2):
+    """Affine-gap score of the aligned strings"""
+    score, gap = 0, None
+    for a, b in zip(alignment['aligned_query'], alignment['aligned_target']):
+        kind = 'I' if b == '-' else 'D' if a == '-' else None
+        if kind is None:
+            score += match if a == b else mismatch
+        else:
+            score += extend_gap if kind == gap else open_gap
+        gap = kind
+    return score
+
+
+def _check_cigar(alignment, query, target):
+    query_used = target_used = 0
+    for length, op in re.findall(r'(\d+)([MID])', alignment['cigar']):
+        query_used += int(length) if op in 'MI' else 0
+        target_used += int(length) if op in 'MD' else 0
+    assert query_used == alignment['query_end'] - alignment['query_start']
+    assert target_used == alignment['target_end'] - alignment['target_start']
+    assert alignment['aligned_query'].replace('-', '') == \
+        query[alignment['query_start']:alignment['query_end']]
+    assert alignment['aligned_target'].replace('-', '') == \
+        target[alignment['target_start']:alignment['target_end']]
+
+
+def test_modes_are_consistent_with_their_alignments():
+    for mode in ('global', 'local', 'semiglobal'):
+        aligner = SequenceAligner(mode)
+        alignment = aligner.align(QUERY, TARGET)
+        _check_cigar(alignment, QUERY, TARGET)
+        assert alignment['score'] == aligner.score(QUERY, TARGET)
+        if mode != 'semiglobal':
+            assert alignment['score'] == _rescore(alignment)
+    local = SequenceAligner('local').align('TTTTGATTACAGGG', 'CCGATTACACC')
+    assert (local['cigar'], local['query_start'], local['target_start']) == ('7M', 4, 2)
+    semiglobal = SequenceAligner('semiglobal').align('GATTACA', 'CCCCGATTACACCCC')
+    assert (semiglobal['cigar'], semiglobal['target_start'], semiglobal['score']) == ('7M', 4, 14)
+
+
+def test_banded_matches_full_dynamic_programming():
+    full = SequenceAligner('global').align(QUERY, TARGET)
+    banded = SequenceAligner('global', band=32).align(QUERY, TARGET)
+    assert banded['score'] == full['score']
+    assert _rescore(banded) == banded['score']
+    _check_cigar(banded, QUERY, TARGET)
+    assert SequenceAligner('global', band=32).score(QUERY, TARGET) == full['score']
+
+
+def test_xdrop_stops_after_the_similar_prefix():
+    query = QUERY[:150] + random_genome(300, seed=7)
+    target = QUERY[:150] + random_genome(300, seed=8)
+    alignment = SequenceAligner('global', xdrop=20).align(query, target)
+    assert 150 <= alignment['query_end'] < 200
+    assert alignment['score'] >= 300
+
+
+def test_edge_cases_and_batches():
+    assert SequenceAligner('global').align('', 'ACG')['score'] == -5 - 2 * 2
+    assert SequenceAligner('local').align('', 'ACG')['score'] == 0
+    # No positive-scoring pair: the local alignment is empty instead of failing
+    unrelated = DNADetector().align_sequences('AAAA', 'CCCC', mode='local')
+    assert unrelated == SequenceAligner('local').align('', '')
+    assert (unrelated['score'], unrelated['cigar']) == (0, '')
+    with pytest.raises(ValueError):
+        SequenceAligner('local', band=10)
+    with pytest.raises(ValueError):
+        SequenceAligner('fuzzy')
+    targets = [TARGET, QUERY[50:200], ('named', 'ACGT')]
+    aligner = SequenceAligner('semiglobal')
+    results = list(aligner.align_many(QUERY, targets, workers=2, chunk_size=1))
+    assert [result.pop('id') for result in results] == [0, 1, 'named']
+    assert results == [aligner.align(QUERY, target) for target in (TARGET, QUERY[50:200], 'ACGT')]
+    assert DNADetector().align_sequences('ACGT', 'ACT')['cigar'] == '2M1I1M'
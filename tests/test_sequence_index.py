@@ -0,0 +1,67 @@
+from analysis.dna_detector import DNADetector
+from analysis.sequence_db import SEQUENCE_DATABASE
+from analysis.sequence_index import SequenceIndex
+from analysis.sequence_store import SequenceStore
+from benchmarks.synthetic import random_genome
+
+ENTRIES = {name: random_genome(300, seed=seed) for seed, name in enumerate('abcd')}
+
+
+def _naive(query):
+    return [(seq_id, pos) for seq_id, sequence in ENTRIES.items()
+            for pos in range(len(sequence)) if sequence.startswith(query, pos)]
+
+
+def test_search_matches_naive_scan():
+    index = SequenceIndex(sample_rate=4)
+    index.build(ENTRIES.items())
+    for query in ('ACG', 'TTAG', ENTRIES['c'][100:130], 'GGGGGGGGGGGG'):
+        assert index.search(query) == _naive(query)
+
+
+def test_add_remove_and_rebuild():
+    index = SequenceIndex(rebuild_ratio=10)
+    index.build(ENTRIES.items())
+    index.add('e', 'ACGTTGCAACGT')
+    index.remove('a')
+    assert index.search('ACGTTGCAACGT') == [('e', 0)]
+    assert index.search(ENTRIES['a'][50:80]) == []
+    index.rebuild()
+    assert index.search('ACGTTGCAACGT') == [('e', 0)]
+    assert 'a' not in index and len(index) == 4
+
+
+def test_save_load_round_trip(tmp_path):
+    index = SequenceIndex()
+    index.build(ENTRIES.items())
+    index.save(str(tmp_path))
+    loaded = SequenceIndex.load(str(tmp_path))
+    assert loaded.search(ENTRIES['b'][10:40]) == [('b', 10)]
+    assert loaded.digests == index.digests
+
+
+def test_persisted_index_follows_store_changes(tmp_path):
+    store = SequenceStore.from_dict(SEQUENCE_DATABASE, str(tmp_path / 'db.sqlite'))
+    index_path = str(tmp_path / 'index')
+    hbb = SEQUENCE_DATABASE['HBB_HUMAN']['sequence']
+    detector = DNADetector(store, index_path=index_path)
+    assert detector.identify_sequence(hbb[10:40])['id'] == 'HBB_HUMAN'
+
+    del store['HBB_HUMAN']
+    result = detector.detect_features(hbb[10:40])
+    assert 'error' not in result
+    assert result['sequence_info'].get('id') != 'HBB_HUMAN'
+
+    replacement = random_genome(200, seed=11)
+    store['NEW'] = {'name': 'New', 'sequence': replacement}
+    reopened = DNADetector(SequenceStore(store.path), index_path=index_path)
+    assert reopened.identify_sequence(replacement[20:50])['match_position'] == 20
+    assert reopened.identify_sequence(hbb[10:40]) is None
+
+
+def test_replaced_sequence_reports_new_positions(tmp_path):
+    store = SequenceStore.from_dict({'x': {'name': 'X', 'sequence': 'A' * 20 + 'GATTACA'}})
+    detector = DNADetector(store)
+    assert detector.identify_sequence('GATTACA')['match_position'] == 20
+    store['x'] = {'name': 'X', 'sequence': 'GATTACA' + 'C' * 20}
+    assert detector.identify_sequence('GATTACA')['match_position'] == 0
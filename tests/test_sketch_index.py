@@ -0,0 +1,74 @@
+from analysis.dna_detector import DNADetector
+from analysis.sequence_db import SEQUENCE_DATABASE
+from analysis.sequence_store import SequenceStore
+from analysis.sketch_index import SketchIndex, sketch
+from benchmarks.synthetic import mutate, random_genome
+
+NEW = random_genome(400, seed=7)
+
+
+def _store(tmp_path):
+    return SequenceStore.from_dict(SEQUENCE_DATABASE, str(tmp_path / 'db.sqlite'))
+
+
+def test_sketch_is_deterministic_and_scaled():
+    kmers, hashes = sketch(random_genome(5000, seed=1), k=15, scaled=8)
+    assert kmers > 4000
+    assert 0 < len(hashes) < kmers
+    assert (sketch(random_genome(5000, seed=1))[1] == hashes).all()
+    # With scaled=1 every distinct canonical k-mer is kept and counted exactly
+    # (TACG is the reverse complement of CGTA; ACGT and GTAC are palindromes)
+    assert sketch('ACGTACGTAC', k=4, scaled=1)[0] == len({'ACGT', 'CGTA', 'GTAC'})
+
+
+def test_search_finds_mutated_reference():
+    index = SketchIndex(scaled=1)
+    index.add_many([('a', random_genome(2000, seed=1)), ('b', random_genome(2000, seed=2))])
+    hits = index.search(mutate(random_genome(2000, seed=2)[500:900], rate=0.01, seed=3))
+    assert hits[0]['id'] == 'b'
+    assert hits[0]['containment'] > 0.5
+
+
+def test_sync_handles_delete_and_add_with_equal_counts(tmp_path):
+    store = _store(tmp_path)
+    detector = DNADetector(store)
+    assert 'HBB_HUMAN' in detector.sketches
+    del store['HBB_HUMAN']
+    store['NEW'] = {'name': 'New', 'sequence': NEW}
+    assert 'NEW' in detector.sketches
+    assert 'HBB_HUMAN' not in detector.sketches
+    assert not detector.sketches._query("SELECT 1 FROM sketch_hashes WHERE id = 'HBB_HUMAN'")
+    query = mutate(NEW, rate=0.005, seed=1)
+    assert detector.describe_sequence(query)['name'] == 'Unknown Sequence'
+    info = detector.describe_sequence(query, approximate=True)
+    assert (info['name'], info['approximate'], info['match_position']) == ('New', True, None)
+
+
+def test_approximate_identification_is_opt_in(tmp_path):
+    store = _store(tmp_path)
+    store['NEW'] = {'name': 'New', 'sequence': NEW}
+    query = mutate(NEW, rate=0.005, seed=1)
+    assert DNADetector(store).detect_features(query)['sequence_info']['name'] == 'Unknown Sequence'
+    info = DNADetector(store, approximate=True).detect_features(query)['sequence_info']
+    assert info['name'] == 'New' and info['approximate']
+    assert 'approximate' not in DNADetector(store, approximate=True).describe_sequence(NEW)
+
+
+def test_sync_resketches_replaced_sequence(tmp_path):
+    store = _store(tmp_path)
+    store['NEW'] = {'name': 'New', 'sequence': NEW}
+    detector = DNADetector(store)
+    assert detector.identify_approximate(NEW[:200])[0]['id'] == 'NEW'
+    replacement = random_genome(400, seed=8)
+    store['NEW'] = {'name': 'New', 'sequence': replacement}
+    assert detector.identify_approximate(NEW[:200]) == []
+    assert detector.identify_approximate(replacement[:200])[0]['id'] == 'NEW'
+
+
+def test_reopened_store_drops_removed_sketches(tmp_path):
+    store = _store(tmp_path)
+    DNADetector(store).sketches
+    del SequenceStore(store.path)['HBB_HUMAN']
+    detector = DNADetector(SequenceStore(store.path))
+    assert 'HBB_HUMAN' not in detector.sketches
+    assert len(detector.sketches) == len(SEQUENCE_DATABASE) - 1
@@ -0,0 +1,65 @@
+from analysis.packed_sequence import PackedSequence
+from analysis.snp_analyzer import SNPAnalyzer
+from benchmarks.synthetic import mutate, random_genome
+
+REFERENCE = random_genome(600, seed=41)
+
+
+def _apply(reference, variants):
+    """Sample sequence rebuilt from VCF-style variants"""
+    sequence = reference
+    for variant in sorted(variants, key=lambda variant: -variant['position']):
+        start = variant['position'] - 1
+        assert sequence[start:start + len(variant['reference'])] == variant['reference']
+        sequence = sequence[:start] + variant['sample'] + sequence[start + len(variant['reference']):]
+    return sequence
+
+
+def test_find_snps_compares_positions():
+    assert SNPAnalyzer().find_snps('ACGTAC', 'ACCTA') == [
+        {'position': 3, 'reference': 'G', 'sample': 'C'}]
+    sample = mutate(REFERENCE, rate=0.01, seed=1)
+    expected = [i + 1 for i, (a, b) in enumerate(zip(REFERENCE, sample)) if a != b]
+    packed = PackedSequence.from_string(sample)
+    assert [snp['position'] for snp in SNPAnalyzer().find_snps(REFERENCE, packed)] == expected
+
+
+def test_variants_rebuild_the_sample():
+    analyzer = SNPAnalyzer()
+    samples = [
+        mutate(REFERENCE, rate=0.01, seed=2),
+        REFERENCE[:200] + 'GGATC' + REFERENCE[200:],
+        REFERENCE[:300] + REFERENCE[310:],
+        mutate(REFERENCE[:100] + REFERENCE[104:450] + 'TT' + REFERENCE[450:], rate=0.01, seed=3),
+    ]
+    for sample in samples:
+        assert _apply(REFERENCE, analyzer.call_variants(REFERENCE, sample)) == sample
+    insertion = analyzer.call_variants(REFERENCE, samples[1])
+    assert [variant['type'] for variant in insertion] == ['insertion']
+    deletion = analyzer.call_variants(REFERENCE, samples[2])
+    assert [variant['type'] for variant in deletion] == ['deletion']
+    assert len(deletion[0]['reference']) == 11
+
+
+def test_long_sequences_use_a_banded_alignment():
+    reference = random_genome(8000, seed=42)
+    sample = reference[:5000] + reference[5003:]
+    analyzer = SNPAnalyzer(banded_length=5000)
+    assert analyzer._aligner_for(len(reference), len(sample)).band == 32
+    assert _apply(reference, analyzer.call_variants(reference, sample)) == sample
+
+
+def test_batch_calls_and_vcf(tmp_path):
+    analyzer = SNPAnalyzer()
+    samples = [('s1', mutate(REFERENCE, rate=0.01, seed=4)), ('s2', REFERENCE[:590])]
+    results = {result['id']: result for result in
+               analyzer.call_variants_batch(REFERENCE, samples, workers=2)}
+    for name, sample in samples:
+        assert results[name]['variants'] == analyzer.call_variants(REFERENCE, sample)
+    written = dict(analyzer.write_cohort_vcf(REFERENCE, samples, str(tmp_path), workers=2))
+    lines = open(written['s1']).read().splitlines()
+    assert lines[0] == '##fileformat=VCFv4.2'
+    assert '##contig=<ID=ref,length=600>' in lines
+    body = [line.split('\t') for line in lines if not line.startswith('#')]
+    assert len(body) == len(results['s1']['variants'])
+    assert body[0][7] == 'TYPE=snp' and body[0][9] == '1'
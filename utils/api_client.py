@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Status codes worth retrying: throttling and transient server errors
+RETRY_STATUS = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'dna-analyzer')
+
+
+class APIError(Exception):
+    """Request failed after all retries, or the server returned a non-retryable error"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+def sequence_key(sequence, namespace=''):
+    """Stable cache key for a sequence (case-insensitive) within a namespace"""
+    return hashlib.sha256(f"{namespace}:{sequence.upper()}".encode('utf-8')).hexdigest()
+
+
+class RateLimiter:
+    """Thread-safe token bucket: at most `rate` requests per second, bursts up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1, rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take one token and return how long the caller must wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        delay = self._reserve()
+        if delay:
+            time.sleep(delay)
+
+
+class DiskCache:
+    """JSON responses on disk, one file per key in two-level fan-out directories"""
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), encoding='utf-8') as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, value):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as handle:
+                json.dump(value, handle)
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+
+class APIClient:
+    """Shared JSON-over-HTTP client with pooling, rate limiting, retries and a disk cache
+
+    One requests.Session (and its urllib3 connection pool) is reused for every call.
+    Retryable failures (connection errors, timeouts, 429 and 5xx) are retried with
+    exponential backoff and jitter, honouring Retry-After. Calls that pass a cache_key
+    are answered from the disk cache when possible and stored there on success.
+    post_many / apost_many submit many requests concurrently through asyncio on a
+    bounded thread pool that shares the same session.
+    """
+
+    def __init__(self, base_url, api_key=None, timeout=(5, 120), max_retries=3, backoff=0.5,
+                 max_backoff=30.0, rate=None, burst=None, cache_dir=None, pool_size=16):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.pool_size = pool_size
+        self.limiter = RateLimiter(rate, burst) if rate else None
+        self.cache = DiskCache(cache_dir) if cache_dir else None
+        self.api_key = api_key
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def session(self):
+        # requests (and its TLS stack) is only imported once the first request is made
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=self.pool_size,
+                                      pool_maxsize=self.pool_size, max_retries=0)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                if self.api_key:
+                    session.headers['Authorization'] = f"Bearer {self.api_key}"
+                self._session = session
+            return self._session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def post(self, path, payload, cache_key=None):
+        """POST a JSON payload and return the decoded JSON response"""
+        if cache_key and self.cache is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        result = self._post(path, payload)
+        if cache_key and self.cache is not None:
+            try:
+                self.cache.put(cache_key, result)
+            except OSError:
+                # An unwritable cache (full disk, permissions) must not lose a good response
+                pass
+        return result
+
+    def _post(self, path, payload):
+        import requests
+
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire()
+            retry_after = None
+            try:
+                response = self.session.post(url, json=payload, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout) as error:
+                failure = APIError(f"{type(error).__name__}: {error}")
+            except requests.RequestException as error:
+                # Invalid URLs, bad schemes and similar request errors will not succeed on retry
+                raise APIError(f"{type(error).__name__}: {error}") from error
+            else:
+                if response.status_code < 400:
+                    try:
+                        return response.json()
+                    except ValueError as error:
+                        raise APIError(f"Invalid JSON response: {error}", response.status_code)
+                failure = APIError(f"HTTP {response.status_code}: {response.text[:200]}",
+                                   response.status_code)
+                if response.status_code not in RETRY_STATUS:
+                    raise failure
+                retry_after = _retry_after(response)
+            if attempt == self.max_retries:
+                raise failure
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            time.sleep(retry_after if retry_after is not None else random.uniform(0, delay))
+
+    def _pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.pool_size,
+                                                    thread_name_prefix='api-client')
+            return self._executor
+
+    async def apost_many(self, path, payloads, cache_keys=None, concurrency=8):
+        """Submit many POSTs concurrently; results (or APIError instances) keep input order"""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(concurrency)
+        executor = self._pool()
+        payloads = list(payloads)
+        cache_keys = list(cache_keys) if cache_keys is not None else [None] * len(payloads)
+
+        async def submit(payload, cache_key):
+            async with semaphore:
+                try:
+                    return await loop.run_in_executor(executor, self.post, path, payload,
+                                                      cache_key)
+                except APIError as error:
+                    return error
+
+        # Identical cached requests in one batch share a single network call
+        shared = {}
+        tasks = []
+        for payload, key in zip(payloads, cache_keys):
+            if key is None:
+                tasks.append(asyncio.ensure_future(submit(payload, key)))
+                continue
+            if key not in shared:
+                shared[key] = asyncio.ensure_future(submit(payload, key))
+            tasks.append(shared[key])
+        return list(await asyncio.gather(*tasks))
+
+    def post_many(self, path, payloads, cache_keys=None, concurrency=8):
+        """Blocking wrapper around apost_many for code without an event loop"""
+        import asyncio
+
+        return asyncio.run(self.apost_many(path, payloads, cache_keys, concurrency))
+
+
+def _retry_after(response):
+    value = response.headers.get('Retry-After')
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
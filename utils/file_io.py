@@ -1,11 +1,179 @@
+import gzip
+import io
 import json
+from functools import lru_cache
+
+DEFAULT_CHUNK_SIZE = 1 << 22
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+@lru_cache(maxsize=None)
+def _filter_tables(alphabet):
+    """Translation table and delete set that uppercase and keep only alphabet"""
+    alphabet = alphabet.upper().encode('ascii')
+    table = bytes.maketrans(alphabet.lower(), alphabet)
+    keep = set(alphabet) | set(alphabet.lower())
+    delete = bytes(b for b in range(256) if b not in keep)
+    return table, delete
+
+
+def clean_sequence(data, alphabet='ACGT'):
+    """Uppercase raw bytes and drop every character outside alphabet"""
+    table, delete = _filter_tables(alphabet)
+    return data.translate(table, delete)
+
+
+def open_sequence_file(file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Open a plain or gzip-compressed file as a buffered binary stream"""
+    raw = open(file_path, 'rb', buffering=max(chunk_size, io.DEFAULT_BUFFER_SIZE))
+    if raw.peek(2)[:2] == GZIP_MAGIC:
+        raw.close()
+        return io.BufferedReader(gzip.open(file_path, 'rb'), buffer_size=max(chunk_size, io.DEFAULT_BUFFER_SIZE))
+    return raw
+
+
+def detect_format(handle):
+    """Return 'fasta', 'fastq' or 'plain' from the first non-blank byte"""
+    head = handle.peek(1024).lstrip()[:1]
+    if head == b'>':
+        return 'fasta'
+    if head == b'@':
+        return 'fastq'
+    return 'plain'
+
+
+def iter_record_chunks(file_path, chunk_size=DEFAULT_CHUNK_SIZE, alphabet='ACGT'):
+    """Yield (record_number, name, cleaned_bytes) pieces without loading whole records
+
+    Headerless files are returned as a single record named None.
+    """
+    with open_sequence_file(file_path, chunk_size) as handle:
+        file_format = detect_format(handle)
+        if file_format == 'fastq':
+            yield from _fastq_chunks(handle, alphabet)
+        else:
+            yield from _fasta_chunks(handle, chunk_size, alphabet)
+
+
+def _fasta_chunks(handle, chunk_size, alphabet):
+    record, name = -1, None
+    header = None
+    at_line_start = True
+    while True:
+        block = handle.read(chunk_size)
+        if not block:
+            break
+        pos = 0
+        while pos < len(block):
+            if header is not None:
+                end = block.find(b'\n', pos)
+                if end == -1:
+                    header += block[pos:]
+                    break
+                header += block[pos:end]
+                record, name = record + 1, header.decode('utf-8', 'replace').strip()
+                header = None
+                pos, at_line_start = end + 1, True
+                yield record, name, b''
+                continue
+            if at_line_start and block[pos:pos + 1] == b'>':
+                header = b''
+                pos += 1
+                continue
+            end = block.find(b'\n>', pos)
+            end = len(block) if end == -1 else end + 1
+            data = block[pos:end]
+            at_line_start = data.endswith(b'\n')
+            pos = end
+            if record < 0:
+                record = 0
+            cleaned = clean_sequence(data, alphabet)
+            if cleaned:
+                yield record, name, cleaned
+    if header is not None:
+        yield record + 1, header.decode('utf-8', 'replace').strip(), b''
+
+
+def _fastq_chunks(handle, alphabet):
+    record = 0
+    while True:
+        header = handle.readline()
+        if not header:
+            break
+        if not header.strip():
+            continue
+        sequence = handle.readline()
+        handle.readline()
+        handle.readline()
+        name = header[1:].decode('utf-8', 'replace').strip()
+        yield record, name, clean_sequence(sequence, alphabet)
+        record += 1
+
+
+def read_records(file_path, chunk_size=DEFAULT_CHUNK_SIZE, alphabet='ACGT'):
+    """Lazily yield (name, sequence) for every FASTA/FASTQ record"""
+    current, name, parts = None, None, []
+    for record, record_name, data in iter_record_chunks(file_path, chunk_size, alphabet):
+        if record != current:
+            if current is not None:
+                yield name, b''.join(parts).decode('ascii')
+            current, name, parts = record, record_name, []
+        parts.append(data)
+    if current is not None:
+        yield name, b''.join(parts).decode('ascii')
+
+
+def sliding_windows(sequence, size, step=None):
+    """Yield (start, window) over an in-memory sequence; the uncovered tail is a short window"""
+    step = step or size
+    start, covered = 0, 0
+    while start + size <= len(sequence):
+        yield start, sequence[start:start + size]
+        covered = start + size
+        start += step
+    if len(sequence) > max(start, covered):
+        yield start, sequence[start:]
+
+
+def read_windows(file_path, size, step=None, chunk_size=DEFAULT_CHUNK_SIZE, alphabet='ACGT'):
+    """Yield (name, start, window) per record, buffering at most one window plus one chunk
+
+    Windows follow the same layout as sliding_windows.
+    """
+    step = step or size
+    current, name = None, None
+    buffer, buffer_start, next_start, covered = bytearray(), 0, 0, 0
+    for record, record_name, data in iter_record_chunks(file_path, chunk_size, alphabet):
+        if record != current:
+            if current is not None:
+                yield from _window_tail(name, buffer, buffer_start, next_start, covered)
+            current, name = record, record_name
+            buffer, buffer_start, next_start, covered = bytearray(), 0, 0, 0
+        buffer += data
+        while next_start + size <= buffer_start + len(buffer):
+            offset = next_start - buffer_start
+            yield name, next_start, buffer[offset:offset + size].decode('ascii')
+            covered = next_start + size
+            next_start += step
+            drop = min(next_start - buffer_start, len(buffer))
+            del buffer[:drop]
+            buffer_start += drop
+    if current is not None:
+        yield from _window_tail(name, buffer, buffer_start, next_start, covered)
+
+
+def _window_tail(name, buffer, buffer_start, next_start, covered):
+    end = buffer_start + len(buffer)
+    if end > max(next_start, covered):
+        yield name, next_start, buffer[next_start - buffer_start:].decode('ascii')
+
 
 def load_dna_file(file_path):
-    """Load DNA sequence from file"""
-    with open(file_path, 'r') as file:
-        content = file.read().strip().upper()
-        # Remove any non-DNA characters
-        return ''.join([c for c in content if c in {'A', 'T', 'C', 'G'}])
+    """Load DNA sequence from file (first record of FASTA/FASTQ files)"""
+    for _, sequence in read_records(file_path):
+        return sequence
+    return ''
+
 
 def save_dna_file(file_path, sequence, complement=None):
     """Save DNA sequence to file"""
@@ -14,6 +182,7 @@ def save_dna_file(file_path, sequence, complement=None):
         if complement:
             file.write(f"Complement: {complement}\n")
 
+
 def load_config(config_path='config.json'):
     """Load application configuration"""
     with open(config_path) as config_file:
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def fake_structure(sequence):
+    """Deterministic stand-in prediction: same sequence, same response"""
+    digest = hashlib.sha256(sequence.encode('utf-8')).digest()
+    plddt = [round(50 + (digest[i % len(digest)] / 255) * 50, 2) for i in range(len(sequence))]
+    atoms = "\n".join(
+        f"ATOM  {i + 1:5d}  CA  {residue:>3} A{i + 1:4d}    {3.8 * i:8.3f}{0:8.3f}{0:8.3f}"
+        f"  1.00{plddt[i]:6.2f}           C"
+        for i, residue in enumerate(sequence)
+    )
+    return {
+        'sequence': sequence,
+        'mean_plddt': round(sum(plddt) / len(plddt), 2) if plddt else 0.0,
+        'plddt': plddt,
+        'pdb': atoms + "\nEND\n",
+    }
+
+
+class MockPredictionServer:
+    """Local stand-in for the structure prediction API, for tests and benchmarks
+
+    Serves POST /predict on 127.0.0.1 in a background thread. `latency` adds a fixed
+    delay per request; `fail_every=n` answers every n-th request with 503 and
+    `throttle_every=n` with 429 + Retry-After, to exercise client retries.
+    `requests` counts every request received.
+    """
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0.0, fail_every=0, throttle_every=0,
+                 api_key=None):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.throttle_every = throttle_every
+        self.api_key = api_key
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _count(self):
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def _reply(self, status, body, headers=()):
+                data = json.dumps(body).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                number = server._count()
+                payload = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.api_key and self.headers.get('Authorization') != f"Bearer {server.api_key}":
+                    return self._reply(401, {'error': 'unauthorized'})
+                if server.throttle_every and number % server.throttle_every == 0:
+                    return self._reply(429, {'error': 'rate limited'}, [('Retry-After', '0')])
+                if server.fail_every and number % server.fail_every == 0:
+                    return self._reply(503, {'error': 'temporarily unavailable'})
+                if self.path.rstrip('/') != '/v1/predict' or 'sequence' not in payload:
+                    return self._reply(404, {'error': 'not found'})
+                self._reply(200, fake_structure(payload['sequence']))
+
+        return Handler
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local stand-in structure prediction server")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--fail-every', type=int, default=0)
+    parser.add_argument('--throttle-every', type=int, default=0)
+    args = parser.parse_args()
+    mock = MockPredictionServer(port=args.port, latency=args.latency, fail_every=args.fail_every,
+                                throttle_every=args.throttle_every)
+    print(f"Serving {mock.url}/v1/predict")
+    try:
+        mock._server.serve_forever()
+    except KeyboardInterrupt:
+        mock._server.server_close()
@@ -0,0 +1,176 @@
+import json
+import os
+import sys
+
+FORMATS = ('jsonl', 'tsv', 'parquet')
+
+# Column kinds: scalar values are stored as-is, 'json' values as JSON text
+KINDS = ('str', 'int', 'float', 'json')
+
+_EXTENSIONS = {'.jsonl': 'jsonl', '.json': 'jsonl', '.ndjson': 'jsonl', '.tsv': 'tsv',
+               '.txt': 'tsv', '.parquet': 'parquet', '.pq': 'parquet'}
+
+
+def detect_output_format(path):
+    """Output format from the file extension; stdout ('-') is JSON Lines"""
+    if path == '-':
+        return 'jsonl'
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _EXTENSIONS:
+        raise ValueError(f"Cannot infer output format from {path!r}; pass one of {FORMATS}")
+    return _EXTENSIONS[extension]
+
+
+def _cell(kind, value):
+    if value is None:
+        return None
+    if kind == 'json':
+        return json.dumps(value, ensure_ascii=False)
+    if kind == 'int':
+        return int(value)
+    if kind == 'float':
+        return float(value)
+    return str(value)
+
+
+def _complete_lines(path):
+    """Count newline-terminated lines and cut off a partially written last line"""
+    count = end = position = 0
+    with open(path, 'rb+') as handle:
+        for line in handle:
+            position += len(line)
+            if line.endswith(b'\n'):
+                count += 1
+                end = position
+        handle.truncate(end)
+    return count
+
+
+class JSONLinesWriter:
+    """One JSON object per line, flushed after every row"""
+
+    def __init__(self, path, columns, resume=False):
+        self.path = path
+        self.columns = columns
+        self.completed = 0
+        if path == '-':
+            self._handle = sys.stdout
+            return
+        if resume and os.path.exists(path):
+            self.completed = _complete_lines(path)
+        self._handle = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def write(self, row):
+        # Nested values stay nested; only the declared columns are written, in order
+        record = {name: row.get(name) for name in self.columns if row.get(name) is not None}
+        self._handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self._handle.flush()
+
+    def close(self):
+        if self._handle is not sys.stdout:
+            self._handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TSVWriter(JSONLinesWriter):
+    """Tab-separated table with a header row; nested values are JSON text"""
+
+    def __init__(self, path, columns, resume=False):
+        super().__init__(path, columns, resume)
+        if self.completed:
+            # The header is not a record
+            self.completed -= 1
+        else:
+            self._write_line(self.columns)
+
+    def _write_line(self, values):
+        self._handle.write('\t'.join(values) + '\n')
+        self._handle.flush()
+
+    def write(self, row):
+        cells = (_cell(kind, row.get(name)) for name, kind in self.columns.items())
+        self._write_line(
+            '' if cell is None else str(cell).replace('\t', ' ').replace('\n', ' ')
+            for cell in cells
+        )
+
+
+class ParquetWriter:
+    """Parquet dataset directory written as numbered part files of `rows_per_part` rows
+
+    Parts are written to a temporary name and renamed when complete, so after an
+    interruption every visible part is readable and resuming recomputes only the
+    rows that had not reached a part yet. Requires pyarrow.
+    """
+
+    def __init__(self, path, columns, resume=False, rows_per_part=1000):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as error:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow)") from error
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        types = {'str': pyarrow.string(), 'int': pyarrow.int64(), 'float': pyarrow.float64(),
+                 'json': pyarrow.string()}
+        self.path = path
+        self.columns = columns
+        self.schema = pyarrow.schema([(name, types[kind]) for name, kind in columns.items()])
+        self.rows_per_part = rows_per_part
+        self.completed = 0
+        self._rows = []
+        os.makedirs(path, exist_ok=True)
+        parts = sorted(name for name in os.listdir(path) if name.startswith('part-'))
+        for name in parts:
+            if name.endswith('.tmp') or not resume:
+                os.unlink(os.path.join(path, name))
+        parts = [name for name in parts if resume and name.endswith('.parquet')]
+        for name in parts:
+            self.completed += self._pq.read_metadata(os.path.join(path, name)).num_rows
+        self._part = len(parts)
+
+    def write(self, row):
+        self._rows.append({name: _cell(kind, row.get(name)) for name, kind in self.columns.items()})
+        if len(self._rows) >= self.rows_per_part:
+            self.flush()
+
+    def flush(self):
+        if not self._rows:
+            return
+        table = self._pa.Table.from_pylist(self._rows, schema=self.schema)
+        final = os.path.join(self.path, f"part-{self._part:05d}.parquet")
+        self._pq.write_table(table, final + '.tmp')
+        os.replace(final + '.tmp', final)
+        self._part += 1
+        self._rows = []
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        # Rows of an interrupted run are dropped rather than written as a partial part
+        if exc_info[0] is None:
+            self.close()
+
+
+def open_writer(path, columns, output_format=None, resume=False):
+    """Streaming result writer; `columns` maps column name to one of KINDS
+
+    With resume=True existing output is kept and `writer.completed` is the number
+    of rows already written, so the caller can skip that many input records.
+    """
+    output_format = output_format or detect_output_format(path)
+    if output_format not in FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    if path == '-' and (output_format != 'jsonl' or resume):
+        raise ValueError("Standard output only supports JSON Lines without resume")
+    writer = {'jsonl': JSONLinesWriter, 'tsv': TSVWriter, 'parquet': ParquetWriter}[output_format]
+    return writer(path, columns, resume)